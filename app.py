@@ -1,6 +1,6 @@
 import streamlit as st
 import folium
-from streamlit_folium import folium_static, st_folium
+from streamlit_folium import st_folium
 from loguru import logger
 import os
 import requests
@@ -14,13 +14,25 @@ from scipy.ndimage import binary_dilation
 from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
 from moviepy.video.VideoClip import TextClip, ColorClip
 from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
 import zipfile
 import base64
 from branca.element import Figure, JavascriptLink, CssLink
 import sys
 import cv2
 import io
+import html
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process locking is skipped
+    fcntl = None
 from streamlit import components
+from jobs import enqueue_job, get_job, list_jobs, start_worker_pool
 
 # Configure logger
 logger.remove()  # Remove default handler
@@ -143,11 +155,13 @@ st.markdown("""
 # Constants
 OUTPUT_FOLDER = "downloaded_aerial_images"
 ARCHIVE_FOLDER = "archived_projects"
+CACHE_FOLDER = "cache"
 CONFIG_FILE = "config.json"
 
 # Create necessary folders
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+os.makedirs(CACHE_FOLDER, exist_ok=True)
 
 # Base URL and headers
 BASE_URL = "https://tiles.historicaerials.com/"
@@ -282,24 +296,502 @@ def create_interactive_map(default_location, size_degrees=0.005):
     
     return m
 
+# JSON-backed caches stored in the cache folder
+_json_cache_lock = threading.RLock()
+
+@contextmanager
+def locked_file(path):
+    """Hold an exclusive lock on a file across threads and worker processes.
+    
+    The lock lives in a sidecar "<path>.lock" file, so the file itself can
+    still be replaced atomically while the lock is held.
+    """
+    with _json_cache_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def load_json_file(path, default=None):
+    """Load a JSON file, returning default if it is missing or unreadable"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading {path}: {e}")
+    return {} if default is None else default
+
+def save_json_file(path, data):
+    """Atomically write a JSON file"""
+    # Unique per process and thread, so concurrent writers never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with _json_cache_lock:
+            payload = json.dumps(data)
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Error saving {path}: {e}")
+
+def update_json_file(path, update, default=None):
+    """Read-modify-write a JSON file under a lock, merging with what other processes saved.
+    
+    Args:
+        path: Path of the JSON file
+        update: Function taking the current contents and returning the new contents
+        default: Contents to start from when the file does not exist
+        
+    Returns:
+        The new contents
+    """
+    with locked_file(path):
+        data = update(load_json_file(path, default))
+        save_json_file(path, data)
+    return data
+
+def load_json_cache(filename, default=None):
+    """Load a JSON cache file from the cache folder"""
+    return load_json_file(os.path.join(CACHE_FOLDER, filename), default)
+
+def save_json_cache(filename, data):
+    """Atomically write a JSON cache file to the cache folder"""
+    save_json_file(os.path.join(CACHE_FOLDER, filename), data)
+
+def update_json_cache(filename, update, default=None):
+    """Locked read-modify-write of a JSON cache file in the cache folder (see update_json_file)"""
+    return update_json_file(os.path.join(CACHE_FOLDER, filename), update, default)
+
+# Incremental storage accounting
+STORAGE_DB = os.path.join(CACHE_FOLDER, "storage.db")
+STORAGE_RECONCILE_INTERVAL = 6 * 3600  # Seconds between background reconciliation scans
+STORAGE_STAGES = ["raw", "processed", "text_images", "stack", "video", "archive", "other"]
+STORAGE_RECONCILE_LOCK = f"{STORAGE_DB}.reconcile.lock"
+
+def get_storage_connection():
+    """Open the storage accounting database, creating the schema if needed"""
+    conn = sqlite3.connect(STORAGE_DB, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS artifacts ("
+        "path TEXT PRIMARY KEY, project TEXT, stage TEXT, bytes INTEGER, updated TEXT, accessed REAL)"
+    )
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(artifacts)")]
+    if "accessed" not in columns:
+        conn.execute("ALTER TABLE artifacts ADD COLUMN accessed REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS artifacts_project ON artifacts (project, stage)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+def classify_artifact(path):
+    """Work out which project and pipeline stage a stored file belongs to.
+    
+    Returns:
+        tuple: (project name, stage), or (None, None) for files outside the storage folders
+    """
+    rel_output = os.path.relpath(os.path.abspath(path), os.path.abspath(OUTPUT_FOLDER))
+    rel_archive = os.path.relpath(os.path.abspath(path), os.path.abspath(ARCHIVE_FOLDER))
+    
+    if not rel_archive.startswith(".."):
+        if rel_archive.split(os.sep)[0] == "store":
+            # Shared content-addressed objects belong to no single project
+            return None, "archive"
+        # Archives are named {project}_{YYYYmmdd}_{HHMMSS}.zip
+        name = os.path.splitext(os.path.basename(path))[0]
+        parts = name.rsplit("_", 2)
+        return (parts[0] if len(parts) == 3 else name), "archive"
+    
+    if rel_output.startswith(".."):
+        return None, None
+    parts = rel_output.split(os.sep)
+    if len(parts) < 2:
+        return None, "other"
+    project, filename = parts[0], parts[-1]
+    if len(parts) > 2 and parts[1] in ("processed", "text_images"):
+        return project, parts[1]
+    if len(parts) > 2 and parts[1] == EXPORT_SUBFOLDER:
+        return project, "video"
+    if filename.endswith(".mp4"):
+        return project, "video"
+    if filename.endswith("_stack.npy"):
+        return project, "stack"
+    if len(parts) == 2 and filename.lower().endswith((".jpg", ".jpeg", ".png")):
+        return project, "raw"
+    return project, "other"
+
+def record_artifact(path):
+    """Record the current size of a file that was just written"""
+    project, stage = classify_artifact(path)
+    if stage is None:
+        return
+    try:
+        size = os.path.getsize(path)
+        conn = get_storage_connection()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, project, stage, bytes, updated, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(path), project, stage, size, datetime.now().isoformat(), time.time())
+            )
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.warning(f"Could not record storage for {path}: {e}")
+
+def forget_artifacts(path):
+    """Remove a deleted file, or every file under a deleted folder, from storage accounting"""
+    path = os.path.abspath(path)
+    try:
+        conn = get_storage_connection()
+        try:
+            prefix = path.rstrip(os.sep) + os.sep
+            conn.execute(
+                "DELETE FROM artifacts WHERE path = ? OR substr(path, 1, ?) = ?",
+                (path, len(prefix), prefix)
+            )
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.warning(f"Could not update storage for deleted {path}: {e}")
+
+def reconcile_storage():
+    """Rescan the storage folders and update the recorded sizes to match what is on disk.
+    
+    Only one scan runs at a time across all processes. Rows are upserted
+    rather than replaced wholesale, and only rows last updated before the
+    scan started (files that no longer exist) are removed, so artifacts
+    recorded while the scan runs are kept.
+    
+    Returns:
+        bool: False if another scan was already running
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(STORAGE_RECONCILE_LOCK)), exist_ok=True)
+    with open(STORAGE_RECONCILE_LOCK, "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("Storage reconciliation already running")
+                return False
+        
+        logger.info("Reconciling storage accounting with disk")
+        started = datetime.now().isoformat()
+        rows = []
+        for folder in (OUTPUT_FOLDER, ARCHIVE_FOLDER):
+            for root, _, files in os.walk(folder):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    project, stage = classify_artifact(file_path)
+                    if stage is None:
+                        continue
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    rows.append((os.path.abspath(file_path), project, stage, stat.st_size, started, stat.st_mtime))
+        
+        conn = get_storage_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Keep access times so reconciliation does not reset eviction order
+            conn.executemany(
+                "INSERT INTO artifacts (path, project, stage, bytes, updated, accessed) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET project = excluded.project, stage = excluded.stage, "
+                "bytes = excluded.bytes, updated = max(artifacts.updated, excluded.updated), "
+                "accessed = coalesce(artifacts.accessed, excluded.accessed)",
+                rows
+            )
+            conn.execute("DELETE FROM artifacts WHERE updated < ?", (started,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('reconciled', ?)", (str(time.time()),))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        logger.info(f"Storage reconciled: {len(rows)} files")
+        return True
+
+def reconcile_storage_in_background(force=False):
+    """Start a reconciliation scan in a background thread if one is due"""
+    if not force:
+        conn = get_storage_connection()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'reconciled'").fetchone()
+        finally:
+            conn.close()
+        if row and time.time() - float(row[0]) < STORAGE_RECONCILE_INTERVAL:
+            return False
+    # Overlapping scans are prevented by the lock file, which survives Streamlit reruns
+    threading.Thread(target=reconcile_storage, daemon=True).start()
+    return True
+
+def get_storage_usage():
+    """Get recorded storage usage in bytes.
+    
+    Returns:
+        dict: {"stages": {stage: bytes}, "projects": {project: {stage: bytes}}, "reconciled": timestamp or None}
+    """
+    conn = get_storage_connection()
+    try:
+        rows = conn.execute(
+            "SELECT project, stage, SUM(bytes) FROM artifacts GROUP BY project, stage"
+        ).fetchall()
+        reconciled = conn.execute("SELECT value FROM meta WHERE key = 'reconciled'").fetchone()
+    finally:
+        conn.close()
+    
+    usage = {"stages": {}, "projects": {}, "reconciled": float(reconciled[0]) if reconciled else None}
+    for project, stage, total in rows:
+        usage["stages"][stage] = usage["stages"].get(stage, 0) + total
+        usage["projects"].setdefault(project or "", {})[stage] = total
+    return usage
+
+def touch_artifacts(project, stage):
+    """Mark a project's artifacts for a stage as just used, for LRU eviction"""
+    try:
+        conn = get_storage_connection()
+        try:
+            conn.execute(
+                "UPDATE artifacts SET accessed = ? WHERE project = ? AND stage = ?",
+                (time.time(), project, stage)
+            )
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.warning(f"Could not record access for {project}/{stage}: {e}")
+
+# Storage budget and eviction of regenerable artifacts.
+# Tiers are evicted in order, least recently used first within a tier; raw downloads go last.
+EVICTION_TIERS = ["text_images", "stack", "video", "processed", "raw"]
+
+def get_storage_budget(config):
+    """Configured storage budget in bytes, or 0 for unlimited"""
+    return int(config.get("storage", {}).get("budget_mb", 0) * 1024 * 1024)
+
+def evict_artifacts(project_name, stage, config, video_path=None):
+    """Delete one project's artifacts for a stage.
+    
+    Args:
+        project_name: Name of the project
+        stage: Storage stage to evict
+        config: Application configuration (updated for evicted videos and raw downloads)
+        video_path: The specific video to evict when stage is "video"
+        
+    Returns:
+        int: Number of bytes freed
+    """
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    if stage in ("text_images", "processed"):
+        paths = [os.path.join(project_folder, stage)]
+    elif stage == "stack":
+        paths = [os.path.join(project_folder, f) for f in os.listdir(project_folder)
+                 if f.endswith("_stack.npy") or f == STACK_INDEX_FILE] if os.path.exists(project_folder) else []
+    elif stage == "video":
+        paths = [video_path]
+    elif stage == "raw":
+        paths = [os.path.join(project_folder, f) for f in os.listdir(project_folder)
+                 if f.lower().endswith((".jpg", ".jpeg", ".png"))] if os.path.exists(project_folder) else []
+    else:
+        return 0
+    
+    freed = 0
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                freed += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            freed += os.path.getsize(path)
+            os.remove(path)
+        forget_artifacts(path)
+    
+    # Record what was evicted so it can be regenerated on demand
+    def mark_evicted(config):
+        project = next((p for p in config["projects"] if p["name"] == project_name), None)
+        if project is None:
+            return
+        if stage == "video":
+            for video in project.get("videos", []):
+                if os.path.abspath(video["path"]) == os.path.abspath(video_path):
+                    video["evicted"] = True
+        elif stage == "raw":
+            project["raw_evicted"] = True
+    
+    if stage in ("video", "raw"):
+        mark_evicted(config)
+        update_config(mark_evicted)
+    
+    invalidate_project_cache(project_folder)
+    logger.info(f"Evicted {stage} for {project_name}, freed {freed / (1024 * 1024):.1f} MB")
+    return freed
+
+def enforce_storage_budget(config=None, busy_projects=()):
+    """Evict regenerable artifacts, least recently used first, until usage fits the budget.
+    
+    Args:
+        config: Application configuration (loaded if not given)
+        busy_projects: Names of projects that must not be touched (e.g. being rendered)
+        
+    Returns:
+        int: Number of bytes freed
+    """
+    config = config or load_config()
+    budget = get_storage_budget(config)
+    if not budget:
+        return 0
+    
+    usage = get_storage_usage()
+    # Archives are never evicted, so they do not count toward the budget
+    total = sum(size for stage, size in usage["stages"].items() if stage != "archive")
+    if total <= budget:
+        return 0
+    logger.info(f"Storage {total / (1024 * 1024):.1f} MB over budget {budget / (1024 * 1024):.1f} MB, evicting")
+    
+    conn = get_storage_connection()
+    try:
+        units = conn.execute(
+            "SELECT project, stage, SUM(bytes), MAX(accessed) FROM artifacts "
+            "WHERE stage != 'video' GROUP BY project, stage"
+        ).fetchall()
+        videos = conn.execute(
+            "SELECT project, path, bytes, accessed FROM artifacts WHERE stage = 'video'"
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    # The latest video of each project is kept; older ones are superseded
+    latest_videos = {
+        os.path.abspath(p["videos"][-1]["path"]) for p in config["projects"] if p.get("videos")
+    }
+    candidates = [(project, stage, None, size, accessed or 0) for project, stage, size, accessed in units]
+    candidates += [
+        (project, "video", path, size, accessed or 0)
+        for project, path, size, accessed in videos if path not in latest_videos
+    ]
+    candidates = [c for c in candidates if c[1] in EVICTION_TIERS and c[0] not in busy_projects]
+    candidates.sort(key=lambda c: (EVICTION_TIERS.index(c[1]), c[4]))
+    
+    freed = 0
+    for project, stage, path, size, _ in candidates:
+        if total - freed <= budget:
+            break
+        freed += evict_artifacts(project, stage, config, video_path=path)
+    return freed
+
+# Blank / no-coverage detection
+NO_COVERAGE_CACHE = "no_coverage.json"
+PLACEHOLDER_HASHES_CACHE = "placeholder_hashes.json"
+BLANK_MIN_STD = 4.0        # Below this brightness std-dev an image is treated as uniform
+BLANK_MIN_COVERAGE = 0.5   # Minimum fraction of pixels that must contain imagery
+_no_coverage = None
+_placeholder_hashes = None
+
+def _get_no_coverage():
+    global _no_coverage
+    if _no_coverage is None:
+        _no_coverage = load_json_cache(NO_COVERAGE_CACHE)
+    return _no_coverage
+
+def _get_placeholder_hashes():
+    global _placeholder_hashes
+    if _placeholder_hashes is None:
+        _placeholder_hashes = set(load_json_cache(PLACEHOLDER_HASHES_CACHE, default=[]))
+    return _placeholder_hashes
+
+def has_no_coverage(year, bbox):
+    """Check whether a (year, bbox) pair is already known to have no imagery"""
+    return f"{year}|{bbox}" in _get_no_coverage()
+
+def record_no_coverage(year, bbox, image_hash=None):
+    """Remember that a (year, bbox) pair has no imagery, and optionally the placeholder hash"""
+    global _no_coverage, _placeholder_hashes
+    key = f"{year}|{bbox}"
+    # Merge with entries other threads and worker processes saved since the cache was loaded
+    saved = update_json_cache(NO_COVERAGE_CACHE, lambda data: {**data, key: datetime.now().isoformat()})
+    with _json_cache_lock:
+        _no_coverage = {**_get_no_coverage(), **saved}
+    if image_hash and image_hash not in _get_placeholder_hashes():
+        saved = update_json_cache(PLACEHOLDER_HASHES_CACHE, lambda data: sorted(set(data) | {image_hash}), default=[])
+        with _json_cache_lock:
+            _placeholder_hashes = _get_placeholder_hashes() | set(saved)
+    logger.info(f"Recorded no coverage for year {year} at {bbox}")
+
+def is_blank_image(img_array, min_std=BLANK_MIN_STD, min_coverage=BLANK_MIN_COVERAGE):
+    """Detect uniform placeholder or mostly-empty images.
+
+    Args:
+        img_array: RGB image as a numpy array (H x W x 3)
+        min_std: Minimum brightness standard deviation for real imagery
+        min_coverage: Minimum fraction of pixels that are not empty fill
+
+    Returns:
+        tuple: (is_blank, coverage fraction)
+    """
+    # A strided view is plenty for these statistics and avoids touching every pixel
+    step = max(1, min(img_array.shape[0], img_array.shape[1]) // 128)
+    sample = img_array[::step, ::step].astype(np.int16)
+
+    # Empty fill is near-white or near-black with no colour variation
+    channel_spread = sample.max(axis=2) - sample.min(axis=2)
+    brightness = sample.mean(axis=2)
+    empty = (channel_spread < 6) & ((brightness > 245) | (brightness < 10))
+    coverage = 1.0 - float(empty.mean())
+
+    if brightness.std() < min_std:
+        return True, coverage
+    return coverage < min_coverage, coverage
+
+def is_blank_image_bytes(data):
+    """Run blank detection on encoded image bytes, checking known placeholder hashes first.
+
+    Returns:
+        tuple: (is_blank, sha1 hash of the bytes)
+    """
+    image_hash = hashlib.sha1(data).hexdigest()
+    if image_hash in _get_placeholder_hashes():
+        return True, image_hash
+    with Image.open(io.BytesIO(data)) as img:
+        blank, _ = is_blank_image(np.asarray(img.convert('RGB')))
+    return blank, image_hash
+
 def check_tile_availability(year, lat, lon, size_degrees):
     """Check if aerial imagery is available for the given location and year"""
     bbox = calculate_bbox(lat, lon, size_degrees)
+    if has_no_coverage(year, bbox):
+        logger.debug(f"Skipping year {year}: cached as having no coverage")
+        return False
+    if os.path.exists(get_preview_path(year, bbox)):
+        # A speculative preview already proved this year has imagery
+        return True
     
     # First check feature info to get more details about the location
     # feature_info = get_feature_info(bbox, 0, 0, str(year))
     # if feature_info:
     #     logger.debug(f"Feature info for year {year}: {feature_info}")
     
+    # Fetch a small thumbnail so placeholder and empty responses can be told apart
     url = (
         f"{BASE_URL}?service=WMS&request=GetMap&layers={year}&styles=&format=image/jpeg"
-        f"&transparent=false&version=1.1.1&width=1&height=1"
+        f"&transparent=false&version=1.1.1&width=64&height=64"
         f"&srs=EPSG:4326&bbox={bbox}"
     )
     try:
-        response = requests.head(url, headers=HEADERS, timeout=5)
-        return response.status_code == 200
-    except:
+        response = requests.get(url, headers=HEADERS, timeout=5)
+        if response.status_code != 200:
+            return False
+        blank, image_hash = is_blank_image_bytes(response.content)
+        if blank:
+            record_no_coverage(year, bbox)
+            return False
+        return True
+    except (requests.RequestException, OSError) as e:
+        logger.debug(f"Availability check failed for year {year}: {e}")
         return False
 
 def get_available_years(lat, lon, size_degrees):
@@ -315,6 +807,215 @@ def get_available_years(lat, lon, size_degrees):
             available_years.append(year)
     return available_years
 
+# Speculative previews fetched while the user is still choosing a location
+PREVIEW_FOLDER = os.path.join(CACHE_FOLDER, "previews")
+PREVIEW_SIZE = 128
+PREVIEW_WORKERS = 4
+
+def get_preview_path(year, bbox, size=PREVIEW_SIZE):
+    """Path of the cached low-resolution preview for a year and bbox"""
+    return os.path.join(PREVIEW_FOLDER, str(year), f"{hashlib.sha1(bbox.encode()).hexdigest()}_{size}.jpg")
+
+def fetch_preview(year, bbox, config=None, is_current=lambda: True, size=PREVIEW_SIZE):
+    """Fetch (or reuse) a low-resolution preview, which doubles as an availability probe.
+    
+    Args:
+        year: Year of the imagery
+        bbox: Bounding box string
+        config: Application configuration; when given, stored images covering the bbox are reused
+        is_current: Callable returning False once the request has been superseded
+        size: Preview width/height in pixels
+        
+    Returns:
+        str: Path of the preview image, or None if the year has no coverage or the request was dropped
+    """
+    preview_path = get_preview_path(year, bbox, size)
+    if os.path.exists(preview_path):
+        return preview_path
+    if has_no_coverage(year, bbox) or not is_current():
+        return None
+    
+    os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+    if config is not None:
+        match = find_covering_image(bbox, year, size, config)
+        if match is not None:
+            crop_from_existing(match[0], match[1], bbox, size, preview_path)
+            return preview_path
+    
+    url = (
+        f"{BASE_URL}?service=WMS&request=GetMap&layers={year}&styles=&format=image/jpeg"
+        f"&transparent=false&version=1.1.1&width={size}&height={size}"
+        f"&srs=EPSG:4326&bbox={bbox}"
+    )
+    try:
+        response = requests.get(url, headers=HEADERS, timeout=10)
+    except Exception as e:
+        logger.debug(f"Preview fetch failed for {year}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    blank, image_hash = is_blank_image_bytes(response.content)
+    if blank:
+        record_no_coverage(year, bbox)
+        return None
+    # Results for a location the user already left are still cached, just not waited on
+    tmp_path = f"{preview_path}.{threading.get_ident()}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_path, preview_path)
+    return preview_path
+
+@st.cache_resource(show_spinner=False)
+def get_preview_executor(max_workers=PREVIEW_WORKERS):
+    """Thread pool for preview fetches, shared by all sessions of the server process"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preview")
+
+class PreviewPrefetcher:
+    """Fetches previews for every year of a session's most recently selected location.
+    
+    Selecting a new location cancels the queued fetches for the previous one,
+    and fetches already running stop before touching the network again.
+    """
+    
+    def __init__(self, executor):
+        self.executor = executor
+        self.lock = threading.Lock()
+        self.bbox = None
+        self.futures = {}
+    
+    def request(self, lat, lon, size, config=None):
+        """Start prefetching previews for a location unless it is already being fetched"""
+        bbox = calculate_bbox(lat, lon, size)
+        with self.lock:
+            if bbox == self.bbox:
+                return bbox
+            for future in self.futures.values():
+                future.cancel()
+            self.bbox = bbox
+            is_current = lambda: self.bbox == bbox
+            # Newest years first: they are the most likely to have coverage
+            self.futures = {
+                year: self.executor.submit(fetch_preview, year, bbox, config, is_current)
+                for year, _ in sorted(aerials, key=lambda x: x[0], reverse=True)
+            }
+        logger.debug(f"Prefetching previews for {bbox}")
+        return bbox
+    
+    def results(self, bbox):
+        """Get the state of the previews for a location.
+        
+        Returns:
+            dict: Mapping of year to preview path, None (no coverage) or "pending";
+                empty if the location has since been replaced by another
+        """
+        with self.lock:
+            if bbox != self.bbox:
+                return {}
+            futures = dict(self.futures)
+        results = {}
+        for year, future in futures.items():
+            if not future.done():
+                results[year] = "pending"
+            else:
+                try:
+                    results[year] = future.result()
+                except Exception as e:
+                    logger.debug(f"Preview for {year} failed: {e}")
+                    results[year] = None
+        return results
+
+def get_preview_prefetcher():
+    """This session's preview prefetcher, running on the shared preview thread pool.
+    
+    Each session keeps its own location and pending fetches in session state,
+    so one user moving elsewhere never cancels another user's previews.
+    """
+    if "preview_prefetcher" not in st.session_state:
+        st.session_state.preview_prefetcher = PreviewPrefetcher(get_preview_executor())
+    return st.session_state.preview_prefetcher
+
+# Per-year imagery metadata (flight date, source) from GetFeatureInfo
+FEATURE_INFO_CACHE = "feature_info.json"
+PROJECT_METADATA_FILE = "metadata.json"
+METADATA_WORKERS = 6
+METADATA_LOCATION_PRECISION = 4  # Decimal places of the cache key (about 10 m)
+_feature_info = None
+_feature_info_lock = threading.Lock()
+
+def _get_feature_info_cache():
+    global _feature_info
+    if _feature_info is None:
+        _feature_info = load_json_cache(FEATURE_INFO_CACHE)
+    return _feature_info
+
+def parse_feature_metadata(info):
+    """Pull the flight date and source out of a GetFeatureInfo response"""
+    features = (info or {}).get("features") or []
+    properties = (features[0].get("properties") or {}) if features else {}
+    metadata = {"properties": {key: str(value)[:100] for key, value in properties.items()}}
+    for key, value in properties.items():
+        name = key.lower()
+        if "date" not in metadata and ("date" in name or name in ("acquired", "flown")) and value:
+            metadata["date"] = str(value)[:40]
+        elif "source" not in metadata and any(word in name for word in ("source", "agency", "provider", "vendor")) and value:
+            metadata["source"] = str(value)[:40]
+    return metadata
+
+def get_year_metadata(year, lat, lon, size_degrees):
+    """Metadata for one year's imagery at a location, cached persistently by (layer, location).
+    
+    Known locations are never queried again; failed queries are not cached.
+    """
+    global _feature_info
+    key = f"{year}|{round(lat, METADATA_LOCATION_PRECISION)},{round(lon, METADATA_LOCATION_PRECISION)}"
+    with _feature_info_lock:
+        cached = _get_feature_info_cache().get(key)
+        if cached is None:
+            # Another worker process may have fetched it since the cache was loaded
+            _feature_info = {**_feature_info, **load_json_cache(FEATURE_INFO_CACHE)}
+            cached = _feature_info.get(key)
+    if cached is not None:
+        return cached
+    
+    info = get_feature_info(calculate_bbox(lat, lon, size_degrees), 0, 0, str(year))
+    if info is None:
+        return {}
+    metadata = parse_feature_metadata(info)
+    # Merge into the on-disk cache so concurrent workers keep each other's entries
+    saved = update_json_cache(FEATURE_INFO_CACHE, lambda cache: {**cache, key: metadata})
+    with _feature_info_lock:
+        _feature_info = {**_get_feature_info_cache(), **saved}
+    return metadata
+
+def fetch_location_metadata(lat, lon, size_degrees, years, max_workers=METADATA_WORKERS):
+    """Fetch the metadata of several years at a location concurrently.
+    
+    Returns:
+        dict: Mapping of year to metadata dict
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda year: get_year_metadata(year, lat, lon, size_degrees), years)
+        return dict(zip(years, results))
+
+def format_metadata_caption(metadata):
+    """Short caption (flight date and source) for a year's metadata, or None"""
+    parts = [metadata[key] for key in ("date", "source") if metadata.get(key)]
+    return " | ".join(parts) if parts else None
+
+def save_project_metadata(project_folder, metadata):
+    """Store a project's per-year metadata in its folder"""
+    save_json_file(
+        os.path.join(project_folder, PROJECT_METADATA_FILE),
+        {str(year): entry for year, entry in metadata.items()}
+    )
+    invalidate_project_cache(project_folder)
+
+def get_project_captions(project_folder):
+    """Label captions of a project as {year: caption}, for years with known metadata"""
+    metadata = load_json_file(os.path.join(project_folder, PROJECT_METADATA_FILE), {})
+    captions = {int(year): format_metadata_caption(entry) for year, entry in metadata.items()}
+    return {year: caption for year, caption in captions.items() if caption}
+
 # Load previous projects if available
 def load_config():
     """Load configuration from file"""
@@ -334,12 +1035,34 @@ def load_config():
 def save_config(config):
     """Save configuration to file"""
     try:
-        with open(CONFIG_FILE, 'w') as f:
+        # Write to a temporary file first so concurrent readers never see a partial file
+        tmp_path = f"{CONFIG_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(config, f, indent=4)
-            logger.info("Configuration saved successfully")
+        os.replace(tmp_path, CONFIG_FILE)
+        logger.info("Configuration saved successfully")
     except Exception as e:
         logger.error(f"Error saving configuration: {e}")
 
+def update_config(update):
+    """Apply a change to the saved configuration under a lock.
+    
+    Workers, the API and the UI all modify config.json, so changes are
+    applied to a freshly loaded copy while holding the lock rather than
+    saving a copy loaded earlier, which would drop other processes' updates.
+    
+    Args:
+        update: Function that modifies the config dict in place
+        
+    Returns:
+        dict: The saved configuration
+    """
+    with locked_file(CONFIG_FILE):
+        config = load_config()
+        update(config)
+        save_config(config)
+    return config
+
 # Calculate bounding box from center point
 def calculate_bbox(center_lat, center_lon, size_degrees=0.005):
     half_size = size_degrees / 2
@@ -349,36 +1072,572 @@ def calculate_bbox(center_lat, center_lon, size_degrees=0.005):
     maxlat = center_lat + half_size
     return f"{minlon},{minlat},{maxlon},{maxlat}"
 
-# Download image function
-def download_image(year, layer_type, bbox, project_folder, status_placeholder):
-    """Downloads an image for the specified year and layer type."""
-    logger.info(f"Downloading image for year {year} in project folder {project_folder}")
+def parse_bbox(bbox):
+    """Parse a 'minlon,minlat,maxlon,maxlat' string into a tuple of floats"""
+    minlon, minlat, maxlon, maxlat = (float(v) for v in bbox.split(","))
+    return minlon, minlat, maxlon, maxlat
+
+# Spatial index over the extents of stored projects and seeded mirror tiles
+EXTENT_INDEX_CELL = 0.01  # Grid cell size in degrees
+REUSE_EXTENT_TOLERANCE = 1e-7  # Degrees a new bbox may stick out of a stored image (bbox rounding)
+MIRROR_FOLDER = os.path.join(CACHE_FOLDER, "mirror")
+MIRROR_INDEX = os.path.join(MIRROR_FOLDER, "index.json")
+MIRROR_MAX_TILE_PIXELS = 4096  # Largest GetMap width/height the WMS serves
+DEFAULT_PROJECT_SIZE = 0.005  # Degrees, the default area size in the New Project view
+# Pixels per degree of seeded tiles: Medium quality (1024px) for default-size projects
+MIRROR_RESOLUTION = 1024 / DEFAULT_PROJECT_SIZE
+_extent_index = {"signature": None, "cells": {}}
+
+def _extent_cells(extent, cell_size=EXTENT_INDEX_CELL):
+    """Yield the grid cells touched by an extent"""
+    minlon, minlat, maxlon, maxlat = extent
+    for cx in range(int(np.floor(minlon / cell_size)), int(np.floor(maxlon / cell_size)) + 1):
+        for cy in range(int(np.floor(minlat / cell_size)), int(np.floor(maxlat / cell_size)) + 1):
+            yield cx, cy
+
+def load_mirror_index():
+    """Load the index of seeded mirror tiles: {bbox: {"image_size": n, "years": {year: path}}}"""
+    return load_json_file(MIRROR_INDEX, {"tiles": {}})
+
+def save_mirror_index(index):
+    """Save the index of seeded mirror tiles, merged with tiles other workers saved meanwhile.
+    
+    Where both have a tile, the larger image size wins; at equal sizes their
+    years are combined.
+    """
+    def merge(saved):
+        for bbox, tile in index["tiles"].items():
+            entry = saved["tiles"].get(bbox)
+            if entry is None or tile["image_size"] > entry["image_size"]:
+                saved["tiles"][bbox] = {"image_size": tile["image_size"], "years": dict(tile["years"])}
+            elif tile["image_size"] == entry["image_size"]:
+                entry["years"].update(tile["years"])
+        return saved
+    
+    os.makedirs(MIRROR_FOLDER, exist_ok=True)
+    update_json_file(MIRROR_INDEX, merge, {"tiles": {}})
+
+def get_extent_index(config):
+    """Get the grid index of stored image extents, rebuilding it only when they change.
+
+    Covers project downloads and tiles seeded into the local mirror.
+
+    Args:
+        config: Application configuration with the list of projects
+
+    Returns:
+        dict: Mapping of grid cell to a list of (extent, source key, {year: image path}) entries
+    """
+    mirror_mtime = os.path.getmtime(MIRROR_INDEX) if os.path.exists(MIRROR_INDEX) else None
+    signature = hash((mirror_mtime, tuple(
+        (p.get("name"), p.get("bbox"), tuple(p.get("years", [])))
+        for p in config.get("projects", [])
+    )))
+    if _extent_index["signature"] == signature:
+        return _extent_index["cells"]
+
+    sources = []
+    for project in config.get("projects", []):
+        if not project.get("bbox"):
+            continue
+        name = project["name"]
+        paths = {year: os.path.join(OUTPUT_FOLDER, name, f"{year}_{name}.jpg") for year in project.get("years", [])}
+        sources.append((project["bbox"], name, paths))
+    for bbox, tile in load_mirror_index()["tiles"].items():
+        sources.append((bbox, f"mirror:{bbox}", {int(year): path for year, path in tile["years"].items()}))
+
+    cells = {}
+    for bbox, key, paths in sources:
+        try:
+            extent = parse_bbox(bbox)
+        except ValueError:
+            logger.warning(f"Skipping stored extent with invalid bbox: {key}")
+            continue
+        for cell in _extent_cells(extent):
+            cells.setdefault(cell, []).append((extent, key, paths))
+
+    _extent_index["signature"] = signature
+    _extent_index["cells"] = cells
+    logger.debug(f"Rebuilt extent index with {len(sources)} sources in {len(cells)} cells")
+    return cells
+
+def find_covering_image(bbox, year, image_size, config, exclude_project=None):
+    """Find a stored image (project download or mirror tile) that covers the given bbox.
+
+    Args:
+        bbox: Requested bounding box string
+        year: Year of the requested imagery
+        image_size: Requested output width/height in pixels
+        config: Application configuration with the list of projects
+        exclude_project: Name of a project to ignore (usually the one being created)
+
+    Returns:
+        tuple: (image path, source extent) of the best candidate, or None
+    """
+    target = parse_bbox(bbox)
+    target_area = (target[2] - target[0]) * (target[3] - target[1])
+    if target_area <= 0:
+        return None
+    # Pixels per degree needed to produce the requested output without upscaling
+    required_resolution = image_size / (target[2] - target[0])
+
+    cells = get_extent_index(config)
+    seen = set()
+    best = None
+    for cell in _extent_cells(target):
+        for extent, key, paths in cells.get(cell, []):
+            if key in seen or key == exclude_project:
+                continue
+            seen.add(key)
+            image_path = paths.get(year)
+            if image_path is None:
+                continue
+
+            # The stored image must contain the whole requested bbox, or the crop would be padded
+            if (target[0] < extent[0] - REUSE_EXTENT_TOLERANCE or target[1] < extent[1] - REUSE_EXTENT_TOLERANCE
+                    or target[2] > extent[2] + REUSE_EXTENT_TOLERANCE or target[3] > extent[3] + REUSE_EXTENT_TOLERANCE):
+                continue
+
+            if not os.path.exists(image_path):
+                continue
+            try:
+                # Only the header is read here, not the pixel data
+                with Image.open(image_path) as img:
+                    source_width = img.width
+            except Exception as e:
+                logger.warning(f"Could not read stored image {image_path}: {e}")
+                continue
+            resolution = source_width / (extent[2] - extent[0])
+            # Small tolerance for rounding in the bbox strings
+            if resolution < required_resolution * 0.999:
+                continue
+
+            if best is None or resolution > best[0]:
+                best = (resolution, image_path, extent)
+
+    if best is None:
+        return None
+    return best[1], best[2]
+
+def crop_from_existing(source_path, source_extent, bbox, image_size, output_path):
+    """Crop and resample the requested bbox out of a stored image."""
+    target = parse_bbox(bbox)
+    with Image.open(source_path) as img:
+        img = img.convert('RGB')
+        x_scale = img.width / (source_extent[2] - source_extent[0])
+        y_scale = img.height / (source_extent[3] - source_extent[1])
+        box = (
+            int(round((target[0] - source_extent[0]) * x_scale)),
+            int(round((source_extent[3] - target[3]) * y_scale)),
+            int(round((target[2] - source_extent[0]) * x_scale)),
+            int(round((source_extent[3] - target[1]) * y_scale)),
+        )
+        cropped = img.crop(box).resize((image_size, image_size), Image.LANCZOS)
+        cropped.save(output_path, quality=95)
+
+# Region seeding for the local imagery mirror
+def point_in_polygon(lon, lat, polygon):
+    """Ray-casting test for a point inside a polygon given as [[lon, lat], ...]"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i][0], polygon[i][1]
+        xj, yj = polygon[j][0], polygon[j][1]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+def plan_seed_tiles(region, grid_size, overlap):
+    """Plan overlapping tile bboxes covering a region.
+    
+    Any box up to `overlap` degrees wide inside the region falls entirely
+    within at least one tile, so later projects of that size can be cropped
+    from the mirror without touching the network.
+    
+    Args:
+        region: Bbox string 'minlon,minlat,maxlon,maxlat' or polygon [[lon, lat], ...]
+        grid_size: Tile width/height in degrees
+        overlap: Overlap between neighbouring tiles in degrees
+        
+    Returns:
+        list: Bbox strings of the tiles
+    """
+    if isinstance(region, str):
+        minlon, minlat, maxlon, maxlat = parse_bbox(region)
+        polygon = None
+    else:
+        polygon = [[float(p[0]), float(p[1])] for p in region]
+        lons = [p[0] for p in polygon]
+        lats = [p[1] for p in polygon]
+        minlon, minlat, maxlon, maxlat = min(lons), min(lats), max(lons), max(lats)
+    
+    step = grid_size - overlap
+    if step <= 0:
+        raise ValueError("Tile overlap must be smaller than the grid size")
+    
+    tiles = []
+    lat = minlat - overlap / 2
+    while lat < maxlat:
+        lon = minlon - overlap / 2
+        while lon < maxlon:
+            extent = (lon, lat, lon + grid_size, lat + grid_size)
+            if polygon is None or _tile_touches_polygon(extent, polygon):
+                tiles.append(f"{extent[0]:.8f},{extent[1]:.8f},{extent[2]:.8f},{extent[3]:.8f}")
+            lon += step
+        lat += step
+    return tiles
+
+def _tile_touches_polygon(extent, polygon):
+    minlon, minlat, maxlon, maxlat = extent
+    probes = [(minlon, minlat), (maxlon, minlat), (minlon, maxlat), (maxlon, maxlat),
+              ((minlon + maxlon) / 2, (minlat + maxlat) / 2)]
+    if any(point_in_polygon(lon, lat, polygon) for lon, lat in probes):
+        return True
+    return any(minlon <= p[0] <= maxlon and minlat <= p[1] <= maxlat for p in polygon)
+
+def fetch_mirror_tile(year, bbox, image_size, output_path, retries=3, backoff=5.0):
+    """Fetch one tile for the mirror, retrying politely on server errors.
+    
+    Returns:
+        str: "ok", "blank" or "failed"
+    """
     url = (
         f"{BASE_URL}?service=WMS&request=GetMap&layers={year}&styles=&format=image/jpeg"
-        f"&transparent=false&version=1.1.1&width=512&height=512"
+        f"&transparent=false&version=1.1.1&width={image_size}&height={image_size}"
         f"&srs=EPSG:4326&bbox={bbox}"
     )
-    try:
-        response = requests.get(url, headers=HEADERS, stream=True)
-        if response.status_code == 200:
-            # Extract project name from folder path
-            project_name = os.path.basename(project_folder)
+    for attempt in range(retries):
+        try:
+            response = requests.get(url, headers=HEADERS, timeout=60)
+            if response.status_code == 200:
+                blank, image_hash = is_blank_image_bytes(response.content)
+                if blank:
+                    record_no_coverage(year, bbox, image_hash)
+                    return "blank"
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                with open(output_path, "wb") as f:
+                    f.write(response.content)
+                return "ok"
+            if response.status_code not in (429, 500, 502, 503, 504):
+                logger.warning(f"Mirror tile {year} {bbox} failed: {response.status_code}")
+                return "failed"
+        except Exception as e:
+            logger.warning(f"Error fetching mirror tile {year} {bbox}: {e}")
+        # Back off before retrying so a struggling server is not hammered
+        time.sleep(backoff * (2 ** attempt))
+    return "failed"
+
+def get_seed_tile_pixels(grid_size, resolution=MIRROR_RESOLUTION):
+    """Pixel size of seeded tiles for a grid size and target resolution, capped at the WMS limit"""
+    return min(MIRROR_MAX_TILE_PIXELS, int(np.ceil(grid_size * resolution)))
+
+def seed_region(region, grid_size, overlap, years, status_placeholder, resolution=MIRROR_RESOLUTION, delay=1.0):
+    """Fetch every tile covering a region into the local mirror, resuming where a previous run stopped.
+    
+    Args:
+        region: Bbox string or polygon [[lon, lat], ...]
+        grid_size: Tile width/height in degrees
+        overlap: Overlap between neighbouring tiles in degrees (the largest project size served)
+        years: Years from `aerials` to fetch
+        status_placeholder: Status reporter with write() (and optionally set_progress())
+        resolution: Target pixels per degree; projects are only served from tiles at least as
+            sharp as they need (image size / project size)
+        delay: Seconds to wait between requests
+        
+    Returns:
+        dict: Counts of fetched, skipped, blank and failed tiles
+    """
+    tiles = plan_seed_tiles(region, grid_size, overlap)
+    valid_years = {year for year, _ in aerials}
+    years = [int(y) for y in years if int(y) in valid_years]
+    total = len(tiles) * len(years)
+    image_size = get_seed_tile_pixels(grid_size, resolution)
+    effective = image_size / grid_size
+    if effective < resolution:
+        status_placeholder.write(
+            f"⚠️ {grid_size}° tiles are capped at {MIRROR_MAX_TILE_PIXELS}px ({effective:,.0f} px/degree); "
+            f"use a grid of {MIRROR_MAX_TILE_PIXELS / resolution:.4f}° or less for {resolution:,.0f} px/degree"
+        )
+    status_placeholder.write(
+        f"Seeding {len(tiles)} tiles x {len(years)} years ({total} requests) at {image_size}px, "
+        f"serving {DEFAULT_PROJECT_SIZE}° projects up to {int(effective * DEFAULT_PROJECT_SIZE)}px"
+    )
+    logger.info(f"Seeding region with {len(tiles)} {image_size}px tiles for years {years}")
+    
+    index = load_mirror_index()
+    counts = {"fetched": 0, "skipped": 0, "blank": 0, "failed": 0}
+    done = 0
+    for bbox in tiles:
+        tile = index["tiles"].setdefault(bbox, {"image_size": image_size, "years": {}})
+        if tile["image_size"] < image_size:
+            # Seeded earlier at a lower resolution: fetch every year again
+            tile.update(image_size=image_size, years={})
+        for year in years:
+            done += 1
+            output_path = os.path.join(MIRROR_FOLDER, str(year), f"{hashlib.sha1(bbox.encode()).hexdigest()}.jpg")
             
-            # Use consistent filename pattern
-            filename = f"{year}_{project_name}.jpg"
-            filepath = os.path.join(project_folder, filename)
+            # Resume: anything already fetched or known to be empty is skipped
+            if (str(year) in tile["years"] and os.path.exists(output_path)) or has_no_coverage(year, bbox):
+                counts["skipped"] += 1
+                continue
             
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
+            result = fetch_mirror_tile(year, bbox, image_size, output_path)
+            if result == "ok":
+                tile["years"][str(year)] = output_path
+                counts["fetched"] += 1
+                if counts["fetched"] % 10 == 0:
+                    save_mirror_index(index)
+            else:
+                counts[result] += 1
             
-            # Log the exact path where the file was saved
-            logger.info(f"Image saved to: {filepath}")
-            status_placeholder.write(f"✅ Downloaded: {filename}")
-            logger.success(f"Successfully downloaded image: {filename}")
-            return True
-        else:
-            error_msg = f"Failed to download {year} {layer_type}: {response.status_code}"
+            status_placeholder.write(f"Seeding {done}/{total}: {year} {bbox} ({result})")
+            if hasattr(status_placeholder, "set_progress"):
+                status_placeholder.set_progress(done / total)
+            time.sleep(delay)
+    
+    save_mirror_index(index)
+    status_placeholder.write(
+        f"✅ Seeding complete: {counts['fetched']} fetched, {counts['skipped']} already cached, "
+        f"{counts['blank']} without coverage, {counts['failed']} failed"
+    )
+    return counts
+
+# Flyover routes: panning timelapses along a polyline
+ROUTE_TILE_FACTOR = 3  # Fetched tiles are this many view boxes wide
+ROUTE_MAX_TILE_PIXELS = 2048
+FLYOVER_MODES = ["pan", "sweep"]
+
+def parse_route(route):
+    """Route points as [(lon, lat), ...] from GeoJSON (LineString, Feature or FeatureCollection) or a list of points"""
+    if isinstance(route, str):
+        route = json.loads(route)
+    if isinstance(route, dict):
+        if route.get("type") == "FeatureCollection":
+            route = route["features"][0]
+        if route.get("type") == "Feature":
+            route = route["geometry"]
+        if route.get("type") == "MultiLineString":
+            route = {"coordinates": [point for line in route["coordinates"] for point in line]}
+        route = route["coordinates"]
+    points = [(float(p[0]), float(p[1])) for p in route]
+    if len(points) < 2:
+        raise ValueError("A route needs at least two points")
+    return points
+
+def sample_route(points, spacing):
+    """Evenly spaced positions along a polyline, including both ends"""
+    samples = [points[0]]
+    carried = 0.0
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        length = float(np.hypot(x1 - x0, y1 - y0))
+        distance = spacing - carried
+        while distance <= length:
+            t = distance / length
+            samples.append((x0 + (x1 - x0) * t, y0 + (y1 - y0) * t))
+            distance += spacing
+        carried = length - (distance - spacing)
+    if samples[-1] != points[-1]:
+        samples.append(points[-1])
+    return samples
+
+def plan_route_tiles(points, box_size, tile_factor=ROUTE_TILE_FACTOR):
+    """Plan overlapping tiles along a route so every view box on it lies inside one tile.
+    
+    Tile centers are spaced (tile size - box size) apart along the route, so
+    the number of requests grows with the route's length, not the number of
+    frames rendered.
+    
+    Returns:
+        list: (center, bbox string) of each tile, in route order
+    """
+    tile_size = box_size * tile_factor
+    half = tile_size / 2
+    return [
+        ((lon, lat), f"{lon - half:.8f},{lat - half:.8f},{lon + half:.8f},{lat + half:.8f}")
+        for lon, lat in sample_route(points, tile_size - box_size)
+    ]
+
+def fetch_route_tiles(tiles, years, tile_pixels, status_placeholder, delay=0.1):
+    """Fetch route tiles through the shared mirror, skipping tiles already stored.
+    
+    Returns:
+        dict: Mapping of year to the list of tile image paths (years missing any tile are left out)
+    """
+    index = load_mirror_index()
+    paths = {}
+    total = len(tiles) * len(years)
+    done = 0
+    for year in years:
+        year_paths = []
+        for _, bbox in tiles:
+            done += 1
+            tile = index["tiles"].setdefault(bbox, {"image_size": tile_pixels, "years": {}})
+            output_path = os.path.join(MIRROR_FOLDER, str(year), f"{hashlib.sha1(bbox.encode()).hexdigest()}.jpg")
+            if not (str(year) in tile["years"] and os.path.exists(output_path)):
+                if has_no_coverage(year, bbox) or fetch_mirror_tile(year, bbox, tile_pixels, output_path) != "ok":
+                    status_placeholder.write(f"⚠️ {year} has no imagery along part of the route, skipping it")
+                    done += len(tiles) - len(year_paths) - 1
+                    break
+                tile["years"][str(year)] = output_path
+                time.sleep(delay)
+            year_paths.append(output_path)
+            if hasattr(status_placeholder, "set_progress"):
+                status_placeholder.set_progress(0.5 * done / total)
+        else:
+            paths[year] = year_paths
+        status_placeholder.write(f"Route imagery for {year}: {'ready' if year in paths else 'unavailable'}")
+    save_mirror_index(index)
+    return paths
+
+def crop_route_view(tile_array, tile_center, tile_size, view_center, box_size, output_size):
+    """Resample a view box out of a tile with sub-pixel precision, for smooth panning"""
+    tile_pixels = tile_array.shape[1]
+    scale = tile_pixels / tile_size
+    # View box top-left corner in tile pixels (image rows run north to south)
+    x0 = (view_center[0] - box_size / 2 - (tile_center[0] - tile_size / 2)) * scale
+    y0 = ((tile_center[1] + tile_size / 2) - (view_center[1] + box_size / 2)) * scale
+    zoom = output_size / (box_size * scale)
+    matrix = np.float32([[zoom, 0, -x0 * zoom], [0, zoom, -y0 * zoom]])
+    return cv2.warpAffine(tile_array, matrix, (output_size, output_size), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+
+def render_flyover(route, box_size, years, output_path, status_placeholder, mode="pan", output_size=512,
+                   boxes_per_second=1.0, delay=0.1):
+    """Render a panning timelapse along a route.
+    
+    In "pan" mode the camera travels the whole route once per year, oldest
+    year first; in "sweep" mode it travels once while the year advances
+    with the distance covered. Views are cropped from a few overlapping
+    tiles fetched once through the shared mirror.
+    
+    Args:
+        route: GeoJSON or list of [lon, lat] points
+        box_size: View box width/height in degrees
+        years: Years to include
+        output_path: Path of the video to write
+        status_placeholder: Status reporter with write()
+        mode: "pan" or "sweep"
+        output_size: Video width/height in pixels
+        boxes_per_second: Camera speed in view boxes per second
+        delay: Seconds to wait between tile requests
+        
+    Returns:
+        dict: Years rendered, frame count and tile count
+    """
+    if mode not in FLYOVER_MODES:
+        raise ValueError(f"Unknown flyover mode: {mode}")
+    points = parse_route(route)
+    tiles = plan_route_tiles(points, box_size)
+    tile_size = box_size * ROUTE_TILE_FACTOR
+    tile_pixels = min(ROUTE_MAX_TILE_PIXELS, output_size * ROUTE_TILE_FACTOR)
+    status_placeholder.write(f"Route planned: {len(tiles)} tiles per year")
+    
+    tile_paths = fetch_route_tiles(tiles, sorted(int(y) for y in years), tile_pixels, status_placeholder, delay)
+    available_years = sorted(tile_paths)
+    if not available_years:
+        raise RuntimeError("No year has imagery along the whole route")
+    
+    cameras = sample_route(points, box_size * boxes_per_second / VIDEO_FPS)
+    if mode == "pan":
+        schedule = [(year, camera) for year in available_years for camera in cameras]
+    else:
+        schedule = [(available_years[min(len(available_years) - 1, i * len(available_years) // len(cameras))], camera)
+                    for i, camera in enumerate(cameras)]
+    
+    font = load_label_font(font_size=max(18, output_size // 20))
+    loaded = {}
+    tile_index = 0
+    previous_year = None
+    writer = FFMPEG_VideoWriter(output_path, (output_size, output_size), VIDEO_FPS, codec="libx264", pixel_format="yuv420p")
+    try:
+        for i, (year, camera) in enumerate(schedule):
+            if year != previous_year:
+                # Tiles are visited in route order, so only the current ones stay decoded
+                tile_index, previous_year = 0, year
+                loaded.clear()
+            # Advance to the nearest tile (it always contains the whole view box)
+            while tile_index + 1 < len(tiles) and (
+                max(abs(camera[0] - tiles[tile_index + 1][0][0]), abs(camera[1] - tiles[tile_index + 1][0][1]))
+                <= max(abs(camera[0] - tiles[tile_index][0][0]), abs(camera[1] - tiles[tile_index][0][1]))
+            ):
+                tile_index += 1
+                loaded.pop(tile_index - 2, None)
+            if tile_index not in loaded:
+                loaded[tile_index] = load_frame(tile_paths[year][tile_index])
+            view = crop_route_view(loaded[tile_index], tiles[tile_index][0], tile_size, camera, box_size, output_size)
+            writer.write_frame(label_frame(view, year, font))
+            if hasattr(status_placeholder, "set_progress") and i % VIDEO_FPS == 0:
+                status_placeholder.set_progress(0.5 + 0.5 * i / len(schedule))
+    finally:
+        writer.close()
+    record_artifact(output_path)
+    status_placeholder.write(f"✅ Flyover rendered: {output_path}")
+    return {"years": available_years, "frames": len(schedule), "tiles": len(tiles)}
+
+# Download image function
+def download_image(year, layer_type, bbox, project_folder, status_placeholder, image_size=512, config=None):
+    """Downloads an image for the specified year and layer type.
+
+    When a config is given, imagery already downloaded by an overlapping project
+    is cropped locally instead of being fetched again.
+    """
+    logger.info(f"Downloading image for year {year} in project folder {project_folder}")
+
+    if has_no_coverage(year, bbox):
+        status_placeholder.write(f"⏭️ Skipping {year}: no coverage at this location")
+        logger.info(f"Skipping download for year {year}: cached as having no coverage")
+        return False
+
+    if config is not None:
+        project_name = os.path.basename(project_folder)
+        try:
+            match = find_covering_image(bbox, year, image_size, config, exclude_project=project_name)
+            if match:
+                source_path, source_extent = match
+                filename = f"{year}_{project_name}.jpg"
+                crop_from_existing(source_path, source_extent, bbox, image_size, os.path.join(project_folder, filename))
+                record_artifact(os.path.join(project_folder, filename))
+                status_placeholder.write(f"♻️ Reused local imagery: {filename}")
+                logger.success(f"Cropped {filename} from existing image {source_path}")
+                return True
+        except Exception as e:
+            logger.warning(f"Could not reuse local imagery for {year}, downloading instead: {e}")
+
+    url = (
+        f"{BASE_URL}?service=WMS&request=GetMap&layers={year}&styles=&format=image/jpeg"
+        f"&transparent=false&version=1.1.1&width={image_size}&height={image_size}"
+        f"&srs=EPSG:4326&bbox={bbox}"
+    )
+    try:
+        response = requests.get(url, headers=HEADERS, stream=True)
+        if response.status_code == 200:
+            # Extract project name from folder path
+            project_name = os.path.basename(project_folder)
+            
+            # Use consistent filename pattern
+            filename = f"{year}_{project_name}.jpg"
+            filepath = os.path.join(project_folder, filename)
+            
+            data = b"".join(response.iter_content(1024))
+            
+            # Drop placeholder and mostly-empty responses before they reach later stages
+            blank, image_hash = is_blank_image_bytes(data)
+            if blank:
+                record_no_coverage(year, bbox, image_hash)
+                status_placeholder.write(f"⏭️ Skipping {year}: no coverage at this location")
+                return False
+            
+            with open(filepath, "wb") as f:
+                f.write(data)
+            record_artifact(filepath)
+            
+            # Log the exact path where the file was saved
+            logger.info(f"Image saved to: {filepath}")
+            status_placeholder.write(f"✅ Downloaded: {filename}")
+            logger.success(f"Successfully downloaded image: {filename}")
+            return True
+        else:
+            error_msg = f"Failed to download {year} {layer_type}: {response.status_code}"
             status_placeholder.write(f"❌ {error_msg}")
             logger.error(error_msg)
             return False
@@ -389,50 +1648,64 @@ def download_image(year, layer_type, bbox, project_folder, status_placeholder):
         return False
 
 # Function to reduce watermark
+def reduce_watermark_array(img_array):
+    """Reduces visibility of white text watermarks with black borders in an RGB frame.
+
+    Args:
+        img_array: RGB image as a numpy array (H x W x 3)
+
+    Returns:
+        New numpy array with watermark regions filled in
+    """
+    img_array = np.array(img_array, dtype=np.uint8, copy=True)
+    
+    # Create a mask for white-ish pixels (watermark text)
+    white_mask = np.all(img_array > 200, axis=2)
+    
+    # Create a mask for dark pixels (watermark borders)
+    dark_mask = np.all(img_array < 50, axis=2)
+    
+    # Combine masks to get watermark regions
+    watermark_mask = white_mask | dark_mask
+    
+    # Expand the mask slightly to catch all watermark pixels
+    watermark_mask = binary_dilation(watermark_mask, iterations=2)
+    
+    # For watermarked regions, replace with average of surrounding non-watermarked pixels
+    for i in range(img_array.shape[0]):
+        for j in range(img_array.shape[1]):
+            if watermark_mask[i, j]:
+                # Get surrounding pixels (5x5 window)
+                window_size = 5
+                half = window_size // 2
+                
+                i_start = max(0, i - half)
+                i_end = min(img_array.shape[0], i + half + 1)
+                j_start = max(0, j - half)
+                j_end = min(img_array.shape[1], j + half + 1)
+                
+                # Get non-watermarked pixels in window
+                window = img_array[i_start:i_end, j_start:j_end]
+                window_mask = watermark_mask[i_start:i_end, j_start:j_end]
+                valid_pixels = window[~window_mask]
+                
+                if len(valid_pixels) > 0:
+                    # Replace watermarked pixel with median of surrounding non-watermarked pixels
+                    img_array[i, j] = np.median(valid_pixels, axis=0)
+    
+    return img_array
+
 def reduce_watermark(input_path, output_path, status_placeholder):
     """Reduces visibility of white text watermarks with black borders in the image."""
     try:
         # Open the image
         img = Image.open(input_path).convert('RGB')
-        img_array = np.array(img)
-        
-        # Create a mask for white-ish pixels (watermark text)
-        white_mask = np.all(img_array > 200, axis=2)
-        
-        # Create a mask for dark pixels (watermark borders)
-        dark_mask = np.all(img_array < 50, axis=2)
-        
-        # Combine masks to get watermark regions
-        watermark_mask = white_mask | dark_mask
-        
-        # Expand the mask slightly to catch all watermark pixels
-        watermark_mask = binary_dilation(watermark_mask, iterations=2)
-        
-        # For watermarked regions, replace with average of surrounding non-watermarked pixels
-        for i in range(img_array.shape[0]):
-            for j in range(img_array.shape[1]):
-                if watermark_mask[i, j]:
-                    # Get surrounding pixels (5x5 window)
-                    window_size = 5
-                    half = window_size // 2
-                    
-                    i_start = max(0, i - half)
-                    i_end = min(img_array.shape[0], i + half + 1)
-                    j_start = max(0, j - half)
-                    j_end = min(img_array.shape[1], j + half + 1)
-                    
-                    # Get non-watermarked pixels in window
-                    window = img_array[i_start:i_end, j_start:j_end]
-                    window_mask = watermark_mask[i_start:i_end, j_start:j_end]
-                    valid_pixels = window[~window_mask]
-                    
-                    if len(valid_pixels) > 0:
-                        # Replace watermarked pixel with median of surrounding non-watermarked pixels
-                        img_array[i, j] = np.median(valid_pixels, axis=0)
+        img_array = reduce_watermark_array(np.array(img))
         
         # Save the processed image
         processed_img = Image.fromarray(img_array)
         processed_img.save(output_path, quality=95)
+        record_artifact(output_path)
         return True
     except Exception as e:
         status_placeholder.write(f"❌ Error processing image: {e}")
@@ -461,19 +1734,221 @@ def process_all_images(project_folder, status_placeholder):
                 error_count += 1
     
     logger.info(f"Image processing complete. Processed: {processed_count}, Errors: {error_count}")
+    invalidate_project_cache(project_folder)
     return processed_folder
 
+# Draft renders shown while the full-quality pipeline is still running
+DRAFT_SIZE = 256
+
+def get_draft_path(project_folder, project_name):
+    """Path of a project's draft preview animation"""
+    return os.path.join(project_folder, f"{project_name}_draft.gif")
+
+def render_draft(project_folder, project_name, bbox, years, frame_duration, status_placeholder, config=None):
+    """Render a small labeled animation from low-resolution fetches.
+    
+    Takes a couple of seconds instead of the minutes a full render needs, so
+    bad locations can be rejected early. The full render replaces it.
+    
+    Args:
+        project_folder: Folder of the project
+        project_name: Name of the project
+        bbox: Bounding box string
+        years: Years to include, in playback order
+        frame_duration: Duration of each frame in seconds
+        status_placeholder: Status reporter with write()
+        config: Application configuration, used to reuse stored imagery
+        
+    Returns:
+        str: Path of the draft animation, or None if no frames could be fetched
+    """
+    years = list(years)
+    with ThreadPoolExecutor(max_workers=PREVIEW_WORKERS) as executor:
+        paths = list(executor.map(lambda year: fetch_preview(year, bbox, config, size=DRAFT_SIZE), years))
+    
+    font = load_label_font(font_size=18)
+    frames = []
+    for year, path in zip(years, paths):
+        if path is None:
+            continue
+        with Image.open(path) as img:
+            frames.append(Image.fromarray(label_frame(np.asarray(img.convert('RGB')), year, font)))
+    if not frames:
+        return None
+    
+    draft_path = get_draft_path(project_folder, project_name)
+    tmp_path = f"{draft_path}.part"
+    frames[0].save(
+        tmp_path, format="GIF", save_all=True, append_images=frames[1:],
+        duration=int(frame_duration * 1000), loop=0
+    )
+    os.replace(tmp_path, draft_path)
+    status_placeholder.write(f"Draft preview ready ({len(frames)} frames)")
+    return draft_path
+
+# Crossfade transitions, blended on the fly into the encoder stream
+VIDEO_FPS = 24
+EASINGS = {
+    "linear": lambda t: t,
+    "ease-in": lambda t: t * t,
+    "ease-out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease-in-out": lambda t: t * t * (3 - 2 * t),
+}
+
+def load_frame(frame):
+    """RGB array for a frame given as an array, image path or archive member reference"""
+    if isinstance(frame, np.ndarray):
+        return frame
+    with open_image(frame) as img:
+        return np.asarray(img.convert('RGB'))
+
+def timeline_segment(previous, current, fps, frame_duration, transition=0.0, easing="linear"):
+    """Yield the output frames for one input frame of a timelapse.
+    
+    When a previous frame is given and transition is positive, the segment
+    starts with a crossfade from it; the current frame is then held for the
+    rest of its duration minus the next transition (see timeline_tail).
+    Only the two frames involved are ever held in memory.
+    """
+    transition = min(transition, frame_duration)
+    if previous is not None and transition > 0:
+        if previous.shape != current.shape:
+            previous = cv2.resize(previous, (current.shape[1], current.shape[0]), interpolation=cv2.INTER_AREA)
+        ease = EASINGS[easing]
+        steps = max(1, int(round(transition * fps)))
+        for step in range(steps):
+            alpha = ease((step + 1) / (steps + 1))
+            # Blends in uint8 without materializing float copies of the frames
+            yield cv2.addWeighted(previous, 1 - alpha, current, alpha, 0)
+    for _ in range(int(round((frame_duration - transition) * fps))):
+        yield current
+
+def timeline_tail(last, fps, transition=0.0):
+    """Yield the final hold that gives the last frame its full duration"""
+    for _ in range(int(round(transition * fps))):
+        yield last
+
+def iter_timeline(frames, fps, frame_duration, transition=0.0, easing="linear"):
+    """Yield every output frame of a timelapse with crossfades between input frames.
+    
+    Input frames are loaded one at a time, so memory stays constant however
+    long the video is.
+    """
+    previous = None
+    for frame in frames:
+        current = load_frame(frame)
+        yield from timeline_segment(previous, current, fps, frame_duration, transition, easing)
+        previous = current
+    if previous is not None:
+        yield from timeline_tail(previous, fps, min(transition, frame_duration))
+
+# Render cache: identical render requests return the video already on disk
+RENDER_INDEX_FILE = "renders.json"
+
+def get_source_signature(image_ref):
+    """Modification state of an image file, or of the archive holding it"""
+    if is_archive_ref(image_ref):
+        return get_file_signature(image_ref[len(ARCHIVE_REF_PREFIX):].rsplit("!", 1)[0])
+    return get_file_signature(image_ref)
+
+def get_render_fingerprint(project_name, sources, frame_duration, use_processed, use_stack, transition=0.0, easing="linear"):
+    """Fingerprint of everything that determines a rendered video.
+    
+    Args:
+        project_name: Name of the project
+        sources: List of (year, source signature) in frame order
+        frame_duration: Duration of each frame in seconds
+        use_processed: Whether processed images were requested
+        use_stack: Whether frames come from the frame stack
+        transition: Crossfade length in seconds
+        easing: Crossfade easing curve
+    """
+    payload = [project_name, sources, float(frame_duration), bool(use_processed), bool(use_stack)]
+    if transition:
+        payload += [float(transition), easing]
+    payload = json.dumps(payload)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def find_cached_render(project_folder, fingerprint):
+    """Path of an existing video rendered from the same inputs, or None"""
+    renders = load_json_file(os.path.join(project_folder, RENDER_INDEX_FILE), {})
+    video_path = renders.get(fingerprint)
+    if video_path and os.path.exists(video_path):
+        return video_path
+    return None
+
+def remember_render(project_folder, fingerprint, video_path):
+    """Record which video a render fingerprint produced"""
+    def update(renders):
+        # Drop entries whose videos were deleted or evicted
+        renders = {key: path for key, path in renders.items() if os.path.exists(path)}
+        renders[fingerprint] = video_path
+        return renders
+    
+    update_json_file(os.path.join(project_folder, RENDER_INDEX_FILE), update, {})
+
+def write_timelapse_video(frames, project_folder, project_name, frame_duration, status_placeholder, fingerprint=None,
+                          transition=0.0, easing="linear"):
+    """Encodes labeled frames (file paths or arrays) into a timestamped video in the project folder.
+    
+    With a transition, crossfades are blended frame by frame and streamed
+    straight to the encoder.
+    """
+    status_placeholder.write("Generating video from labeled images...")
+    
+    # Save video in the project folder with timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    video_filename = f"{project_name}_timelapse_{timestamp}.mp4"
+    video_path = os.path.join(project_folder, video_filename)
+    if transition > 0:
+        status_placeholder.write(f"Blending {transition:.1f}s {easing} transitions...")
+        size = load_frame(frames[0]).shape[1::-1]
+        writer = FFMPEG_VideoWriter(video_path, size, VIDEO_FPS, codec="libx264", pixel_format="yuv420p")
+        try:
+            for frame in iter_timeline(frames, VIDEO_FPS, frame_duration, transition, easing):
+                writer.write_frame(frame)
+        finally:
+            writer.close()
+    else:
+        base_clip = ImageSequenceClip(frames, durations=[frame_duration] * len(frames))
+        base_clip.write_videofile(video_path, fps=VIDEO_FPS, audio=False)
+    record_artifact(video_path)
+    if fingerprint:
+        remember_render(project_folder, fingerprint, video_path)
+    
+    invalidate_project_cache(project_folder)
+    success_msg = f"Timelapse video created: {video_path}"
+    status_placeholder.write(f"✅ {success_msg}")
+    logger.success(success_msg)
+    return video_path
+
 # Create timelapse video
 def create_timelapse(project_folder, project_name, status_placeholder, start_year=None, end_year=None, 
-                     frame_duration=1.0, use_processed=True, include_years=None):
-    """Creates a timelapse video from the downloaded images."""
+                     frame_duration=1.0, use_processed=True, include_years=None, use_stack=False, archive_path=None,
+                     transition=0.0, easing="linear"):
+    """Creates a timelapse video from the downloaded images.
+    
+    A positive transition crossfades between years over that many seconds
+    of each frame's duration, using the given easing curve. With use_stack,
+    frames are read as slices of the project's memory-mapped frame stack
+    instead of being decoded from the image files. With an archive_path,
+    projects whose images are no longer on disk are read straight from
+    their archive.
+    """
     logger.info(f"Creating timelapse for project: {project_name}")
     logger.debug(f"Parameters: start_year={start_year}, end_year={end_year}, frame_duration={frame_duration}, use_processed={use_processed}")
     
+    from_archive = bool(archive_path) and os.path.exists(archive_path) and not project_has_local_images(project_folder)
+    if from_archive:
+        # Labeled frames and the video are still written to the project folder
+        os.makedirs(project_folder, exist_ok=True)
+    
     # Determine source folder
     processed_folder = os.path.join(project_folder, "processed")
     source_folder = processed_folder if use_processed and os.path.exists(processed_folder) else project_folder
     logger.debug(f"Using source folder: {source_folder}")
+    touch_artifacts(project_name, "processed" if source_folder == processed_folder else "raw")
+    touch_artifacts(project_name, "stack" if use_stack else "text_images")
     
     # List all files in the directory to help debug
     all_files = os.listdir(source_folder)
@@ -496,30 +1971,70 @@ def create_timelapse(project_folder, project_name, status_placeholder, start_yea
     if include_years:
         sorted_aerials = [a for a in sorted_aerials if a[0] in include_years]
     
-    # Find all available images - try multiple filename patterns
-    for year, layer_type in sorted_aerials:
-        # Try different filename patterns
-        possible_patterns = [
-            f"{year}_{project_name}.jpg",
-            f"{year}_{layer_type}.jpg",
-            f"{year}.jpg"
-        ]
-        
-        found = False
-        for pattern in possible_patterns:
-            image_path = os.path.join(source_folder, pattern)
-            logger.info(f"Looking for image at: {image_path}")
-            status_placeholder.write(f"Looking for: {pattern}")
+    # Read frames straight from the memory-mapped stack when one is available
+    if use_stack:
+        stack_index = load_stack_index(project_folder)
+        if stack_index:
+            source_stage = "processed" if use_processed and "processed" in stack_index["stages"] else "raw"
+            labeled_stage = f"labeled_{source_stage}"
+            if labeled_stage not in stack_index["stages"]:
+                status_placeholder.write("Adding year labels to frame stack...")
+                label_stack(project_folder, source_stage, status_placeholder)
+            frames, years = get_stack_frames(project_folder, labeled_stage, [a[0] for a in sorted_aerials])
+            if frames:
+                stack_signature = get_file_signature(get_stack_path(project_folder, labeled_stage))
+                fingerprint = get_render_fingerprint(
+                    project_name, [[year, stack_signature] for year in years], frame_duration, use_processed, True,
+                    transition, easing
+                )
+                cached_video = find_cached_render(project_folder, fingerprint)
+                if cached_video:
+                    status_placeholder.write(f"✅ Identical timelapse already rendered: {cached_video}")
+                    return cached_video
+                status_placeholder.write(f"Processing frames for years: {', '.join(years)}")
+                try:
+                    return write_timelapse_video(frames, project_folder, project_name, frame_duration, status_placeholder,
+                                                 fingerprint, transition, easing)
+                except Exception as e:
+                    error_msg = f"Error creating timelapse: {e}"
+                    status_placeholder.write(f"❌ {error_msg}")
+                    logger.exception(error_msg)
+                    return None
+        logger.warning(f"No frame stack available for {project_name}, falling back to image files")
+    
+    if from_archive:
+        # Random access to the archive members; nothing is extracted
+        wanted_years = {str(a[0]) for a in sorted_aerials}
+        archive_images, archive_years = get_archive_images(archive_path, project_name, use_processed=use_processed, use_text_overlaid=False)
+        for image_ref, year in zip(archive_images, archive_years):
+            if year in wanted_years:
+                image_files.append(image_ref)
+                years.append(year)
+    else:
+        # Find all available images - try multiple filename patterns
+        for year, layer_type in sorted_aerials:
+            # Try different filename patterns
+            possible_patterns = [
+                f"{year}_{project_name}.jpg",
+                f"{year}_{layer_type}.jpg",
+                f"{year}.jpg"
+            ]
             
-            if os.path.exists(image_path):
-                logger.info(f"Found image: {image_path}")
-                image_files.append(image_path)
-                years.append(str(year))
-                found = True
-                break
-        
-        if not found:
-            logger.warning(f"No image found for year {year} with any pattern")
+            found = False
+            for pattern in possible_patterns:
+                image_path = os.path.join(source_folder, pattern)
+                logger.info(f"Looking for image at: {image_path}")
+                status_placeholder.write(f"Looking for: {pattern}")
+                
+                if os.path.exists(image_path):
+                    logger.info(f"Found image: {image_path}")
+                    image_files.append(image_path)
+                    years.append(str(year))
+                    found = True
+                    break
+            
+            if not found:
+                logger.warning(f"No image found for year {year} with any pattern")
     
     # As a fallback, try to find any image files in the directory
     if not image_files:
@@ -545,6 +2060,25 @@ def create_timelapse(project_folder, project_name, status_placeholder, start_yea
         logger.warning(error_msg)
         return None
     
+    # Same source images, alignment, normalization and settings as an earlier render: return that video
+    transforms = get_alignment_transforms(project_folder)
+    luts = get_normalization_luts(project_folder)
+    captions = get_project_captions(project_folder)
+    fingerprint = get_render_fingerprint(
+        project_name,
+        [[year, get_source_signature(image)]
+         + ([np.round(transforms[int(year)], 3).tolist()] if int(year) in transforms else [])
+         + ([get_lut_digest(luts[int(year)])] if int(year) in luts else [])
+         + ([captions[int(year)]] if int(year) in captions else [])
+         for image, year in zip(image_files, years)],
+        frame_duration, use_processed, False, transition, easing
+    )
+    cached_video = find_cached_render(project_folder, fingerprint)
+    if cached_video:
+        status_placeholder.write(f"✅ Identical timelapse already rendered: {cached_video}")
+        logger.info(f"Reusing render {cached_video} for {project_name}")
+        return cached_video
+    
     status_placeholder.write(f"Processing images for years: {', '.join(years)}")
     logger.info(f"Processing images for years: {', '.join(years)}")
     
@@ -555,129 +2089,802 @@ def create_timelapse(project_folder, project_name, status_placeholder, start_yea
         
         # Add text to images instead of adding text overlays during video creation
         status_placeholder.write("Adding year labels to images...")
-        labeled_image_files = add_text_to_images(image_files, years, text_images_folder, status_placeholder)
+        labeled_image_files = add_text_to_images(image_files, years, text_images_folder, status_placeholder,
+                                                 transforms=transforms, luts=luts, captions=captions)
         
         # Create video from the labeled images
-        status_placeholder.write("Generating video from labeled images...")
-        base_clip = ImageSequenceClip(labeled_image_files, durations=[frame_duration] * len(labeled_image_files))
-        
-        # Save video in the project folder with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_filename = f"{project_name}_timelapse_{timestamp}.mp4"
-        video_path = os.path.join(project_folder, video_filename)
-        base_clip.write_videofile(video_path, fps=24, audio=False)
-        
-        success_msg = f"Timelapse video created: {video_path}"
-        status_placeholder.write(f"✅ {success_msg}")
-        logger.success(success_msg)
-        return video_path
+        return write_timelapse_video(labeled_image_files, project_folder, project_name, frame_duration, status_placeholder,
+                                     fingerprint, transition, easing)
     except Exception as e:
         error_msg = f"Error creating timelapse: {e}"
         status_placeholder.write(f"❌ {error_msg}")
         logger.exception(error_msg)
         return None
 
-# Function to archive a project
-def archive_project(project_folder, config):
-    """Archive a project"""
-    project_name = os.path.basename(project_folder)
-    logger.info(f"Archiving project: {project_name}")
-    
-    archive_path = os.path.join(ARCHIVE_FOLDER, f"{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+# Multi-format export
+EXPORT_SUBFOLDER = "exports"
+EXPORT_FORMATS = ["mp4", "webm", "gif"]
+EXPORT_SIZES = [256, 512, 1024, 2048]
+EXPORT_FPS = 4  # Frame durations are rounded to multiples of 1/EXPORT_FPS seconds
+VIDEO_CODECS = {"mp4": "libx264", "webm": "libvpx"}
+EXPORT_ASPECTS = {"1:1": (1, 1), "16:9": (16, 9), "9:16": (9, 16), "4:5": (4, 5)}
+
+class StatusLog:
+    """Minimal status reporter that only logs, for helpers called without a UI"""
     
-    try:
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(project_folder):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, os.path.dirname(project_folder))
-                    zipf.write(file_path, arcname)
-        
-        # Add to archived projects in config
-        project_info = next((p for p in config["projects"] if p["name"] == project_name), None)
-        if project_info:
-            project_info["archived"] = True
-            project_info["archive_path"] = archive_path
-            save_config(config)
-        
-        logger.success(f"Project archived successfully: {archive_path}")
-        return archive_path
-    except Exception as e:
-        logger.exception(f"Error archiving project {project_name}: {e}")
-        return None
+    def write(self, message):
+        logger.info(message)
 
-# Function to create a download link
-def get_download_link(file_path, link_text="Download file"):
-    with open(file_path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode()
-    filename = os.path.basename(file_path)
-    mime_type = "video/mp4" if file_path.endswith(".mp4") else "application/zip"
-    href = f'<a href="data:{mime_type};base64,{b64}" download="{filename}">{link_text}</a>'
-    return href
+def get_export_frames(project_folder, project_name, years, use_processed=True, use_stack=False, archive_path=None):
+    """Yield (year, RGB frame, caption) for an export, decoding and correcting each frame once.
+    
+    Frames come from the unlabeled frame stack when requested and available,
+    otherwise from the project's images (or its archive). Alignment and
+    normalization are applied; labels are drawn per output geometry by
+    export_timelapse, so they fit every size and aspect ratio.
+    """
+    years = sorted(int(y) for y in years)
+    transforms = get_alignment_transforms(project_folder)
+    luts = get_normalization_luts(project_folder)
+    captions = get_project_captions(project_folder)
+    
+    def correct(frame, year):
+        return apply_lut(warp_frame(np.asarray(frame), transforms.get(year)), luts.get(year))
+    
+    if use_stack:
+        stack_index = load_stack_index(project_folder)
+        if stack_index:
+            source_stage = "processed" if use_processed and "processed" in stack_index["stages"] else "raw"
+            frames, frame_years = get_stack_frames(project_folder, source_stage, years)
+            if frames:
+                for frame, year in zip(frames, frame_years):
+                    yield int(year), correct(frame, int(year)), captions.get(int(year))
+                return
+    
+    image_files, image_years = get_project_images(
+        project_folder, project_name, use_processed=use_processed, use_text_overlaid=False, archive_path=archive_path
+    )
+    for image, year in sorted(zip(image_files, image_years), key=lambda item: int(item[1])):
+        if int(year) in years:
+            with open_image(image) as img:
+                frame = correct(img.convert('RGB'), int(year))
+            yield int(year), frame, captions.get(int(year))
 
-def get_video_html(video_path):
-    """Generate HTML for video player with controls"""
-    video_base64 = ""
-    with open(video_path, "rb") as f:
-        video_base64 = base64.b64encode(f.read()).decode()
+def fit_export_frame(frame, size, aspect="1:1"):
+    """Center-crop a frame to an aspect ratio and scale its longer side to size.
     
-    return f"""
-    <div class="video-container">
-        <video controls>
-            <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
-            Your browser does not support the video tag.
-        </video>
-    </div>
+    Dimensions are rounded to even numbers, which yuv420p video requires.
     """
+    aspect_w, aspect_h = EXPORT_ASPECTS[aspect]
+    height, width = frame.shape[:2]
+    if width * aspect_h > height * aspect_w:
+        crop_w, crop_h = int(round(height * aspect_w / aspect_h)), height
+    else:
+        crop_w, crop_h = width, int(round(width * aspect_h / aspect_w))
+    x0, y0 = (width - crop_w) // 2, (height - crop_h) // 2
+    frame = frame[y0:y0 + crop_h, x0:x0 + crop_w]
+    scale = size / max(crop_w, crop_h)
+    output = (max(2, 2 * int(round(crop_w * scale / 2))), max(2, 2 * int(round(crop_h * scale / 2))))
+    if output == (crop_w, crop_h):
+        return np.ascontiguousarray(frame)
+    return cv2.resize(frame, output, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
 
-def render_timeline(available_years, selected_years=None):
-    """Render an interactive timeline of available years"""
-    timeline_html = '<div class="timeline">'
+class GifEncoder:
+    """Encodes frames into an animated GIF with one shared palette.
     
-    for year, _ in sorted(aerials, key=lambda x: x[0]):
-        css_class = "timeline-point available" if year in available_years else "timeline-point unavailable"
-        if selected_years and year in selected_years:
-            css_class += " selected"
-        
-        timeline_html += f'<div class="{css_class}">{year}</div>'
+    The palette is built from the first frames. Each frame is quantized as it
+    arrives and only keeps the pixels that changed since the previous one
+    (the rest become transparent); the compact 8-bit frames are held until
+    close() writes the file, which keeps encoding fast and the file small.
+    """
+    TRANSPARENT = 255
     
-    timeline_html += '</div>'
-    return timeline_html
-
-def get_year_badges(years):
-    """Generate HTML for year badges"""
-    badges_html = ""
-    for year in sorted(years):
-        badges_html += f'<span class="year-badge">{year}</span>'
-    return badges_html
+    def __init__(self, path, frame_duration, palette_frames):
+        self.path = path
+        self.duration = int(frame_duration * 1000)
+        # Quantize a mosaic of sample frames to 255 colors; index 255 is reserved for "unchanged"
+        sample = np.concatenate([np.asarray(Image.fromarray(f).resize((128, 128))) for f in palette_frames], axis=0)
+        self.palette = Image.fromarray(sample).quantize(colors=255, method=Image.Quantize.MEDIANCUT)
+        self.frames = []
+        self.previous = None
+    
+    def write_frame(self, frame):
+        indexed = np.asarray(
+            Image.fromarray(frame).quantize(palette=self.palette, dither=Image.Dither.NONE)
+        ).copy()
+        if self.previous is not None:
+            unchanged = indexed == self.previous
+            self.previous = indexed.copy()
+            indexed[unchanged] = self.TRANSPARENT
+        else:
+            self.previous = indexed.copy()
+        image = Image.fromarray(indexed, mode="P")
+        image.putpalette(self.palette.getpalette())
+        self.frames.append(image)
+    
+    def close(self):
+        if not self.frames:
+            return
+        self.frames[0].save(
+            self.path, format="GIF", save_all=True, append_images=self.frames[1:],
+            duration=self.duration, loop=0, transparency=self.TRANSPARENT, disposal=1, optimize=False
+        )
 
-def create_text_overlays(years, frame_duration):
-    """Creates text overlay clips for each year in the timelapse.
+def export_timelapse(project_folder, project_name, years, targets, status_placeholder, frame_duration=1.0,
+                     use_processed=True, use_stack=False, archive_path=None, transition=0.0, easing="linear"):
+    """Export a timelapse to several formats, sizes and aspect ratios in a single pass over the frames.
+    
+    Each frame is decoded and corrected once, then cropped, resized and
+    labeled once per output geometry (size and aspect ratio) and handed to
+    every encoder for that geometry. Video encoders run as separate ffmpeg
+    processes, so they encode concurrently.
     
     Args:
-        years: List of years to create text overlays for
-        frame_duration: Duration in seconds for each frame
+        project_folder: Folder of the project
+        project_name: Name of the project
+        years: Years to include
+        targets: List of {"format": "mp4" | "webm" | "gif", "size": pixels of the longer side or None
+            for full size, "aspect": one of EXPORT_ASPECTS (default "1:1")}
+        status_placeholder: Status reporter with write()
+        frame_duration: Duration of each frame in seconds
+        use_processed: Use watermark-reduced images when available
+        use_stack: Read frames from the frame stack
+        archive_path: Archive to read from when the images are no longer on disk
+        transition: Crossfade length in seconds for video formats (GIFs keep hard cuts)
+        easing: Crossfade easing curve
         
     Returns:
-        List of TextClip objects positioned and timed for the video
+        list: Paths of the exported files
     """
-    text_clips = []
+    export_folder = os.path.join(project_folder, EXPORT_SUBFOLDER)
+    os.makedirs(export_folder, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Crossfades need a higher frame rate to look smooth
+    fps = VIDEO_FPS if transition > 0 else EXPORT_FPS
     
-    for i, year in enumerate(years):
-        try:
-            # Try multiple common system fonts
-            system_fonts = [
-                "C:/Windows/Fonts/Arial.ttf",
-                "C:/Windows/Fonts/Verdana.ttf",
-                "C:/Windows/Fonts/Tahoma.ttf",
-                "C:/Windows/Fonts/Calibri.ttf",
-                "C:/Windows/Fonts/Segoe UI.ttf",
-                # Add some Mac/Linux system fonts
-                "/System/Library/Fonts/Helvetica.ttc",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "/usr/share/fonts/TTF/Arial.ttf"
-            ]
+    frames = get_export_frames(project_folder, project_name, years, use_processed, use_stack, archive_path)
+    # Look ahead a few frames so GIF encoders can build their shared palette
+    lookahead = []
+    for item in frames:
+        lookahead.append(item)
+        if len(lookahead) >= 8:
+            break
+    if not lookahead:
+        status_placeholder.write("❌ No images found to export")
+        return []
+    full_size = max(lookahead[0][1].shape[:2])
+    
+    # Labels are drawn after cropping and resizing, with the font scaled to the output
+    fonts = {}
+    
+    def render(geometry, year, frame, caption):
+        size, aspect = geometry
+        if geometry not in fonts:
+            fonts[geometry] = load_label_font(font_size=max(14, int(36 * size / 1024)))
+        return label_frame(fit_export_frame(frame, size, aspect), year, fonts[geometry], caption)
+    
+    encoders = []
+    for target in targets:
+        geometry = (int(target.get("size") or full_size), target.get("aspect") or "1:1")
+        if geometry[1] not in EXPORT_ASPECTS:
+            raise ValueError(f"Unsupported aspect ratio: {geometry[1]}")
+        fmt = target["format"]
+        suffix = str(geometry[0]) if geometry[1] == "1:1" else f"{geometry[0]}_{geometry[1].replace(':', 'x')}"
+        path = os.path.join(export_folder, f"{project_name}_{timestamp}_{suffix}.{fmt}")
+        if fmt == "gif":
+            palette_frames = [render(geometry, *item) for item in lookahead]
+            encoder = GifEncoder(path, frame_duration, palette_frames)
+        elif fmt in VIDEO_CODECS:
+            frame_size = render(geometry, *lookahead[0]).shape[1::-1]
+            encoder = FFMPEG_VideoWriter(path, frame_size, fps, codec=VIDEO_CODECS[fmt], pixel_format="yuv420p")
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        encoders.append((geometry, fmt, path, encoder))
+    
+    def all_frames():
+        yield from lookahead
+        yield from frames
+    
+    previous = {}
+    try:
+        for i, (year, frame, caption) in enumerate(all_frames()):
+            status_placeholder.write(f"Exporting frame {i + 1} ({year})...")
+            rendered = {}
+            for geometry, fmt, path, encoder in encoders:
+                if geometry not in rendered:
+                    rendered[geometry] = render(geometry, year, frame, caption)
+                if fmt == "gif":
+                    encoder.write_frame(rendered[geometry])
+                else:
+                    for output in timeline_segment(previous.get(geometry), rendered[geometry], fps, frame_duration, transition, easing):
+                        encoder.write_frame(output)
+            previous = rendered
+        for geometry, fmt, path, encoder in encoders:
+            if fmt != "gif" and geometry in previous:
+                for output in timeline_tail(previous[geometry], fps, min(transition, frame_duration)):
+                    encoder.write_frame(output)
+    finally:
+        for geometry, fmt, path, encoder in encoders:
+            encoder.close()
+    
+    paths = []
+    for geometry, fmt, path, encoder in encoders:
+        if os.path.exists(path):
+            record_artifact(path)
+            paths.append(path)
+    invalidate_project_cache(project_folder)
+    status_placeholder.write(f"✅ Exported {len(paths)} files to {export_folder}")
+    return paths
+
+def list_exports(project_folder):
+    """Exported files of a project, newest first"""
+    export_folder = os.path.join(project_folder, EXPORT_SUBFOLDER)
+    if not os.path.isdir(export_folder):
+        return []
+    paths = [os.path.join(export_folder, name) for name in os.listdir(export_folder)
+             if name.lower().endswith(tuple(f".{fmt}" for fmt in EXPORT_FORMATS))]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+# Multi-site comparison grids
+COMPARISON_FOLDER = os.path.join(OUTPUT_FOLDER, "_comparisons")  # Counted as videos in storage accounting
+COMPARISON_MIN_SITES = 2
+COMPARISON_MAX_SITES = 9
+COMPARISON_TILE_SIZE = 384
+COMPARISON_WORKERS = os.cpu_count() or 4
+
+def get_comparison_grid_shape(count):
+    """Rows and columns of the most square grid holding count tiles"""
+    columns = int(np.ceil(np.sqrt(count)))
+    return int(np.ceil(count / columns)), columns
+
+def get_comparison_sources(project_names, use_processed=True):
+    """Per-site image lookup for a comparison, with each site's alignment, normalization and archive fallback.
+    
+    Returns:
+        list: One dict per site with name, images ({year: image ref}), transforms and luts
+    """
+    config = load_config()
+    sites = []
+    for name in project_names:
+        project = next((p for p in config["projects"] if p["name"] == name), None)
+        if project is None:
+            raise ValueError(f"Unknown project: {name}")
+        project_folder = os.path.join(OUTPUT_FOLDER, name)
+        archive_path = project.get("archive_path")
+        image_files, image_years = get_project_images(
+            project_folder, name, use_processed=use_processed and project.get("reduce_watermarks", False),
+            use_text_overlaid=False, archive_path=archive_path
+        )
+        sites.append({
+            "name": name,
+            "images": {int(year): image for image, year in zip(image_files, image_years)},
+            "transforms": get_alignment_transforms(project_folder),
+            "luts": get_normalization_luts(project_folder),
+        })
+    return sites
+
+def load_comparison_tile(site, year, tile_size, font):
+    """Decode, correct, resize and label one site's frame for a year.
+    
+    Sites without imagery for the year show their most recent earlier year
+    (labeled with that year), or a blank tile before their first year.
+    """
+    shown = max((y for y in site["images"] if y <= year), default=None)
+    if shown is None:
+        tile = np.full((tile_size, tile_size, 3), 32, dtype=np.uint8)
+        return label_frame(tile, "no imagery", font, site["name"])
+    with open_image(site["images"][shown]) as img:
+        frame = np.asarray(img.convert('RGB'))
+    frame = apply_lut(warp_frame(frame, site["transforms"].get(shown)), site["luts"].get(shown))
+    tile = cv2.resize(frame, (tile_size, tile_size), interpolation=cv2.INTER_AREA)
+    return label_frame(tile, shown, font, site["name"])
+
+def compose_comparison_grid(tiles, rows, columns, gap=4):
+    """Lay tiles out row by row on a dark background"""
+    tile_size = tiles[0].shape[0]
+    grid = np.full((rows * tile_size + (rows - 1) * gap, columns * tile_size + (columns - 1) * gap, 3), 16, dtype=np.uint8)
+    for i, tile in enumerate(tiles):
+        row, column = divmod(i, columns)
+        y, x = row * (tile_size + gap), column * (tile_size + gap)
+        grid[y:y + tile_size, x:x + tile_size] = tile
+    return grid
+
+def render_comparison(project_names, output_path, status_placeholder, years=None, tile_size=COMPARISON_TILE_SIZE,
+                      frame_duration=1.0, use_processed=True, transition=0.0, easing="linear",
+                      max_workers=COMPARISON_WORKERS):
+    """Render several projects side by side as one grid video, aligned by year.
+    
+    Tiles for a year are decoded in parallel while the previous year's grid
+    is being encoded, and every grid is streamed straight into a single
+    encoder, so the comparison takes one pass over the sources.
+    
+    Args:
+        project_names: Names of the projects to compare (2 to 9)
+        output_path: Path of the video to write
+        status_placeholder: Status reporter with write()
+        years: Years to include (defaults to every year any site has)
+        tile_size: Width/height of each site's tile in pixels
+        frame_duration: Duration of each year in seconds
+        use_processed: Use watermark-reduced images where projects have them
+        transition: Crossfade length in seconds
+        easing: Crossfade easing curve
+        max_workers: Number of decoding threads
+        
+    Returns:
+        list: Years in the video
+    """
+    if not COMPARISON_MIN_SITES <= len(project_names) <= COMPARISON_MAX_SITES:
+        raise ValueError(f"Compare between {COMPARISON_MIN_SITES} and {COMPARISON_MAX_SITES} projects")
+    sites = get_comparison_sources(project_names, use_processed)
+    all_years = sorted(set().union(*(site["images"] for site in sites)))
+    years = sorted(int(y) for y in years if int(y) in all_years) if years else all_years
+    if not years:
+        raise RuntimeError("None of the projects have images for the selected years")
+    
+    rows, columns = get_comparison_grid_shape(len(sites))
+    font = load_label_font(font_size=max(14, tile_size // 18))
+    # Crossfades need a higher frame rate to look smooth
+    fps = VIDEO_FPS if transition > 0 else EXPORT_FPS
+    status_placeholder.write(f"Comparing {len(sites)} sites in a {rows}x{columns} grid over {len(years)} years...")
+    
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    writer = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(year):
+            return [executor.submit(load_comparison_tile, site, year, tile_size, font) for site in sites]
+        
+        pending = submit(years[0])
+        previous = None
+        try:
+            for i, year in enumerate(years):
+                tiles = [future.result() for future in pending]
+                # Start decoding the next year before encoding this one
+                if i + 1 < len(years):
+                    pending = submit(years[i + 1])
+                grid = compose_comparison_grid(tiles, rows, columns)
+                if writer is None:
+                    writer = FFMPEG_VideoWriter(output_path, grid.shape[1::-1], fps, codec="libx264", pixel_format="yuv420p")
+                for frame in timeline_segment(previous, grid, fps, frame_duration, transition, easing):
+                    writer.write_frame(frame)
+                previous = grid
+                status_placeholder.write(f"Composited {year} ({i + 1}/{len(years)})")
+                if hasattr(status_placeholder, "set_progress"):
+                    status_placeholder.set_progress((i + 1) / len(years))
+            for frame in timeline_tail(previous, fps, min(transition, frame_duration)):
+                writer.write_frame(frame)
+        finally:
+            for future in pending:
+                future.cancel()
+            if writer is not None:
+                writer.close()
+    
+    record_artifact(output_path)
+    status_placeholder.write(f"✅ Comparison video created: {output_path}")
+    return years
+
+# Change detection
+ANALYSIS_SUBFOLDER = "analysis"
+ANALYSIS_SUMMARY_FILE = "summary.json"
+CHANGE_THRESHOLD = 40  # Grayscale difference (0-255) counted as a changed pixel
+CHANGE_BAND_ROWS = 256  # Rows processed at once across all years
+CHANGE_BLUR = 5  # Smoothing applied before differencing, to ignore noise and small misregistration
+
+def load_change_stack(image_files, years, transforms=None):
+    """Decode a project's frames into one (years, height, width) uint8 grayscale stack.
+    
+    Grayscale uint8 keeps 22 years at 2048px under 100 MB.
+    """
+    stack = None
+    for i, (image, year) in enumerate(zip(image_files, years)):
+        frame = warp_frame(load_frame(image), (transforms or {}).get(int(year)))
+        gray = cv2.GaussianBlur(cv2.cvtColor(np.asarray(frame, dtype=np.uint8), cv2.COLOR_RGB2GRAY), (CHANGE_BLUR, CHANGE_BLUR), 0)
+        if stack is None:
+            stack = np.empty((len(image_files),) + gray.shape, dtype=np.uint8)
+        elif gray.shape != stack.shape[1:]:
+            gray = cv2.resize(gray, (stack.shape[2], stack.shape[1]), interpolation=cv2.INTER_AREA)
+        stack[i] = gray
+    return stack
+
+def compute_change_maps(stack, band_rows=CHANGE_BAND_ROWS):
+    """Per-pixel change magnitudes over a year stack.
+    
+    Works on bands of rows across all years at once in int16, so memory
+    stays bounded regardless of image size.
+    
+    Args:
+        stack: (years, height, width) uint8 grayscale stack
+        band_rows: Rows per band
+        
+    Returns:
+        tuple: (consecutive changes as (years - 1, height, width) uint8,
+            cumulative change as (height, width) uint16,
+            first-to-last change as (height, width) uint8)
+    """
+    count, height, width = stack.shape
+    consecutive = np.empty((count - 1, height, width), dtype=np.uint8)
+    cumulative = np.empty((height, width), dtype=np.uint16)
+    span = np.empty((height, width), dtype=np.uint8)
+    for top in range(0, height, band_rows):
+        band = stack[:, top:top + band_rows].astype(np.int16)
+        diffs = np.abs(np.diff(band, axis=0))
+        consecutive[:, top:top + band_rows] = diffs
+        cumulative[top:top + band_rows] = diffs.sum(axis=0, dtype=np.uint16)
+        span[top:top + band_rows] = np.abs(band[-1] - band[0])
+    return consecutive, cumulative, span
+
+def change_statistics(change, threshold=CHANGE_THRESHOLD):
+    """Summary statistics of one change map"""
+    return {
+        "mean_change": round(float(change.mean(dtype=np.float32)), 2),
+        "p95_change": int(np.percentile(change[::4, ::4], 95)),
+        "changed_fraction": round(float(np.count_nonzero(change >= threshold)) / change.size, 4),
+    }
+
+def save_change_heatmap(change, background, output_path, scale=255):
+    """Blend a colored change map over a grayscale frame and save it"""
+    magnitude = np.clip(change.astype(np.float32) * (255.0 / scale), 0, 255).astype(np.uint8)
+    heat = cv2.applyColorMap(magnitude, cv2.COLORMAP_JET)
+    base = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+    # Stronger change shows more of the heatmap
+    alpha = (magnitude.astype(np.float32) / 255.0)[..., None] * 0.8
+    overlay = (base * (1 - alpha) + heat * alpha).astype(np.uint8)
+    cv2.imwrite(output_path, overlay, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    record_artifact(output_path)
+
+def analyze_project_changes(project_folder, project_name, status_placeholder, use_processed=True, archive_path=None):
+    """Compute where a project's area changed between consecutive years and across the full span.
+    
+    Writes heatmap overlays and summary statistics (JSON and CSV) to the
+    project's analysis folder.
+    
+    Args:
+        project_folder: Folder of the project
+        project_name: Name of the project
+        status_placeholder: Status reporter with write()
+        use_processed: Use watermark-reduced images when available
+        archive_path: Archive to read from when the images are no longer on disk
+        
+    Returns:
+        dict: Summary with per-pair and full-span statistics and heatmap paths
+    """
+    image_files, years = get_project_images(
+        project_folder, project_name, use_processed=use_processed, use_text_overlaid=False, archive_path=archive_path
+    )
+    ordered = sorted(zip(image_files, years), key=lambda item: int(item[1]))
+    if len(ordered) < 2:
+        raise RuntimeError("At least two years are needed to detect changes")
+    image_files = [image for image, _ in ordered]
+    years = [int(year) for _, year in ordered]
+    
+    status_placeholder.write(f"Loading {len(years)} years for change analysis...")
+    stack = load_change_stack(image_files, years, get_alignment_transforms(project_folder))
+    status_placeholder.write("Computing change maps...")
+    consecutive, cumulative, span = compute_change_maps(stack)
+    
+    analysis_folder = os.path.join(project_folder, ANALYSIS_SUBFOLDER)
+    os.makedirs(analysis_folder, exist_ok=True)
+    summary = {"years": years, "threshold": CHANGE_THRESHOLD, "pairs": []}
+    for i in range(len(years) - 1):
+        heatmap_path = os.path.join(analysis_folder, f"change_{years[i]}_{years[i + 1]}.jpg")
+        save_change_heatmap(consecutive[i], stack[i + 1], heatmap_path)
+        summary["pairs"].append(dict(
+            change_statistics(consecutive[i]), start=years[i], end=years[i + 1], heatmap=heatmap_path
+        ))
+        status_placeholder.write(f"Change {years[i]} → {years[i + 1]}: {summary['pairs'][-1]['changed_fraction']:.1%} of pixels")
+    
+    span_path = os.path.join(analysis_folder, f"change_{years[0]}_{years[-1]}.jpg")
+    save_change_heatmap(span, stack[-1], span_path)
+    cumulative_path = os.path.join(analysis_folder, "change_cumulative.jpg")
+    # Scale the cumulative map so its 99th percentile is fully saturated
+    save_change_heatmap(cumulative, stack[-1], cumulative_path, scale=max(1, int(np.percentile(cumulative[::4, ::4], 99))))
+    summary["span"] = dict(change_statistics(span), start=years[0], end=years[-1], heatmap=span_path)
+    summary["cumulative_heatmap"] = cumulative_path
+    
+    save_json_file(os.path.join(analysis_folder, ANALYSIS_SUMMARY_FILE), summary)
+    with open(os.path.join(analysis_folder, "summary.csv"), "w") as f:
+        f.write("start,end,mean_change,p95_change,changed_fraction\n")
+        for row in summary["pairs"] + [summary["span"]]:
+            f.write(f"{row['start']},{row['end']},{row['mean_change']},{row['p95_change']},{row['changed_fraction']}\n")
+    
+    invalidate_project_cache(project_folder)
+    status_placeholder.write(f"✅ Change analysis saved to {analysis_folder}")
+    return summary
+
+def load_change_summary(project_folder):
+    """The project's latest change analysis summary, or None"""
+    path = os.path.join(project_folder, ANALYSIS_SUBFOLDER, ANALYSIS_SUMMARY_FILE)
+    return load_json_file(path, {}) or None
+
+# Archive settings
+ARCHIVE_STORE = os.path.join(ARCHIVE_FOLDER, "store")
+ARCHIVE_MANIFEST = "manifest.json"
+# Already-compressed formats are stored as-is; deflating them costs CPU for no size gain
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp4", ".webm", ".zip")
+ARCHIVE_WORKERS = 4
+
+def get_archive_options(config):
+    """Archive options from the config, with defaults"""
+    options = {"include_intermediates": True, "content_store": False}
+    options.update(config.get("archive", {}))
+    return options
+
+def is_regenerable_artifact(relative_path):
+    """Whether a file inside a project folder can be rebuilt from the raw downloads"""
+    parts = relative_path.split(os.sep)
+    return (
+        parts[0] in ("processed", "text_images", ANALYSIS_SUBFOLDER)
+        or parts[-1].endswith("_stack.npy")
+        or parts[-1] in (STACK_INDEX_FILE, PROJECT_REVISION_FILE, LABEL_INDEX_FILE)
+    )
+
+def store_archive_object(file_path):
+    """Copy a file into the content-addressed archive store, returning its sha256 hash"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    object_hash = digest.hexdigest()
+    object_path = os.path.join(ARCHIVE_STORE, object_hash[:2], object_hash)
+    if not os.path.exists(object_path):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.part"
+        shutil.copyfile(file_path, tmp_path)
+        os.replace(tmp_path, object_path)
+        record_artifact(object_path)
+    return object_hash
+
+# Reading archived projects without extracting them
+ARCHIVE_REF_PREFIX = "zip://"
+
+def make_archive_ref(archive_path, member):
+    """Reference to a single member of an archive, usable wherever an image path is"""
+    return f"{ARCHIVE_REF_PREFIX}{archive_path}!{member}"
+
+def is_archive_ref(image_ref):
+    return isinstance(image_ref, str) and image_ref.startswith(ARCHIVE_REF_PREFIX)
+
+def list_archive_members(archive_path):
+    """List the member names of an archive, including those held in the content store"""
+    with zipfile.ZipFile(archive_path) as zipf:
+        members = zipf.namelist()
+        if ARCHIVE_MANIFEST in members:
+            manifest = json.loads(zipf.read(ARCHIVE_MANIFEST))
+            members = [m for m in members if m != ARCHIVE_MANIFEST] + list(manifest["objects"])
+    return members
+
+def read_image_bytes(image_ref):
+    """Read the encoded bytes of an image from a file path or an archive member reference"""
+    if not is_archive_ref(image_ref):
+        with open(image_ref, "rb") as f:
+            return f.read()
+    
+    archive_path, member = image_ref[len(ARCHIVE_REF_PREFIX):].rsplit("!", 1)
+    with zipfile.ZipFile(archive_path) as zipf:
+        # Members are located through the central directory, so only this one is read
+        try:
+            return zipf.read(member)
+        except KeyError:
+            manifest = json.loads(zipf.read(ARCHIVE_MANIFEST))
+    object_hash = manifest["objects"][member]["sha256"]
+    with open(os.path.join(ARCHIVE_STORE, object_hash[:2], object_hash), "rb") as f:
+        return f.read()
+
+def open_image(image_ref):
+    """Open an image from a file path or an archive member reference"""
+    if is_archive_ref(image_ref):
+        return Image.open(io.BytesIO(read_image_bytes(image_ref)))
+    return Image.open(image_ref)
+
+def project_has_local_images(project_folder):
+    """Whether a project folder still holds its downloaded images"""
+    if not os.path.isdir(project_folder):
+        return False
+    return any(f.lower().endswith(('.jpg', '.jpeg', '.png')) for f in os.listdir(project_folder))
+
+def get_archive_images(archive_path, project_name, use_processed=False, use_text_overlaid=True):
+    """Get image references and years for a project straight from its archive.
+    
+    Follows the same priority as get_project_images: text-overlaid, then
+    processed, then original images.
+    
+    Returns:
+        tuple: (list of archive member references, list of corresponding years)
+    """
+    try:
+        members = set(list_archive_members(archive_path))
+    except Exception as e:
+        logger.error(f"Could not read archive {archive_path}: {e}")
+        return [], []
+    
+    folders = []
+    if use_text_overlaid:
+        folders.append((f"{project_name}/text_images/", "text_"))
+    if use_processed:
+        folders.append((f"{project_name}/processed/", ""))
+    folders.append((f"{project_name}/", ""))
+    
+    for folder, prefix in folders:
+        image_refs = []
+        years = []
+        for year, layer_type in sorted(aerials, key=lambda x: x[0]):
+            for pattern in [f"{year}_{project_name}.jpg", f"{year}_{layer_type}.jpg", f"{year}.jpg"]:
+                member = f"{folder}{prefix}{pattern}"
+                if member in members:
+                    image_refs.append(make_archive_ref(archive_path, member))
+                    years.append(str(year))
+                    break
+        if image_refs:
+            return image_refs, years
+    return [], []
+
+# Function to archive a project
+def archive_project(project_folder, config, include_intermediates=None, content_store=None, save=True):
+    """Archive a project
+    
+    Args:
+        project_folder: Path to the project folder
+        config: Application configuration
+        include_intermediates: Include processed/labeled frames and frame stacks
+            (defaults to the archive options in the config)
+        content_store: Put media files in the shared content-addressed store and
+            reference them from the archive's manifest instead of copying them in
+        save: Save the config after marking the project archived
+        
+    Returns:
+        Path to the archive, or None on failure
+    """
+    project_name = os.path.basename(project_folder)
+    logger.info(f"Archiving project: {project_name}")
+    
+    options = get_archive_options(config)
+    if include_intermediates is None:
+        include_intermediates = options["include_intermediates"]
+    if content_store is None:
+        content_store = options["content_store"]
+    
+    archive_path = os.path.join(ARCHIVE_FOLDER, f"{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+    
+    try:
+        manifest = {}
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for root, _, files in os.walk(project_folder):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    if not include_intermediates and is_regenerable_artifact(os.path.relpath(file_path, project_folder)):
+                        continue
+                    arcname = os.path.relpath(file_path, os.path.dirname(project_folder))
+                    is_media = file.lower().endswith(STORED_EXTENSIONS)
+                    if content_store and is_media:
+                        manifest[arcname.replace(os.sep, "/")] = {
+                            "sha256": store_archive_object(file_path),
+                            "size": os.path.getsize(file_path)
+                        }
+                        continue
+                    compress_type = zipfile.ZIP_STORED if is_media else zipfile.ZIP_DEFLATED
+                    zipf.write(file_path, arcname, compress_type=compress_type)
+            if manifest:
+                zipf.writestr(ARCHIVE_MANIFEST, json.dumps({"store": "sha256", "objects": manifest}, indent=2))
+        record_artifact(archive_path)
+        
+        # Add to archived projects in config
+        def mark_archived(config):
+            project_info = next((p for p in config["projects"] if p["name"] == project_name), None)
+            if project_info:
+                project_info["archived"] = True
+                project_info["archive_path"] = archive_path
+        
+        mark_archived(config)
+        if save:
+            update_config(mark_archived)
+        invalidate_project_cache(project_folder)
+        
+        logger.success(f"Project archived successfully: {archive_path}")
+        return archive_path
+    except Exception as e:
+        logger.exception(f"Error archiving project {project_name}: {e}")
+        return None
+
+def archive_projects(project_folders, config, max_workers=ARCHIVE_WORKERS):
+    """Archive several projects in parallel, saving the config once at the end.
+    
+    Returns:
+        dict: Mapping of project folder to archive path (None for failures)
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        archive_paths = dict(zip(
+            project_folders,
+            executor.map(lambda folder: archive_project(folder, config, save=False), project_folders)
+        ))
+    
+    def mark_archived(saved):
+        for folder, archive_path in archive_paths.items():
+            project_info = next((p for p in saved["projects"] if p["name"] == os.path.basename(folder)), None)
+            if project_info and archive_path:
+                project_info["archived"] = True
+                project_info["archive_path"] = archive_path
+    
+    update_config(mark_archived)
+    return archive_paths
+
+# Function to create a download link
+def get_download_link(file_path, link_text="Download file"):
+    with open(file_path, "rb") as f:
+        data = f.read()
+    b64 = base64.b64encode(data).decode()
+    filename = os.path.basename(file_path)
+    mime_type = "video/mp4" if file_path.endswith(".mp4") else "application/zip"
+    href = f'<a href="data:{mime_type};base64,{b64}" download="{filename}">{link_text}</a>'
+    return href
+
+def get_video_html(video_path):
+    """Generate HTML for video player with controls"""
+    video_base64 = ""
+    with open(video_path, "rb") as f:
+        video_base64 = base64.b64encode(f.read()).decode()
+    
+    # Show the first frame while the video loads
+    poster = ""
+    poster_path = get_video_poster(video_path)
+    if poster_path:
+        with open(poster_path, "rb") as f:
+            poster = f' poster="data:image/jpeg;base64,{base64.b64encode(f.read()).decode()}"'
+    
+    return f"""
+    <div class="video-container">
+        <video controls{poster}>
+            <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
+            Your browser does not support the video tag.
+        </video>
+    </div>
+    """
+
+def render_timeline(available_years, selected_years=None):
+    """Render an interactive timeline of available years"""
+    timeline_html = '<div class="timeline">'
+    
+    for year, _ in sorted(aerials, key=lambda x: x[0]):
+        css_class = "timeline-point available" if year in available_years else "timeline-point unavailable"
+        if selected_years and year in selected_years:
+            css_class += " selected"
+        
+        timeline_html += f'<div class="{css_class}">{year}</div>'
+    
+    timeline_html += '</div>'
+    return timeline_html
+
+def get_year_badges(years):
+    """Generate HTML for year badges"""
+    badges_html = ""
+    for year in sorted(years):
+        badges_html += f'<span class="year-badge">{year}</span>'
+    return badges_html
+
+def create_text_overlays(years, frame_duration):
+    """Creates text overlay clips for each year in the timelapse.
+    
+    Args:
+        years: List of years to create text overlays for
+        frame_duration: Duration in seconds for each frame
+        
+    Returns:
+        List of TextClip objects positioned and timed for the video
+    """
+    text_clips = []
+    
+    for i, year in enumerate(years):
+        try:
+            # Try multiple common system fonts
+            system_fonts = [
+                "C:/Windows/Fonts/Arial.ttf",
+                "C:/Windows/Fonts/Verdana.ttf",
+                "C:/Windows/Fonts/Tahoma.ttf",
+                "C:/Windows/Fonts/Calibri.ttf",
+                "C:/Windows/Fonts/Segoe UI.ttf",
+                # Add some Mac/Linux system fonts
+                "/System/Library/Fonts/Helvetica.ttc",
+                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+                "/usr/share/fonts/TTF/Arial.ttf"
+            ]
             
             txt_clip = None
             
@@ -734,26 +2941,13 @@ def create_text_overlays(years, frame_duration):
             
     return text_clips
 
-def add_text_to_images(image_files, years, output_folder, status_placeholder):
-    """Adds year text directly to the image files before video creation.
+def load_label_font(font_size=36):
+    """Load the font used for year labels, falling back through common system fonts.
     
-    Args:
-        image_files: List of image file paths
-        years: List of corresponding years for each image
-        output_folder: Folder to save processed images with text
-        status_placeholder: Streamlit container for status updates
-        
     Returns:
-        List of paths to new images with text added
+        A PIL font, or None if no font could be loaded (OpenCV text is used instead)
     """
-    # Create output folder if it doesn't exist
-    os.makedirs(output_folder, exist_ok=True)
-    
-    processed_image_files = []
-    
-    # Try to load a font
     font = None
-    font_size = 36
     
     # Try multiple fonts
     font_paths = [
@@ -782,108 +2976,462 @@ def add_text_to_images(image_files, years, output_folder, status_placeholder):
             logger.error(f"Could not load any font: {e}")
             # Continue without a font - we'll use OpenCV's putText as fallback
     
-    # Process each image
-    for i, (image_path, year) in enumerate(zip(image_files, years)):
-        try:
-            status_placeholder.write(f"Adding text to image {i+1}/{len(image_files)}...")
-            output_path = os.path.join(output_folder, f"text_{os.path.basename(image_path)}")
-            
-            # Try using PIL first (better font support)
-            try:
-                if font is not None:
-                    # Open image with PIL
-                    img = Image.open(image_path)
-                    draw = ImageDraw.Draw(img)
-                    
-                    # Get text size for positioning
-                    text = str(year)
-                    text_width, text_height = draw.textsize(text, font=font)
-                    
-                    # Position text in bottom left with padding
-                    x = 20
-                    y = img.height - text_height - 20
-                    
-                    # Add a semi-transparent background for text
-                    rect_padding = 10
-                    draw.rectangle(
-                        [(x - rect_padding, y - rect_padding), 
-                         (x + text_width + rect_padding, y + text_height + rect_padding)],
-                        fill=(0, 0, 0, 128)
-                    )
-                    
-                    # Draw text
-                    draw.text((x, y), text, font=font, fill=(255, 255, 255))
-                    
-                    # Save image
-                    img.save(output_path)
-                    logger.info(f"Added text to image using PIL: {output_path}")
-                else:
-                    raise Exception("No font available for PIL")
-            
-            except Exception as pil_error:
-                logger.warning(f"PIL text rendering failed: {pil_error}. Falling back to OpenCV.")
-                
-                # Fallback to OpenCV
-                img = cv2.imread(image_path)
-                
-                # Define text properties
-                text = str(year)
-                font_face = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 1.2
-                font_thickness = 3
-                font_color = (255, 255, 255)  # White color in BGR
-                
-                # Get text size for positioning
-                (text_width, text_height), baseline = cv2.getTextSize(
-                    text, font_face, font_scale, font_thickness
-                )
-                
-                # Position text in bottom left with padding
-                x = 20
-                y = img.shape[0] - 20  # 20px from bottom
-                
-                # Add a semi-transparent background for text
-                rect_padding = 10
-                overlay = img.copy()
-                cv2.rectangle(
-                    overlay,
-                    (x - rect_padding, y - text_height - rect_padding),
-                    (x + text_width + rect_padding, y + rect_padding),
-                    (0, 0, 0),  # Black background
-                    -1  # Filled rectangle
-                )
-                
-                # Apply transparency
-                alpha = 0.6
-                img = cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0)
-                
-                # Add text
-                cv2.putText(
-                    img, text, (x, y - baseline), font_face, font_scale, font_color, font_thickness
-                )
-                
-                # Save image
-                cv2.imwrite(output_path, img)
-                logger.info(f"Added text to image using OpenCV: {output_path}")
-            
-            # Add to list of processed files
-            processed_image_files.append(output_path)
-            
-        except Exception as e:
-            logger.exception(f"Failed to add text to image {image_path}: {e}")
-            # Use original image if text addition fails
-            processed_image_files.append(image_path)
-            status_placeholder.write(f"⚠️ Could not add text to image {i+1}, using original")
-    
-    return processed_image_files
+    return font
 
-def create_image_gallery(image_files, years, project_name):
-    """Create an HTML gallery of images with download options."""
-    if not image_files:
-        return "<p>No images available</p>"
+LABEL_MAX_LINES = 3  # The year plus up to two lines of caption
+
+def _label_lines(year, caption, measure, max_width, max_lines=LABEL_MAX_LINES):
+    """Split a label into lines that fit max_width: the year, then the word-wrapped caption.
     
-    # Add CSS for the gallery
-    gallery_css = """
+    Args:
+        measure: Function returning the rendered width of a string
+    """
+    single = f"{year}  {caption}" if caption else str(year)
+    if measure(single) <= max_width:
+        return [single]
+    lines = [str(year)]
+    line = ""
+    for word in (caption or "").split():
+        candidate = f"{line} {word}".strip()
+        if line and measure(candidate) > max_width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] += "..."
+    # Shorten anything still too wide (e.g. a single long word)
+    fitted = []
+    for text in lines:
+        while len(text) > 1 and measure(text) > max_width:
+            text = text[:-4].rstrip() + "..." if len(text) > 4 else text[:-1]
+        fitted.append(text)
+    return fitted
+
+def label_frame(img_array, year, font, caption=None):
+    """Draws the year label in the bottom-left corner of an RGB frame.
+    
+    Captions that do not fit next to the year are wrapped onto the lines
+    below it, and shortened if they still do not fit the frame width.
+    
+    Args:
+        img_array: RGB image as a numpy array (H x W x 3)
+        year: Year to draw
+        font: PIL font from load_label_font, or None to use OpenCV
+        caption: Optional text drawn after the year (e.g. flight date and source)
+        
+    Returns:
+        New numpy array with the label drawn
+    """
+    x = 20
+    rect_padding = 10
+    
+    # Try using PIL first (better font support)
+    try:
+        if font is None:
+            raise Exception("No font available for PIL")
+        
+        img = Image.fromarray(np.asarray(img_array, dtype=np.uint8))
+        draw = ImageDraw.Draw(img)
+        
+        lines = _label_lines(year, caption, lambda text: draw.textlength(text, font=font),
+                             img.width - 2 * (x + rect_padding))
+        line_height = draw.textbbox((0, 0), "Ag", font=font)[3]
+        spacing = line_height // 4
+        text_width = max(draw.textlength(line, font=font) for line in lines)
+        text_height = len(lines) * line_height + (len(lines) - 1) * spacing
+        
+        # Position text in bottom left with padding
+        y = img.height - text_height - 20
+        
+        # Add a semi-transparent background for text
+        draw.rectangle(
+            [(x - rect_padding, y - rect_padding), 
+             (x + text_width + rect_padding, y + text_height + rect_padding)],
+            fill=(0, 0, 0, 128)
+        )
+        
+        # Draw text
+        for i, line in enumerate(lines):
+            draw.text((x, y + i * (line_height + spacing)), line, font=font, fill=(255, 255, 255))
+        return np.asarray(img)
+    
+    except Exception as pil_error:
+        logger.debug(f"PIL text rendering failed: {pil_error}. Falling back to OpenCV.")
+    
+    # Fallback to OpenCV
+    img = np.array(img_array, dtype=np.uint8, copy=True)
+    
+    # Define text properties, scaled down for frames narrower than 1024px
+    font_face = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale = 1.2 * min(1.0, img.shape[1] / 1024)
+    font_thickness = max(1, int(round(3 * font_scale / 1.2)))
+    font_color = (255, 255, 255)  # White in both RGB and BGR
+    
+    measure = lambda text: cv2.getTextSize(text, font_face, font_scale, font_thickness)[0][0]
+    lines = _label_lines(year, caption, measure, img.shape[1] - 2 * (x + rect_padding))
+    (_, line_height), baseline = cv2.getTextSize("Ag", font_face, font_scale, font_thickness)
+    line_height += baseline
+    spacing = line_height // 4
+    text_width = max(measure(line) for line in lines)
+    text_height = len(lines) * line_height + (len(lines) - 1) * spacing
+    
+    # Position text in bottom left with padding
+    y = img.shape[0] - text_height - 20
+    
+    # Add a semi-transparent background for text
+    overlay = img.copy()
+    cv2.rectangle(
+        overlay,
+        (x - rect_padding, y - rect_padding),
+        (x + text_width + rect_padding, y + text_height + rect_padding),
+        (0, 0, 0),  # Black background
+        -1  # Filled rectangle
+    )
+    
+    # Apply transparency
+    alpha = 0.6
+    img = cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0)
+    
+    # Add text (putText positions the baseline)
+    for i, line in enumerate(lines):
+        baseline_y = y + i * (line_height + spacing) + line_height - baseline
+        cv2.putText(img, line, (x, baseline_y), font_face, font_scale, font_color, font_thickness)
+    return img
+
+# Cross-year alignment
+ALIGNMENT_FILE = "alignment.json"
+ALIGN_MAX_SIZE = 512  # Width the finest estimation level is downscaled to
+ALIGN_PYRAMID_LEVELS = 3
+ALIGN_WORKERS = 4
+ALIGN_MAX_SHIFT = 0.1  # Larger estimated shifts (as a fraction of the width) are treated as failures
+
+def _alignment_features(img_array):
+    """Gradient magnitude of a frame; edges survive decades of changing tones better than raw intensity"""
+    gray = cv2.cvtColor(np.asarray(img_array, dtype=np.uint8), cv2.COLOR_RGB2GRAY).astype(np.float32)
+    return cv2.magnitude(cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3), cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3))
+
+def estimate_alignment(reference, moving, levels=ALIGN_PYRAMID_LEVELS, max_size=ALIGN_MAX_SIZE):
+    """Estimate the rigid transform that aligns one frame with a reference frame.
+    
+    The estimate is refined coarse to fine over a pyramid of downscaled
+    gradient images, so full-resolution frames are never compared directly.
+    
+    Args:
+        reference: Reference RGB frame
+        moving: RGB frame to align
+        levels: Number of pyramid levels
+        max_size: Width of the finest level used for estimation
+        
+    Returns:
+        np.ndarray: 2x3 float32 matrix for warp_frame at full resolution (identity on failure)
+    """
+    if moving.shape != reference.shape:
+        moving = cv2.resize(moving, (reference.shape[1], reference.shape[0]), interpolation=cv2.INTER_AREA)
+    scale = 1.0
+    while reference.shape[1] > max_size:
+        reference, moving = cv2.pyrDown(reference), cv2.pyrDown(moving)
+        scale *= 2
+    
+    reference_pyramid = [_alignment_features(reference)]
+    moving_pyramid = [_alignment_features(moving)]
+    for _ in range(levels - 1):
+        reference_pyramid.append(cv2.pyrDown(reference_pyramid[-1]))
+        moving_pyramid.append(cv2.pyrDown(moving_pyramid[-1]))
+    
+    warp = np.eye(2, 3, dtype=np.float32)
+    criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 50, 1e-4)
+    for level in reversed(range(levels)):
+        if level < levels - 1:
+            warp[:, 2] *= 2
+        try:
+            _, warp = cv2.findTransformECC(
+                reference_pyramid[level], moving_pyramid[level], warp, cv2.MOTION_EUCLIDEAN, criteria, None, 5
+            )
+        except cv2.error as e:
+            logger.debug(f"Alignment did not converge at pyramid level {level}: {e}")
+    warp[:, 2] *= scale
+    
+    if np.abs(warp[:, 2]).max() > ALIGN_MAX_SHIFT * reference.shape[1] * scale:
+        logger.warning("Rejected implausible alignment estimate")
+        return np.eye(2, 3, dtype=np.float32)
+    return warp
+
+def warp_frame(img_array, matrix):
+    """Apply an alignment transform from estimate_alignment to a frame"""
+    if matrix is None:
+        return img_array
+    height, width = img_array.shape[:2]
+    return cv2.warpAffine(
+        np.asarray(img_array, dtype=np.uint8), np.asarray(matrix, dtype=np.float32), (width, height),
+        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REFLECT
+    )
+
+def get_alignment_transforms(project_folder):
+    """Cached alignment transforms of a project as {year: 2x3 matrix}, empty if not aligned"""
+    alignment = load_json_file(os.path.join(project_folder, ALIGNMENT_FILE), {})
+    return {int(year): np.array(entry["matrix"], dtype=np.float32) for year, entry in alignment.get("transforms", {}).items()}
+
+def align_project(project_folder, project_name, status_placeholder, reference_year=None, max_workers=ALIGN_WORKERS):
+    """Estimate and cache the transform aligning each year of a project with a reference year.
+    
+    Transforms are estimated on the downloaded images in parallel and cached
+    in the project folder; years whose image (and reference) are unchanged
+    reuse their cached transform.
+    
+    Args:
+        project_folder: Folder of the project
+        project_name: Name of the project
+        status_placeholder: Status reporter with write()
+        reference_year: Year to align to (default: the most recent year)
+        max_workers: Number of years aligned at once
+        
+    Returns:
+        dict: Mapping of year to 2x3 matrix
+    """
+    image_files, years = get_project_images(project_folder, project_name, use_processed=False, use_text_overlaid=False)
+    if not image_files:
+        return {}
+    images = {int(year): image for image, year in zip(image_files, years)}
+    reference_year = reference_year if reference_year in images else max(images)
+    reference_key = [reference_year, get_source_signature(images[reference_year])]
+    
+    alignment_path = os.path.join(project_folder, ALIGNMENT_FILE)
+    alignment = load_json_file(alignment_path, {})
+    cached = alignment.get("transforms", {}) if alignment.get("reference") == reference_key else {}
+    transforms = {
+        year: entry for year, entry in ((int(y), e) for y, e in cached.items())
+        if year in images and entry.get("source") == get_source_signature(images[year])
+    }
+    pending = [year for year in images if year not in transforms]
+    if not pending:
+        return get_alignment_transforms(project_folder)
+    
+    status_placeholder.write(f"Aligning {len(pending)} years to {reference_year}...")
+    reference = load_frame(images[reference_year])
+    
+    def align_year(year):
+        if year == reference_year:
+            return year, np.eye(2, 3, dtype=np.float32)
+        return year, estimate_alignment(reference, load_frame(images[year]))
+    
+    # OpenCV releases the GIL, so threads align years in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for year, matrix in executor.map(align_year, pending):
+            transforms[year] = {"matrix": matrix.tolist(), "source": get_source_signature(images[year])}
+            status_placeholder.write(f"Aligned {year}: shift {matrix[0, 2]:.1f}, {matrix[1, 2]:.1f} px")
+    
+    save_json_file(alignment_path, {
+        "reference": reference_key,
+        "transforms": {str(year): entry for year, entry in transforms.items()}
+    })
+    
+    # Labels drawn on unaligned frames are stale
+    index = load_stack_index(project_folder)
+    if index and any(stage.startswith("labeled_") for stage in index["stages"]):
+        index["stages"] = [stage for stage in index["stages"] if not stage.startswith("labeled_")]
+        save_stack_index(project_folder, index)
+    invalidate_project_cache(project_folder)
+    logger.info(f"Aligned {len(pending)} years of {project_name} to {reference_year}")
+    return get_alignment_transforms(project_folder)
+
+# Tone normalization across years
+NORMALIZATION_FILE = "normalization.json"
+NORMALIZE_SAMPLE_SIZE = 256  # Histograms are computed on frames downscaled to this width
+NORMALIZE_WORKERS = 4
+
+def _channel_histograms(img_array):
+    """Normalized cumulative histograms of each RGB channel of a downscaled frame"""
+    height, width = img_array.shape[:2]
+    if width > NORMALIZE_SAMPLE_SIZE:
+        img_array = cv2.resize(img_array, (NORMALIZE_SAMPLE_SIZE, int(height * NORMALIZE_SAMPLE_SIZE / width)),
+                               interpolation=cv2.INTER_AREA)
+    cdfs = []
+    for channel in range(3):
+        hist = cv2.calcHist([np.ascontiguousarray(img_array[..., channel])], [0], None, [256], [0, 256]).ravel()
+        cdf = np.cumsum(hist)
+        cdfs.append(cdf / cdf[-1])
+    return cdfs
+
+def compute_histogram_lut(source, reference_cdfs):
+    """Lookup table mapping a frame's per-channel histograms onto a reference's.
+    
+    Returns:
+        np.ndarray: (256, 1, 3) uint8 table for cv2.LUT
+    """
+    lut = np.empty((256, 1, 3), dtype=np.uint8)
+    for channel, (source_cdf, reference_cdf) in enumerate(zip(_channel_histograms(source), reference_cdfs)):
+        # For each source level, the reference level at the same cumulative frequency
+        lut[:, 0, channel] = np.clip(np.searchsorted(reference_cdf, source_cdf), 0, 255)
+    return lut
+
+def apply_lut(img_array, lut):
+    """Apply a normalization lookup table to a frame (a single cheap table lookup per pixel)"""
+    if lut is None:
+        return img_array
+    return cv2.LUT(np.asarray(img_array, dtype=np.uint8), lut)
+
+def get_normalization_luts(project_folder):
+    """Cached normalization tables of a project as {year: (256, 1, 3) uint8 array}, empty if not normalized"""
+    normalization = load_json_file(os.path.join(project_folder, NORMALIZATION_FILE), {})
+    return {
+        int(year): np.array(entry["lut"], dtype=np.uint8).reshape(256, 1, 3)
+        for year, entry in normalization.get("luts", {}).items()
+    }
+
+def get_lut_digest(lut):
+    """Short digest of a normalization table, used in cache keys"""
+    return hashlib.sha1(lut.tobytes()).hexdigest()[:12] if lut is not None else None
+
+def normalize_project(project_folder, project_name, status_placeholder, reference_year=None, max_workers=NORMALIZE_WORKERS):
+    """Compute and cache per-year histogram-matching tables against a reference year.
+    
+    Tables are computed once from downscaled frames and cached in the
+    project folder; years whose image (and reference) are unchanged reuse
+    their cached table.
+    
+    Args:
+        project_folder: Folder of the project
+        project_name: Name of the project
+        status_placeholder: Status reporter with write()
+        reference_year: Year whose tones the others are matched to (default: the most recent year)
+        max_workers: Number of years processed at once
+        
+    Returns:
+        dict: Mapping of year to lookup table
+    """
+    image_files, years = get_project_images(project_folder, project_name, use_processed=False, use_text_overlaid=False)
+    if not image_files:
+        return {}
+    images = {int(year): image for image, year in zip(image_files, years)}
+    reference_year = reference_year if reference_year in images else max(images)
+    reference_key = [reference_year, get_source_signature(images[reference_year])]
+    
+    normalization_path = os.path.join(project_folder, NORMALIZATION_FILE)
+    normalization = load_json_file(normalization_path, {})
+    cached = normalization.get("luts", {}) if normalization.get("reference") == reference_key else {}
+    luts = {
+        year: entry for year, entry in ((int(y), e) for y, e in cached.items())
+        if year in images and entry.get("source") == get_source_signature(images[year])
+    }
+    pending = [year for year in images if year not in luts]
+    if not pending:
+        return get_normalization_luts(project_folder)
+    
+    status_placeholder.write(f"Matching tones of {len(pending)} years to {reference_year}...")
+    reference_cdfs = _channel_histograms(load_frame(images[reference_year]))
+    
+    def year_lut(year):
+        return year, compute_histogram_lut(load_frame(images[year]), reference_cdfs)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for year, lut in executor.map(year_lut, pending):
+            luts[year] = {"lut": lut.reshape(-1).tolist(), "source": get_source_signature(images[year])}
+    
+    save_json_file(normalization_path, {
+        "reference": reference_key,
+        "luts": {str(year): entry for year, entry in luts.items()}
+    })
+    
+    # Labels drawn on unnormalized frames are stale
+    index = load_stack_index(project_folder)
+    if index and any(stage.startswith("labeled_") for stage in index["stages"]):
+        index["stages"] = [stage for stage in index["stages"] if not stage.startswith("labeled_")]
+        save_stack_index(project_folder, index)
+    invalidate_project_cache(project_folder)
+    logger.info(f"Normalized {len(pending)} years of {project_name} to {reference_year}")
+    return get_normalization_luts(project_folder)
+
+LABEL_INDEX_FILE = ".labels.json"
+
+def add_text_to_images(image_files, years, output_folder, status_placeholder, reuse=True, transforms=None, luts=None,
+                       captions=None):
+    """Adds year text directly to the image files before video creation.
+    
+    Labeled images already made from the same source file are reused unless
+    reuse is False.
+    
+    Args:
+        image_files: List of image file paths
+        years: List of corresponding years for each image
+        output_folder: Folder to save processed images with text
+        status_placeholder: Streamlit container for status updates
+        reuse: Whether to keep labeled images whose source has not changed
+        transforms: Optional {year: alignment matrix} applied before labeling
+        luts: Optional {year: normalization table} applied before labeling
+        captions: Optional {year: caption} drawn after the year
+        
+    Returns:
+        List of paths to new images with text added
+    """
+    # Create output folder if it doesn't exist
+    os.makedirs(output_folder, exist_ok=True)
+    
+    processed_image_files = []
+    font = None
+    # Which source each labeled image was made from, kept beside (not inside) the output folder
+    label_index_path = os.path.join(os.path.dirname(os.path.abspath(output_folder)), LABEL_INDEX_FILE)
+    label_index = load_json_file(label_index_path, {})
+    reused = 0
+    
+    # Process each image
+    for i, (image_path, year) in enumerate(zip(image_files, years)):
+        try:
+            output_name = f"text_{os.path.basename(image_path)}"
+            output_path = os.path.join(output_folder, output_name)
+            matrix = (transforms or {}).get(int(year))
+            source_key = [str(image_path), str(year), get_source_signature(image_path)]
+            if matrix is not None:
+                source_key.append(np.round(matrix, 3).tolist())
+            lut = (luts or {}).get(int(year))
+            if lut is not None:
+                source_key.append(get_lut_digest(lut))
+            caption = (captions or {}).get(int(year))
+            if caption:
+                source_key.append(caption)
+            if reuse and label_index.get(output_name) == source_key and os.path.exists(output_path):
+                processed_image_files.append(output_path)
+                reused += 1
+                continue
+            
+            status_placeholder.write(f"Adding text to image {i+1}/{len(image_files)}...")
+            if font is None:
+                font = load_label_font()
+            img = apply_lut(warp_frame(np.array(open_image(image_path).convert('RGB')), matrix), lut)
+            Image.fromarray(label_frame(img, year, font, caption)).save(output_path, quality=95)
+            label_index[output_name] = source_key
+            record_artifact(output_path)
+            logger.info(f"Added text to image: {output_path}")
+            
+            # Add to list of processed files
+            processed_image_files.append(output_path)
+            
+        except Exception as e:
+            logger.exception(f"Failed to add text to image {image_path}: {e}")
+            # Use original image if text addition fails
+            processed_image_files.append(image_path)
+            status_placeholder.write(f"⚠️ Could not add text to image {i+1}, using original")
+    
+    if reused:
+        status_placeholder.write(f"Reused {reused} already labeled images")
+    if reused < len(image_files):
+        save_json_file(label_index_path, label_index)
+        invalidate_project_cache(os.path.dirname(os.path.abspath(output_folder)))
+    return processed_image_files
+
+def create_image_gallery(image_files, years, project_name):
+    """Create an HTML gallery of images with download options."""
+    if not image_files:
+        return "<p>No images available</p>"
+    
+    # Flight date and source, where the imagery metadata is known
+    captions = {year: html.escape(caption) for year, caption in get_project_captions(os.path.join(OUTPUT_FOLDER, project_name)).items()}
+    
+    # Add CSS for the gallery
+    gallery_css = """
     <style>
         .image-gallery {
             margin: 20px 0;
@@ -982,8 +3530,14 @@ def create_image_gallery(image_files, years, project_name):
     for i, (image_path, year) in enumerate(zip(image_files, years)):
         try:
             # Create a base64 representation for preview
-            with open(image_path, "rb") as img_file:
-                img_data = base64.b64encode(img_file.read()).decode()
+            if isinstance(image_path, np.ndarray):
+                # Frame stack slice - encode directly without touching the image files
+                buffer = io.BytesIO()
+                Image.fromarray(np.asarray(image_path)).save(buffer, format="JPEG", quality=90)
+                img_data = base64.b64encode(buffer.getvalue()).decode()
+                image_path = f"{project_name} frame {year}"
+            else:
+                img_data = base64.b64encode(read_image_bytes(image_path)).decode()
                 
             # Generate HTML for each image tile
             gallery_html += f"""
@@ -991,7 +3545,7 @@ def create_image_gallery(image_files, years, project_name):
                 <div class="gallery-img-container">
                     <img src="data:image/jpeg;base64,{img_data}" alt="Aerial view from {year}" loading="lazy" />
                     <div class="gallery-overlay">
-                        <div class="year-badge">{year}</div>
+                        <div class="year-badge" title="{captions.get(int(year), '')}">{year}<br/><small>{captions.get(int(year), '')}</small></div>
                         <a href="data:image/jpeg;base64,{img_data}" download="{project_name}_{year}.jpg" class="download-btn">
                             <span>Download</span>
                         </a>
@@ -1002,160 +3556,1442 @@ def create_image_gallery(image_files, years, project_name):
         except Exception as e:
             logger.error(f"Error creating gallery item for {image_path}: {e}")
     
-    # Close the gallery div
-    gallery_html += """
-        </div>
-    </div>
+    # Close the gallery div
+    gallery_html += """
+        </div>
+    </div>
+    """
+    
+    return gallery_css + gallery_html
+
+def get_zip_download_link(image_files, years, project_name):
+    """Create a download link for a zip file containing all images.
+    
+    Args:
+        image_files: List of image file paths
+        years: List of corresponding years for each image
+        project_name: Name of the project for zip filename
+        
+    Returns:
+        HTML string with download link
+    """
+    try:
+        # Create a BytesIO object to store the zip file
+        zip_buffer = io.BytesIO()
+        
+        # Create a zip file in the buffer
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for image_path, year in zip(image_files, years):
+                # Add each image to the zip with a descriptive filename
+                filename = f"{project_name}_{year}.jpg"
+                zip_file.writestr(filename, read_image_bytes(image_path), compress_type=zipfile.ZIP_STORED)
+        
+        # Get the value of the BytesIO buffer
+        zip_buffer.seek(0)
+        zip_data = zip_buffer.getvalue()
+        
+        # Encode as base64 for download link
+        b64 = base64.b64encode(zip_data).decode()
+        
+        # Create download link
+        href = f'<a href="data:application/zip;base64,{b64}" download="{project_name}_images.zip" class="gallery-btn">📥 Download All Images</a>'
+        return href
+    except Exception as e:
+        logger.error(f"Error creating zip download link: {e}")
+        return "<p>Error creating download link</p>"
+
+# Sprite atlases for previewing timelapses in the browser without encoding
+ATLAS_FOLDER = os.path.join(CACHE_FOLDER, "atlas")
+ATLAS_TILE_SIZE = 384
+
+def get_sprite_atlas(image_files, years, project_name, stage, tile_size=ATLAS_TILE_SIZE):
+    """Pack a project's frames into one cached grid image.
+    
+    The atlas is rebuilt only when the set of source images changes.
+    
+    Args:
+        image_files: List of image paths or archive member references
+        years: List of corresponding years
+        project_name: Name of the project
+        stage: Image stage the frames come from, part of the cache file name
+        tile_size: Width/height of each frame in the atlas
+        
+    Returns:
+        tuple: (atlas path, metadata dict with years, columns and tile_size), or (None, None)
+    """
+    if not image_files:
+        return None, None
+    os.makedirs(ATLAS_FOLDER, exist_ok=True)
+    atlas_path = os.path.join(ATLAS_FOLDER, f"{project_name}_{stage}.jpg")
+    meta_path = os.path.join(ATLAS_FOLDER, f"{project_name}_{stage}.json")
+    
+    # Key on the sources' paths and modification state so edits rebuild the atlas
+    key = hashlib.sha1(json.dumps([
+        [str(image), str(year), None if is_archive_ref(image) else get_file_signature(image)]
+        for image, year in zip(image_files, years)
+    ] + [tile_size]).encode()).hexdigest()
+    if os.path.exists(atlas_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta.get("key") == key:
+                return atlas_path, meta
+        except Exception as e:
+            logger.warning(f"Could not read atlas metadata {meta_path}: {e}")
+    
+    columns = int(np.ceil(np.sqrt(len(image_files))))
+    rows = int(np.ceil(len(image_files) / columns))
+    atlas = Image.new('RGB', (columns * tile_size, rows * tile_size))
+    atlas_years = []
+    for i, (image, year) in enumerate(zip(image_files, years)):
+        try:
+            with open_image(image) as img:
+                tile = img.convert('RGB').resize((tile_size, tile_size), Image.LANCZOS)
+        except Exception as e:
+            logger.warning(f"Skipping {image} in atlas: {e}")
+            continue
+        slot = len(atlas_years)
+        atlas.paste(tile, ((slot % columns) * tile_size, (slot // columns) * tile_size))
+        atlas_years.append(int(year))
+    
+    atlas.save(f"{atlas_path}.part", format="JPEG", quality=85)
+    os.replace(f"{atlas_path}.part", atlas_path)
+    meta = {"key": key, "years": atlas_years, "columns": columns, "tile_size": tile_size}
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    logger.info(f"Built sprite atlas for {project_name} ({len(atlas_years)} frames)")
+    return atlas_path, meta
+
+def create_flipbook_html(atlas_path, meta, frame_duration=1.0):
+    """Create an HTML player that flips through the frames of a sprite atlas.
+    
+    Speed, year range and direction are adjusted in the browser, so trying
+    settings needs no re-encoding.
+    """
+    with open(atlas_path, 'rb') as f:
+        b64 = base64.b64encode(f.read()).decode()
+    tile = meta["tile_size"]
+    year_options = "".join(f'<option value="{i}">{year}</option>' for i, year in enumerate(meta["years"]))
+    
+    return f"""
+    <style>
+        .flipbook {{ font-family: sans-serif; }}
+        .flipbook-frame {{
+            width: {tile}px;
+            height: {tile}px;
+            background-image: url(data:image/jpeg;base64,{b64});
+            background-repeat: no-repeat;
+            border-radius: 8px;
+        }}
+        .flipbook-controls {{ margin-top: 10px; display: flex; flex-wrap: wrap; gap: 12px; align-items: center; }}
+        .flipbook-year {{ font-size: 1.4em; font-weight: bold; margin-top: 6px; }}
+    </style>
+    <div class="flipbook">
+        <div class="flipbook-frame" id="flipbook-frame"></div>
+        <div class="flipbook-year" id="flipbook-year"></div>
+        <div class="flipbook-controls">
+            <button id="flipbook-play">⏸ Pause</button>
+            <label>From <select id="flipbook-start">{year_options}</select></label>
+            <label>To <select id="flipbook-end">{year_options}</select></label>
+            <label>Seconds per frame
+                <input type="range" id="flipbook-speed" min="0.1" max="5" step="0.1" value="{frame_duration}">
+                <span id="flipbook-speed-value">{frame_duration}</span>
+            </label>
+            <label><input type="checkbox" id="flipbook-reverse"> Reverse</label>
+        </div>
+    </div>
+    <script>
+        const years = {json.dumps(meta["years"])};
+        const columns = {meta["columns"]};
+        const tile = {tile};
+        const frame = document.getElementById("flipbook-frame");
+        const label = document.getElementById("flipbook-year");
+        const start = document.getElementById("flipbook-start");
+        const end = document.getElementById("flipbook-end");
+        const speed = document.getElementById("flipbook-speed");
+        const reverse = document.getElementById("flipbook-reverse");
+        const play = document.getElementById("flipbook-play");
+        end.value = years.length - 1;
+        
+        let position = 0;
+        let playing = true;
+        let timer = null;
+        
+        function frames() {{
+            let first = Math.min(+start.value, +end.value);
+            let last = Math.max(+start.value, +end.value);
+            let indices = [];
+            for (let i = first; i <= last; i++) indices.push(i);
+            return reverse.checked ? indices.reverse() : indices;
+        }}
+        
+        function show() {{
+            const indices = frames();
+            position = position % indices.length;
+            const i = indices[position];
+            frame.style.backgroundPosition = `-${{(i % columns) * tile}}px -${{Math.floor(i / columns) * tile}}px`;
+            label.textContent = years[i];
+        }}
+        
+        function schedule() {{
+            clearTimeout(timer);
+            if (!playing) return;
+            timer = setTimeout(() => {{ position += 1; show(); schedule(); }}, speed.value * 1000);
+        }}
+        
+        play.onclick = () => {{
+            playing = !playing;
+            play.textContent = playing ? "⏸ Pause" : "▶ Play";
+            schedule();
+        }};
+        speed.oninput = () => {{ document.getElementById("flipbook-speed-value").textContent = speed.value; schedule(); }};
+        [start, end, reverse].forEach(el => el.onchange = () => {{ position = 0; show(); schedule(); }});
+        
+        show();
+        schedule();
+    </script>
+    """
+
+def get_project_images(project_folder, project_name, use_processed=False, use_text_overlaid=True, archive_path=None):
+    """Get all image files and their years for a project.
+    
+    Args:
+        project_folder: Path to the project folder
+        project_name: Name of the project
+        use_processed: Whether to use processed images if available
+        use_text_overlaid: Whether to use text-overlaid images if available
+        archive_path: Project archive to read images from when the folder no longer has them
+        
+    Returns:
+        tuple: (list of image paths or archive member references, list of corresponding years)
+    """
+    if archive_path and os.path.exists(archive_path) and not project_has_local_images(project_folder):
+        logger.info(f"Reading images for {project_name} from archive: {archive_path}")
+        return get_archive_images(archive_path, project_name, use_processed, use_text_overlaid)
+    
+    # Determine source folder based on priority
+    text_images_folder = os.path.join(project_folder, "text_images")
+    processed_folder = os.path.join(project_folder, "processed")
+    
+    # Choose folder based on priority: text_overlaid > processed > original
+    if use_text_overlaid and os.path.exists(text_images_folder) and len(os.listdir(text_images_folder)) > 0:
+        source_folder = text_images_folder
+        logger.info(f"Using text-overlaid images from: {text_images_folder}")
+    elif use_processed and os.path.exists(processed_folder) and len(os.listdir(processed_folder)) > 0:
+        source_folder = processed_folder
+        logger.info(f"Using processed images from: {processed_folder}")
+    else:
+        source_folder = project_folder
+        logger.info(f"Using original images from: {project_folder}")
+    
+    # Get all image files
+    image_files = []
+    years = []
+    
+    # Try to find images for all possible years
+    for year, layer_type in sorted(aerials, key=lambda x: x[0]):
+        # Try different filename patterns, including text-overlaid images
+        possible_patterns = []
+        
+        # Add text-overlaid image patterns
+        if source_folder == text_images_folder:
+            possible_patterns.extend([
+                f"text_{year}_{project_name}.jpg",
+                f"text_{year}_{layer_type}.jpg",
+                f"text_{year}.jpg"
+            ])
+        else:
+            # Regular image patterns
+            possible_patterns.extend([
+                f"{year}_{project_name}.jpg",
+                f"{year}_{layer_type}.jpg",
+                f"{year}.jpg"
+            ])
+        
+        found = False
+        for pattern in possible_patterns:
+            image_path = os.path.join(source_folder, pattern)
+            if os.path.exists(image_path):
+                image_files.append(image_path)
+                years.append(str(year))
+                found = True
+                break
+        
+        # If not found in primary folder, try fallback folders
+        if not found and source_folder != project_folder:
+            # Try the original folder
+            for pattern in [f"{year}_{project_name}.jpg", f"{year}_{layer_type}.jpg", f"{year}.jpg"]:
+                image_path = os.path.join(project_folder, pattern)
+                if os.path.exists(image_path):
+                    image_files.append(image_path)
+                    years.append(str(year))
+                    found = True
+                    break
+    
+    # As a fallback, find any images with year in filename in the source folder
+    if not image_files:
+        for file in os.listdir(source_folder):
+            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                try:
+                    # Try to extract year from filename, handling text_ prefix
+                    base_name = file
+                    if file.startswith("text_"):
+                        base_name = file[5:]  # Remove "text_" prefix
+                    
+                    parts = base_name.split('_')
+                    if len(parts) > 0:
+                        year_str = parts[0]
+                        if year_str.isdigit():
+                            year = int(year_str)
+                            image_path = os.path.join(source_folder, file)
+                            image_files.append(image_path)
+                            years.append(str(year))
+                except Exception as e:
+                    logger.warning(f"Could not extract year from filename {file}: {e}")
+    
+    # If still no images found and using text_images folder, try original folder
+    if not image_files and source_folder != project_folder:
+        logger.info(f"No images found in {source_folder}, falling back to {project_folder}")
+        return get_project_images(project_folder, project_name, False, False)
+    
+    return image_files, years
+
+# Memory-mapped year stacks
+STACK_INDEX_FILE = "stack_index.json"
+
+def get_stack_path(project_folder, stage):
+    """Path of the memory-mapped stack for a pipeline stage (raw, processed, labeled_*)"""
+    return os.path.join(project_folder, f"{stage}_stack.npy")
+
+def load_stack_index(project_folder):
+    """Load the year index of a project's frame stacks, or None if there is none"""
+    index_path = os.path.join(project_folder, STACK_INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading stack index for {project_folder}: {e}")
+        return None
+
+def save_stack_index(project_folder, index):
+    """Save the year index of a project's frame stacks"""
+    with open(os.path.join(project_folder, STACK_INDEX_FILE), 'w') as f:
+        json.dump(index, f, indent=4)
+
+def build_year_stack(project_folder, project_name, status_placeholder):
+    """Decodes a project's downloaded images once into a memory-mapped (years x H x W x 3) stack.
+    
+    Args:
+        project_folder: Path to the project folder
+        project_name: Name of the project
+        status_placeholder: Streamlit container for status updates
+        
+    Returns:
+        dict: The stack index, or None if there were no images
+    """
+    image_files, years = get_project_images(project_folder, project_name, use_processed=False, use_text_overlaid=False)
+    if not image_files:
+        status_placeholder.write("❌ No images found to build frame stack")
+        return None
+    
+    with Image.open(image_files[0]) as img:
+        width, height = img.size
+    
+    status_placeholder.write(f"Decoding {len(image_files)} images into frame stack...")
+    stack = np.lib.format.open_memmap(
+        get_stack_path(project_folder, "raw"), mode="w+", dtype=np.uint8,
+        shape=(len(image_files), height, width, 3)
+    )
+    for i, image_path in enumerate(image_files):
+        with Image.open(image_path) as img:
+            img = img.convert('RGB')
+            if img.size != (width, height):
+                img = img.resize((width, height), Image.LANCZOS)
+            stack[i] = np.asarray(img)
+    stack.flush()
+    del stack
+    record_artifact(get_stack_path(project_folder, "raw"))
+    
+    index = {
+        "years": [int(y) for y in years],
+        "shape": [len(image_files), height, width, 3],
+        "stages": ["raw"],
+        "created": datetime.now().isoformat()
+    }
+    save_stack_index(project_folder, index)
+    invalidate_project_cache(project_folder)
+    logger.info(f"Built frame stack for {project_name}: {index['shape']}")
+    return index
+
+def open_year_stack(project_folder, stage="raw"):
+    """Opens a stage's frame stack read-only without loading it into memory.
+    
+    Returns:
+        tuple: (memory-mapped array, list of years), or (None, None) if unavailable
+    """
+    index = load_stack_index(project_folder)
+    stack_path = get_stack_path(project_folder, stage)
+    if not index or stage not in index.get("stages", []) or not os.path.exists(stack_path):
+        return None, None
+    return np.load(stack_path, mmap_mode="r"), index["years"]
+
+def create_stage_stack(project_folder, source_stage, stage, transform, status_placeholder):
+    """Applies a per-frame transform to one stage's stack, writing the result as another stage.
+    
+    Args:
+        project_folder: Path to the project folder
+        source_stage: Stage to read frames from
+        stage: Stage name to write
+        transform: Function (frame, year) -> frame
+        status_placeholder: Streamlit container for status updates
+        
+    Returns:
+        bool: True if the stage stack was written
+    """
+    source, years = open_year_stack(project_folder, source_stage)
+    if source is None:
+        status_placeholder.write(f"❌ No {source_stage} frame stack available")
+        return False
+    
+    output = np.lib.format.open_memmap(
+        get_stack_path(project_folder, stage), mode="w+", dtype=np.uint8, shape=source.shape
+    )
+    for i, year in enumerate(years):
+        status_placeholder.write(f"🔄 {stage}: frame {i+1}/{len(years)} ({year})...")
+        output[i] = transform(source[i], year)
+    output.flush()
+    del output
+    record_artifact(get_stack_path(project_folder, stage))
+    
+    # Labels drawn from the previous version of this stage are now stale
+    index = load_stack_index(project_folder)
+    index["stages"] = [s for s in index["stages"] if s != f"labeled_{stage}"]
+    if stage not in index["stages"]:
+        index["stages"].append(stage)
+    save_stack_index(project_folder, index)
+    invalidate_project_cache(project_folder)
+    logger.info(f"Wrote {stage} frame stack from {source_stage} in {project_folder}")
+    return True
+
+def process_stack(project_folder, status_placeholder):
+    """Reduce watermarks on the raw frame stack, writing the processed stage."""
+    return create_stage_stack(
+        project_folder, "raw", "processed",
+        lambda frame, year: reduce_watermark_array(frame),
+        status_placeholder
+    )
+
+def label_stack(project_folder, source_stage, status_placeholder):
+    """Align and normalize (where the project has transforms and tables) and label a stage's frames, writing labeled_<source_stage>."""
+    font = load_label_font()
+    transforms = get_alignment_transforms(project_folder)
+    luts = get_normalization_luts(project_folder)
+    captions = get_project_captions(project_folder)
+    return create_stage_stack(
+        project_folder, source_stage, f"labeled_{source_stage}",
+        lambda frame, year: label_frame(
+            apply_lut(warp_frame(frame, transforms.get(int(year))), luts.get(int(year))), year, font, captions.get(int(year))
+        ),
+        status_placeholder
+    )
+
+def get_stack_frames(project_folder, stage, include_years=None):
+    """Get zero-copy frame slices and years from a stage's stack, in the requested year order.
+    
+    Returns:
+        tuple: (list of frame arrays, list of year strings), empty if the stack is unavailable
+    """
+    stack, stack_years = open_year_stack(project_folder, stage)
+    if stack is None:
+        return [], []
+    order = include_years if include_years else sorted(stack_years)
+    positions = {year: i for i, year in enumerate(stack_years)}
+    frames = [stack[positions[year]] for year in order if year in positions]
+    years = [str(year) for year in order if year in positions]
+    return frames, years
+
+# Cached data layer for project browsing
+PROJECT_REVISION_FILE = ".revision"
+
+def invalidate_project_cache(project_folder):
+    """Mark a project as changed so cached browsing data for it is rebuilt.
+    
+    Works across processes (e.g. background workers) because the marker's
+    modification time is part of every project cache key.
+    """
+    try:
+        with open(os.path.join(project_folder, PROJECT_REVISION_FILE), 'w') as f:
+            f.write(datetime.now().isoformat())
+    except OSError as e:
+        logger.warning(f"Could not invalidate cache for {project_folder}: {e}")
+
+def get_project_signature(project_folder):
+    """Modification state of a project's folders, used as a cache key"""
+    signature = []
+    for path in (
+        project_folder,
+        os.path.join(project_folder, "processed"),
+        os.path.join(project_folder, "text_images"),
+        os.path.join(project_folder, PROJECT_REVISION_FILE),
+    ):
+        try:
+            signature.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def get_file_signature(file_path):
+    """Modification time and size of a file, used as a cache key"""
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def cached_project_images(project_folder, project_name, use_processed, use_text_overlaid, signature, archive_path=None, archive_signature=None):
+    """Cached get_project_images, keyed by the project's (and its archive's) modification state"""
+    return get_project_images(project_folder, project_name, use_processed=use_processed, use_text_overlaid=use_text_overlaid, archive_path=archive_path)
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def cached_image_gallery(image_files, years, project_name, signature):
+    """Cached create_image_gallery for image files"""
+    return create_image_gallery(list(image_files), list(years), project_name)
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def cached_stack_gallery(project_folder, project_name, signature):
+    """Cached gallery built from the labeled frame stack, or None if there is none"""
+    for stage in ("labeled_processed", "labeled_raw"):
+        frames, frame_years = get_stack_frames(project_folder, stage)
+        if frames:
+            return create_image_gallery(frames, frame_years, project_name)
+    return None
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_flipbook_html(image_files, years, project_name, stage, frame_duration, signature):
+    """Cached flipbook player over the project's sprite atlas"""
+    atlas_path, meta = get_sprite_atlas(list(image_files), list(years), project_name, stage)
+    if atlas_path is None:
+        return None
+    return create_flipbook_html(atlas_path, meta, frame_duration)
+
+# These hold whole base64-encoded files, so only a few recent ones are kept
+@st.cache_data(show_spinner=False, max_entries=4, ttl=600)
+def cached_zip_download_link(image_files, years, project_name, signature):
+    """Cached get_zip_download_link"""
+    return get_zip_download_link(list(image_files), list(years), project_name)
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=600)
+def cached_video_html(video_path, signature):
+    """Cached get_video_html, keyed by the video file's modification state"""
+    return get_video_html(video_path)
+
+def file_download_button(file_path, label, key):
+    """Download button that streams a stored file instead of embedding it in the page"""
+    with open(file_path, "rb") as f:
+        st.download_button(label, f, file_name=os.path.basename(file_path), key=key)
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def cached_project_map_html(latitude, longitude, size):
+    """Rendered HTML for a project's location map"""
+    m = folium.Map(location=[latitude, longitude], zoom_start=15)
+    folium.Marker([latitude, longitude]).add_to(m)
+    
+    # Add rectangle to show bounds
+    if size:
+        half_size = size / 2
+        bounds = [
+            [latitude - half_size, longitude - half_size],
+            [latitude + half_size, longitude + half_size]
+        ]
+        folium.Rectangle(bounds=bounds, color='red', fill=True, fill_opacity=0.2).add_to(m)
+    
+    return m.get_root().render()
+
+@st.cache_data(show_spinner=False, ttl=24 * 3600, max_entries=1000)
+def cached_available_years(latitude, longitude, size):
+    """Cached get_available_years; availability of historic imagery rarely changes"""
+    return get_available_years(latitude, longitude, size)
+
+# Thumbnails, poster frames and cache warm-up for the projects list
+THUMBNAIL_FOLDER = os.path.join(CACHE_FOLDER, "thumbnails")
+THUMBNAIL_SIZE = 96
+POSTER_FOLDER = os.path.join(CACHE_FOLDER, "posters")
+WARMUP_RECENT_PROJECTS = 10
+WARMUP_WORKERS = 2
+
+def get_project_thumbnail(project_folder, project_name, signature, archive_path=None, build=True):
+    """Path of a small thumbnail of the project's latest year, keyed by the project's state.
+    
+    With build=False only an existing thumbnail is returned, so listing
+    projects never decodes images.
+    """
+    key = hashlib.sha1(project_name.encode()).hexdigest()
+    thumbnail_path = os.path.join(
+        THUMBNAIL_FOLDER, f"{key}_{hashlib.sha1(repr(signature).encode()).hexdigest()[:12]}.jpg"
+    )
+    if os.path.exists(thumbnail_path) or not build:
+        return thumbnail_path if os.path.exists(thumbnail_path) else None
+    
+    image_files, image_years = get_project_images(
+        project_folder, project_name, use_processed=True, use_text_overlaid=True, archive_path=archive_path
+    )
+    if not image_files:
+        return None
+    latest = max(zip(image_files, image_years), key=lambda item: int(item[1]))[0]
+    os.makedirs(THUMBNAIL_FOLDER, exist_ok=True)
+    with open_image(latest) as img:
+        thumbnail = img.convert('RGB')
+        thumbnail.thumbnail((THUMBNAIL_SIZE * 2, THUMBNAIL_SIZE * 2))
+        thumbnail.save(thumbnail_path, "JPEG", quality=80)
+    # Drop thumbnails of the project's earlier states
+    for name in os.listdir(THUMBNAIL_FOLDER):
+        if name.startswith(f"{key}_") and os.path.join(THUMBNAIL_FOLDER, name) != thumbnail_path:
+            os.remove(os.path.join(THUMBNAIL_FOLDER, name))
+    return thumbnail_path
+
+def get_video_poster(video_path):
+    """Path of a JPEG of a video's first frame, extracted once per version of the video"""
+    signature = get_file_signature(video_path)
+    if signature is None:
+        return None
+    poster_path = os.path.join(POSTER_FOLDER, f"{hashlib.sha1(f'{os.path.abspath(video_path)}|{signature}'.encode()).hexdigest()}.jpg")
+    if os.path.exists(poster_path):
+        return poster_path
+    capture = cv2.VideoCapture(video_path)
+    try:
+        ok, frame = capture.read()
+    finally:
+        capture.release()
+    if not ok:
+        return None
+    os.makedirs(POSTER_FOLDER, exist_ok=True)
+    cv2.imwrite(poster_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return poster_path
+
+def get_warmup_projects(config, recent=WARMUP_RECENT_PROJECTS):
+    """Favorite projects followed by the most recently created ones, without duplicates"""
+    projects = {p["name"]: p for p in config["projects"]}
+    favorites = [name for name in config.get("favorites", []) if name in projects]
+    newest = sorted(
+        (p for p in config["projects"] if not p.get("archived", False)),
+        key=lambda p: p.get("created", ""), reverse=True
+    )[:recent]
+    names = list(dict.fromkeys(favorites + [p["name"] for p in newest]))
+    return [projects[name] for name in names]
+
+def warm_project_cache(project):
+    """Build everything the projects page shows for a project, with the same cache keys it uses"""
+    name = project["name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, name)
+    signature = get_project_signature(project_folder)
+    archive_path = project.get("archive_path")
+    if not (archive_path and os.path.exists(archive_path)):
+        archive_path = None
+    
+    get_project_thumbnail(project_folder, name, signature, archive_path)
+    if 'latitude' in project and 'longitude' in project:
+        cached_project_map_html(project['latitude'], project['longitude'], project.get('size'))
+    
+    image_files, image_years = cached_project_images(
+        project_folder, name, True, True, signature,
+        archive_path, get_file_signature(archive_path) if archive_path else None
+    )
+    if image_files:
+        if not (project.get("frame_stack") and cached_stack_gallery(project_folder, name, signature) is not None):
+            cached_image_gallery(tuple(image_files), tuple(image_years), name, signature)
+    
+    videos = project.get("videos", [])
+    if videos and os.path.exists(videos[-1]["path"]):
+        get_video_poster(videos[-1]["path"])
+
+def warm_caches(config, recent=WARMUP_RECENT_PROJECTS, max_workers=WARMUP_WORKERS):
+    """Warm the caches of favorite and recent projects so their first visit is fast"""
+    projects = get_warmup_projects(config, recent)
+    started = time.time()
+    
+    def warm(project):
+        try:
+            warm_project_cache(project)
+        except Exception as e:
+            logger.warning(f"Could not warm caches for {project['name']}: {e}")
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(warm, projects))
+    logger.info(f"Warmed caches for {len(projects)} projects in {time.time() - started:.1f}s")
+
+@st.cache_resource(show_spinner=False)
+def start_cache_warmup():
+    """Warm project caches in the background, once per server process"""
+    thread = threading.Thread(target=warm_caches, args=(load_config(),), daemon=True)
+    thread.start()
+    return thread
+
+def toggle_favorite(project_name):
+    """Add a project to the favorites or remove it"""
+    def toggle(config):
+        favorites = config.setdefault("favorites", [])
+        if project_name in favorites:
+            favorites.remove(project_name)
+        else:
+            favorites.append(project_name)
+    
+    update_config(toggle)
+
+PROJECTS_PER_PAGE_OPTIONS = [10, 25, 50, 100]
+
+def render_project_panel(project, config):
+    """Render the details, previews and actions for a single opened project."""
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.write(f"**Location:** {project.get('latitude', 'N/A')}, {project.get('longitude', 'N/A')}")
+        
+        # Project folder state keys the cached previews below
+        project_folder = os.path.join(OUTPUT_FOLDER, project['name'])
+        project_signature = get_project_signature(project_folder)
+        
+        # Archived projects stay browsable straight from their archive
+        archive_path = project.get("archive_path")
+        if not (archive_path and os.path.exists(archive_path)):
+            archive_path = None
+        
+        # Opening a project counts as using its artifacts for LRU eviction (once per session)
+        touched = st.session_state.setdefault("touched_projects", set())
+        if project['name'] not in touched:
+            get_project_thumbnail(project_folder, project['name'], project_signature, archive_path)
+            for stage in ("raw", "processed", "text_images", "stack"):
+                touch_artifacts(project['name'], stage)
+            touched.add(project['name'])
+        
+        # Only the selected view is rendered (st.tabs would build all three)
+        view = st.radio("View", ["Map", "Image Gallery", "Video", "Changes"], horizontal=True,
+                        key=f"view_{project['name']}", label_visibility="collapsed")
+        
+        # Map
+        if view == "Map":
+            if 'latitude' in project and 'longitude' in project:
+                map_html = cached_project_map_html(project['latitude'], project['longitude'], project.get('size'))
+                st.components.v1.html(map_html, width=600, height=300)
+        
+        # Image Gallery
+        elif view == "Image Gallery":
+            # Get project images - prefer text-overlaid images
+            image_files, image_years = cached_project_images(
+                project_folder, project['name'], True, True, project_signature,
+                archive_path, get_file_signature(archive_path) if archive_path else None
+            )
+            
+            if image_files:
+                # Zipping and encoding every image is slow, so the link is built on request
+                if st.button("Prepare ZIP Download", key=f"zip_{project['name']}"):
+                    st.markdown(cached_zip_download_link(tuple(image_files), tuple(image_years), project['name'], project_signature), unsafe_allow_html=True)
+                
+                # Prefer slices of the labeled frame stack over decoding image files
+                gallery_html = None
+                if project.get("frame_stack"):
+                    gallery_html = cached_stack_gallery(project_folder, project['name'], project_signature)
+                if gallery_html is None:
+                    gallery_html = cached_image_gallery(tuple(image_files), tuple(image_years), project['name'], project_signature)
+                
+                # Display the gallery
+                st.components.v1.html(gallery_html, height=800, scrolling=True)
+            else:
+                st.info("No images available for this project")
+        
+        # Change analysis
+        elif view == "Changes":
+            summary = load_change_summary(project_folder)
+            if summary:
+                span = summary["span"]
+                st.write(f"**{span['start']} → {span['end']}:** {span['changed_fraction']:.1%} of the area changed")
+                st.table({
+                    "Period": [f"{row['start']}–{row['end']}" for row in summary["pairs"]],
+                    "Changed": [f"{row['changed_fraction']:.1%}" for row in summary["pairs"]],
+                    "Mean change": [row["mean_change"] for row in summary["pairs"]],
+                })
+                heatmaps = [(f"{span['start']}–{span['end']}", span["heatmap"]), ("Cumulative", summary["cumulative_heatmap"])]
+                heatmaps += [(f"{row['start']}–{row['end']}", row["heatmap"]) for row in summary["pairs"]]
+                period = st.selectbox("Heatmap", [label for label, _ in heatmaps], key=f"heatmap_{project['name']}")
+                heatmap_path = dict(heatmaps)[period]
+                if os.path.exists(heatmap_path):
+                    st.image(heatmap_path, use_container_width=True)
+            else:
+                st.info("No change analysis yet. Use Analyze Changes to create one.")
+        
+        # Video preview
+        else:
+            # Display latest video if available
+            if "videos" in project and project["videos"]:
+                latest_video = project["videos"][-1]
+                video_path = latest_video["path"]
+                if os.path.exists(video_path):
+                    st.markdown("**Latest Timelapse:**", unsafe_allow_html=True)
+                    st.markdown(cached_video_html(video_path, get_file_signature(video_path)), unsafe_allow_html=True)
+            else:
+                st.info("No videos created yet for this project")
+    
+    with col2:
+        project_folder = os.path.join(OUTPUT_FOLDER, project['name'])
+        
+        if os.path.exists(project_folder) or archive_path:
+            # Action buttons
+            if st.button("Create New Timelapse", key=f"new_timelapse_{project['name']}"):
+                st.session_state.selected_project = project['name']
+                st.rerun()
+            
+            # Download buttons for videos
+            if "videos" in project and project["videos"]:
+                st.write("**Available Videos:**")
+                for i, video in enumerate(project["videos"]):
+                    video_path = video["path"]
+                    if os.path.exists(video_path):
+                        st.markdown(
+                            f'<div class="video-info">' +
+                            f'<span class="video-date">{video["created"].split("T")[0]}</span><br/>' +
+                            get_year_badges(video["years"]) +
+                            '</div>',
+                            unsafe_allow_html=True
+                        )
+                        file_download_button(video_path, f"📥 Download Video {i+1}",
+                                             key=f"download_{project['name']}_{i}")
+                    elif video.get("evicted"):
+                        # Removed under the storage budget - render it again on request
+                        if st.button(f"🔁 Re-render Video {i+1}", key=f"rerender_{project['name']}_{i}"):
+                            job_id = enqueue_job("timelapse", {
+                                "project_name": project["name"],
+                                "years": video["years"],
+                                "use_processed": project.get("reduce_watermarks", False),
+                                "use_stack": project.get("frame_stack", False)
+                            })
+                            start_worker_pool(JOB_WORKERS)
+                            st.session_state.setdefault("active_jobs", []).append(job_id)
+                            st.info("Video queued for rendering")
+            
+            if st.button("Analyze Changes", key=f"analyze_{project['name']}"):
+                job_id = enqueue_job("analyze", {"project_name": project["name"], "use_processed": project.get("reduce_watermarks", False)})
+                start_worker_pool(JOB_WORKERS)
+                st.session_state.setdefault("active_jobs", []).append(job_id)
+                st.info("Change analysis queued")
+            
+            # Labeled images evicted under the storage budget
+            text_images_folder = os.path.join(project_folder, "text_images")
+            if (not project.get("frame_stack") and project_has_local_images(project_folder)
+                    and (not os.path.exists(text_images_folder) or not os.listdir(text_images_folder))):
+                if st.button("Regenerate Labeled Images", key=f"regenerate_{project['name']}"):
+                    job_id = enqueue_job("regenerate", {"project_name": project["name"], "stage": "text_images"})
+                    start_worker_pool(JOB_WORKERS)
+                    st.session_state.setdefault("active_jobs", []).append(job_id)
+                    st.info("Labeled images queued for regeneration")
+            
+            # Archive button
+            if not project.get("archived", False):
+                if st.button("Archive Project", key=f"archive_{project['name']}"):
+                    archive_project(project_folder, config)
+                    st.success(f"Project archived!")
+                    st.rerun()
+            else:
+                st.info("This project is archived")
+                if "archive_path" in project and os.path.exists(project["archive_path"]):
+                    file_download_button(project["archive_path"], "📥 Download Archive",
+                                         key=f"download_archive_{project['name']}")
+        else:
+            st.error("Project files not found")
+
+# Background job handlers (run by jobs.py worker processes)
+JOB_WORKERS = 2
+
+def record_project_video(project_name, video_path, years):
+    """Append a rendered video to a project's entry in the config.
+    
+    A video returned from the render cache is moved to the end of the list
+    (so it shows as the latest) instead of being added twice.
+    """
+    def add_video(config):
+        for p in config["projects"]:
+            if p["name"] == project_name:
+                if "videos" not in p:
+                    p["videos"] = []
+                existing = next((v for v in p["videos"] if v["path"] == video_path), None)
+                if existing is not None:
+                    p["videos"].remove(existing)
+                p["videos"].append(existing or {
+                    "path": video_path,
+                    "created": datetime.now().isoformat(),
+                    "years": years
+                })
+    
+    update_config(add_video)
+
+def get_stored_image_size(project_folder, default=512):
+    """Width of a project's surviving processed or labeled images, for projects saved without image_size"""
+    for subfolder in ("processed", "text_images"):
+        folder = os.path.join(project_folder, subfolder)
+        if os.path.isdir(folder):
+            for name in sorted(os.listdir(folder)):
+                if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                    with Image.open(os.path.join(folder, name)) as img:
+                        return img.width
+    return default
+
+def ensure_project_stage(project, stage, status_placeholder):
+    """Regenerate a project's evicted artifacts for a stage (and the stages it depends on).
+    
+    Args:
+        project: Project entry from the config
+        stage: "raw", "processed" or "text_images"
+        status_placeholder: Status reporter with write()
+    """
+    project_name = project["name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    os.makedirs(project_folder, exist_ok=True)
+    
+    if project.get("raw_evicted"):
+        missing = [y for y in project.get("years", [])
+                   if not os.path.exists(os.path.join(project_folder, f"{y}_{project_name}.jpg"))]
+        status_placeholder.write(f"Re-downloading {len(missing)} evicted images...")
+        image_size = project.get("image_size") or get_stored_image_size(project_folder)
+        config = load_config()
+        for year in missing:
+            download_image(year, project_name, project["bbox"], project_folder, status_placeholder,
+                           image_size=image_size, config=config)
+            time.sleep(0.1)
+        
+        def clear_evicted(config):
+            for p in config["projects"]:
+                if p["name"] == project_name:
+                    p.pop("raw_evicted", None)
+        
+        update_config(clear_evicted)
+        project.pop("raw_evicted", None)
+    if stage == "raw":
+        return
+    
+    processed_folder = os.path.join(project_folder, "processed")
+    has_processed = os.path.exists(processed_folder) and len(os.listdir(processed_folder)) > 0
+    if stage == "processed" or (stage == "text_images" and project.get("reduce_watermarks")):
+        if not has_processed:
+            status_placeholder.write("Regenerating processed images...")
+            process_all_images(project_folder, status_placeholder)
+        if stage == "processed":
+            return
+    
+    text_images_folder = os.path.join(project_folder, "text_images")
+    if not os.path.exists(text_images_folder) or not os.listdir(text_images_folder):
+        status_placeholder.write("Regenerating labeled images...")
+        image_files, image_years = get_project_images(
+            project_folder, project_name,
+            use_processed=project.get("reduce_watermarks", False), use_text_overlaid=False
+        )
+        if image_files:
+            add_text_to_images(image_files, image_years, text_images_folder, status_placeholder)
+
+def get_busy_projects():
+    """Names of projects with queued or running background jobs"""
+    return {
+        job["params"].get("project_name")
+        for status in ("queued", "running")
+        for job in list_jobs(status=status, limit=1000)
+    }
+
+def run_new_project_job(params, status):
+    """Runs the full download, processing and encoding pipeline for a new project.
+    
+    Args:
+        params: Job parameters (project_name, latitude, longitude, size, image_size,
+            reduce_watermarks, use_frame_stack, align, normalize, frame_duration, transition, easing, reverse_order, resume)
+        status: Job status reporter with write() and set_progress()
+        
+    Returns:
+        dict: Job result with the project name and video path
+    """
+    project_name = params["project_name"]
+    lat, lon, size = params["latitude"], params["longitude"], params["size"]
+    reduce_watermarks = params.get("reduce_watermarks", False)
+    use_frame_stack = params.get("use_frame_stack", False)
+    align_years = params.get("align", False)
+    normalize_tones = params.get("normalize", False)
+    
+    # Check available years
+    status.write("Checking available imagery...")
+    available_years = get_available_years(lat, lon, size)
+    if not available_years:
+        raise RuntimeError("No aerial imagery available for this location. Try a different location or adjust the area size.")
+    status.write(f"Found {len(available_years)} years with available imagery!")
+    
+    # Create project folder
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    os.makedirs(project_folder, exist_ok=True)
+    
+    # Calculate bbox
+    bbox = calculate_bbox(lat, lon, size)
+    
+    # Sort years if needed
+    selected_years = sorted(available_years, reverse=params.get("reverse_order", False))
+    
+    # Save project info
+    project_info = {
+        "name": project_name,
+        "latitude": lat,
+        "longitude": lon,
+        "size": size,
+        "bbox": bbox,
+        "created": datetime.now().isoformat(),
+        "years": selected_years,
+        "archived": False,
+        "frame_stack": use_frame_stack,
+        "reduce_watermarks": reduce_watermarks,
+        "align": align_years,
+        "normalize": normalize_tones,
+        "image_size": params.get("image_size", 512),
+        "videos": []
+    }
+    
+    def add_project(config):
+        if project_name not in [p["name"] for p in config["projects"]]:
+            config["projects"].append(project_info)
+        else:
+            # Update existing project
+            for p in config["projects"]:
+                if p["name"] == project_name:
+                    p.update(project_info)
+    
+    config = update_config(add_project)
+    
+    # A quick low-resolution draft lets the user judge the location before the full render
+    if params.get("draft", True):
+        status.write("Rendering draft preview...")
+        render_draft(project_folder, project_name, bbox, selected_years,
+                     params.get("frame_duration", 1.0), status, config=config)
+    
+    # Imagery metadata is fetched alongside the downloads, so it adds no waiting time
+    metadata_executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        metadata_future = metadata_executor.submit(fetch_location_metadata, lat, lon, size, selected_years)
+    
+        # Download selected images
+        total_steps = len(selected_years) + 2  # +1 for processing, +1 for video
+    
+        for i, year in enumerate(selected_years):
+            filepath = os.path.join(project_folder, f"{year}_{project_name}.jpg")
+            if params.get("resume") and os.path.exists(filepath):
+                # A previous attempt already fetched this year
+                status.write(f"✅ Already downloaded: {year}")
+            else:
+                status.write(f"Downloading {year} imagery...")
+                download_image(year, project_name, bbox, project_folder, status,
+                               image_size=params.get("image_size", 512), config=config)
+                time.sleep(0.1)
+            status.set_progress((i + 1) / total_steps)
+    
+        try:
+            save_project_metadata(project_folder, metadata_future.result())
+        except Exception as e:
+            logger.warning(f"Could not fetch imagery metadata for {project_name}: {e}")
+        captions = get_project_captions(project_folder)
+    
+        # Alignment transforms and normalization tables are applied wherever frames are labeled
+        transforms = align_project(project_folder, project_name, status) if align_years else None
+        luts = normalize_project(project_folder, project_name, status) if normalize_tones else None
+    
+        if use_frame_stack:
+            # Decode once, then watermark and label slices of the stack
+            status.write("Building frame stack...")
+            if build_year_stack(project_folder, project_name, status):
+                if reduce_watermarks:
+                    status.write("Reducing watermark visibility...")
+                    process_stack(project_folder, status)
+                status.write("Creating labeled versions of all images...")
+                label_stack(project_folder, "processed" if reduce_watermarks else "raw", status)
+        else:
+            # Process images if requested
+            if reduce_watermarks:
+                status.write("Reducing watermark visibility...")
+                process_all_images(project_folder, status)
+        
+            # Create text-overlaid versions of all images
+            status.write("Creating labeled versions of all images...")
+            text_images_folder = os.path.join(project_folder, "text_images")
+            downloaded_images, image_years = get_project_images(project_folder, project_name, use_processed=reduce_watermarks, use_text_overlaid=False)
+            if downloaded_images:
+                add_text_to_images(downloaded_images, image_years, text_images_folder, status,
+                                   transforms=transforms, luts=luts, captions=captions)
+    
+        status.set_progress((len(selected_years) + 1) / total_steps)
+    
+        # Create timelapse
+        status.write("Creating timelapse video...")
+        video_path = create_timelapse(
+            project_folder, 
+            project_name, 
+            status, 
+            use_processed=reduce_watermarks,
+            frame_duration=params.get("frame_duration", 1.0),
+            include_years=selected_years,
+            use_stack=use_frame_stack,
+            transition=params.get("transition", 0.0),
+            easing=params.get("easing", "linear")
+        )
+    
+        if video_path:
+            record_project_video(project_name, video_path, selected_years)
+    
+    finally:
+        metadata_executor.shutdown(wait=False, cancel_futures=True)
+        # The full render replaces the draft; a failed render must not leave a stale one behind
+        draft_path = get_draft_path(project_folder, project_name)
+        if os.path.exists(draft_path):
+            os.remove(draft_path)
+    
+    status.write(f"✅ Project '{project_name}' processing complete!")
+    enforce_storage_budget(busy_projects=get_busy_projects() | {project_name})
+    return {"project_name": project_name, "video_path": video_path, "years": selected_years}
+
+def run_timelapse_job(params, status):
+    """Renders a new timelapse for an existing project.
+    
+    Args:
+        params: Job parameters (project_name, years, frame_duration, use_processed, use_stack,
+            transition, easing)
+        status: Job status reporter with write() and set_progress()
+        
+    Returns:
+        dict: Job result with the project name and video path
     """
+    project_name = params["project_name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
     
-    return gallery_css + gallery_html
+    project = next((p for p in load_config()["projects"] if p["name"] == project_name), None)
+    archive_path = params.get("archive_path") or (project or {}).get("archive_path")
+    from_archive = bool(archive_path) and os.path.exists(archive_path) and not project_has_local_images(project_folder)
+    
+    # Bring back anything evicted under the storage budget (archived projects read from the archive instead)
+    if project is not None and not from_archive:
+        use_processed = params.get("use_processed", True) and project.get("reduce_watermarks", False)
+        ensure_project_stage(project, "processed" if use_processed else "raw", status)
+        if "latitude" in project and not os.path.exists(os.path.join(project_folder, PROJECT_METADATA_FILE)):
+            save_project_metadata(project_folder, fetch_location_metadata(
+                project["latitude"], project["longitude"], project.get("size", 0.005), project.get("years", [])
+            ))
+        # Only years whose images changed since the last render are re-estimated
+        if project.get("align"):
+            align_project(project_folder, project_name, status)
+        if project.get("normalize"):
+            normalize_project(project_folder, project_name, status)
+    
+    video_path = create_timelapse(
+        project_folder,
+        project_name,
+        status,
+        frame_duration=params.get("frame_duration", 1.0),
+        use_processed=params.get("use_processed", True),
+        include_years=params["years"],
+        use_stack=params.get("use_stack", False),
+        archive_path=archive_path,
+        transition=params.get("transition", 0.0),
+        easing=params.get("easing", "linear")
+    )
+    if not video_path:
+        raise RuntimeError("Timelapse could not be created")
+    record_project_video(project_name, video_path, params["years"])
+    enforce_storage_budget(busy_projects=get_busy_projects() | {project_name})
+    return {"project_name": project_name, "video_path": video_path, "years": params["years"]}
 
-def get_zip_download_link(image_files, years, project_name):
-    """Create a download link for a zip file containing all images.
+def run_archive_job(params, status):
+    """Archives an existing project.
     
     Args:
-        image_files: List of image file paths
-        years: List of corresponding years for each image
-        project_name: Name of the project for zip filename
+        params: Job parameters (project_name)
+        status: Job status reporter with write() and set_progress()
         
     Returns:
-        HTML string with download link
+        dict: Job result with the project name and archive path
     """
-    try:
-        # Create a BytesIO object to store the zip file
-        zip_buffer = io.BytesIO()
+    project_name = params["project_name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    if not os.path.exists(project_folder):
+        raise RuntimeError(f"Project files not found: {project_folder}")
+    status.write(f"Archiving {project_name}...")
+    archive_path = archive_project(project_folder, load_config())
+    if not archive_path:
+        raise RuntimeError(f"Could not archive project {project_name}")
+    status.write(f"✅ Project archived: {archive_path}")
+    return {"project_name": project_name, "archive_path": archive_path}
+
+def run_regenerate_job(params, status):
+    """Regenerates a project's evicted artifacts for a stage.
+    
+    Args:
+        params: Job parameters (project_name, stage)
+        status: Job status reporter with write() and set_progress()
         
-        # Create a zip file in the buffer
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for image_path, year in zip(image_files, years):
-                # Add each image to the zip with a descriptive filename
-                filename = f"{project_name}_{year}.jpg"
-                zip_file.write(image_path, arcname=filename)
+    Returns:
+        dict: Job result with the project name and stage
+    """
+    project_name = params["project_name"]
+    project = next((p for p in load_config()["projects"] if p["name"] == project_name), None)
+    if project is None:
+        raise RuntimeError(f"Unknown project: {project_name}")
+    ensure_project_stage(project, params.get("stage", "text_images"), status)
+    status.write(f"✅ Regenerated {params.get('stage', 'text_images')} for {project_name}")
+    return {"project_name": project_name, "stage": params.get("stage", "text_images")}
+
+def run_export_job(params, status):
+    """Exports a project's timelapse to several formats and sizes.
+    
+    Args:
+        params: Job parameters (project_name, years, targets, frame_duration, use_processed,
+            use_stack, archive_path, transition, easing)
+        status: Job status reporter with write() and set_progress()
         
-        # Get the value of the BytesIO buffer
-        zip_buffer.seek(0)
-        zip_data = zip_buffer.getvalue()
+    Returns:
+        dict: Job result with the project name and exported file paths
+    """
+    project_name = params["project_name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    project = next((p for p in load_config()["projects"] if p["name"] == project_name), None)
+    archive_path = params.get("archive_path") or (project or {}).get("archive_path")
+    if project is not None and not (archive_path and os.path.exists(archive_path) and not project_has_local_images(project_folder)):
+        use_processed = params.get("use_processed", True) and project.get("reduce_watermarks", False)
+        ensure_project_stage(project, "processed" if use_processed else "raw", status)
+    
+    paths = export_timelapse(
+        project_folder,
+        project_name,
+        params["years"],
+        params["targets"],
+        status,
+        frame_duration=params.get("frame_duration", 1.0),
+        use_processed=params.get("use_processed", True),
+        use_stack=params.get("use_stack", False),
+        archive_path=archive_path,
+        transition=params.get("transition", 0.0),
+        easing=params.get("easing", "linear")
+    )
+    if not paths:
+        raise RuntimeError("Nothing could be exported")
+    # Only an MP4 can be shown by the app's video player
+    return {"project_name": project_name, "files": paths,
+            "video_path": next((path for path in paths if path.endswith(".mp4")), None)}
+
+def run_analyze_job(params, status):
+    """Runs change detection over a project's years.
+    
+    Args:
+        params: Job parameters (project_name, use_processed)
+        status: Job status reporter with write() and set_progress()
         
-        # Encode as base64 for download link
-        b64 = base64.b64encode(zip_data).decode()
+    Returns:
+        dict: Job result with the project name and the change summary
+    """
+    project_name = params["project_name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    project = next((p for p in load_config()["projects"] if p["name"] == project_name), None)
+    archive_path = (project or {}).get("archive_path")
+    if not (archive_path and os.path.exists(archive_path)):
+        archive_path = None
+    if project is not None and not (archive_path and not project_has_local_images(project_folder)):
+        ensure_project_stage(project, "raw", status)
+    summary = analyze_project_changes(
+        project_folder, project_name, status,
+        use_processed=params.get("use_processed", True), archive_path=archive_path
+    )
+    return {"project_name": project_name, "summary": summary}
+
+def run_compare_job(params, status):
+    """Renders a side-by-side comparison grid of several projects.
+    
+    Args:
+        params: Job parameters (project_names, years, tile_size, frame_duration, use_processed,
+            transition, easing)
+        status: Job status reporter with write() and set_progress()
         
-        # Create download link
-        href = f'<a href="data:application/zip;base64,{b64}" download="{project_name}_images.zip" class="gallery-btn">📥 Download All Images</a>'
-        return href
-    except Exception as e:
-        logger.error(f"Error creating zip download link: {e}")
-        return "<p>Error creating download link</p>"
+    Returns:
+        dict: Job result with the compared projects, years and video path
+    """
+    project_names = params["project_names"]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    video_path = os.path.join(COMPARISON_FOLDER, f"compare_{len(project_names)}_sites_{timestamp}.mp4")
+    years = render_comparison(
+        project_names,
+        video_path,
+        status,
+        years=params.get("years"),
+        tile_size=params.get("tile_size", COMPARISON_TILE_SIZE),
+        frame_duration=params.get("frame_duration", 1.0),
+        use_processed=params.get("use_processed", True),
+        transition=params.get("transition", 0.0),
+        easing=params.get("easing", "linear")
+    )
+    return {"project_names": project_names, "years": years, "video_path": video_path}
 
-def get_project_images(project_folder, project_name, use_processed=False, use_text_overlaid=True):
-    """Get all image files and their years for a project.
+def run_flyover_job(params, status):
+    """Renders a flyover along a route and stores it as a project.
     
     Args:
-        project_folder: Path to the project folder
-        project_name: Name of the project
-        use_processed: Whether to use processed images if available
-        use_text_overlaid: Whether to use text-overlaid images if available
+        params: Job parameters (project_name, route, box_size, years, mode, output_size,
+            boxes_per_second)
+        status: Job status reporter with write() and set_progress()
         
     Returns:
-        tuple: (list of image paths, list of corresponding years)
+        dict: Job result with the project name and video path
     """
-    # Determine source folder based on priority
-    text_images_folder = os.path.join(project_folder, "text_images")
-    processed_folder = os.path.join(project_folder, "processed")
+    project_name = params["project_name"]
+    project_folder = os.path.join(OUTPUT_FOLDER, project_name)
+    os.makedirs(project_folder, exist_ok=True)
+    points = parse_route(params["route"])
+    box_size = params.get("box_size", 0.005)
     
-    # Choose folder based on priority: text_overlaid > processed > original
-    if use_text_overlaid and os.path.exists(text_images_folder) and len(os.listdir(text_images_folder)) > 0:
-        source_folder = text_images_folder
-        logger.info(f"Using text-overlaid images from: {text_images_folder}")
-    elif use_processed and os.path.exists(processed_folder) and len(os.listdir(processed_folder)) > 0:
-        source_folder = processed_folder
-        logger.info(f"Using processed images from: {processed_folder}")
-    else:
-        source_folder = project_folder
-        logger.info(f"Using original images from: {project_folder}")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    video_path = os.path.join(project_folder, f"{project_name}_flyover_{timestamp}.mp4")
+    result = render_flyover(
+        points, box_size, params.get("years") or [year for year, _ in aerials], video_path, status,
+        mode=params.get("mode", "pan"),
+        output_size=params.get("output_size", 512),
+        boxes_per_second=params.get("boxes_per_second", 1.0)
+    )
     
-    # Get all image files
-    image_files = []
-    years = []
+    # Listed with the other projects, centered on the route
+    lons, lats = [p[0] for p in points], [p[1] for p in points]
+    project_info = {
+        "name": project_name,
+        "latitude": (min(lats) + max(lats)) / 2,
+        "longitude": (min(lons) + max(lons)) / 2,
+        "size": box_size,
+        "created": datetime.now().isoformat(),
+        "years": result["years"],
+        "archived": False,
+        "flyover": {"route": [list(p) for p in points], "mode": params.get("mode", "pan")},
+        "videos": []
+    }
+    def add_project(config):
+        if project_name not in [p["name"] for p in config["projects"]]:
+            config["projects"].append(project_info)
     
-    # Try to find images for all possible years
-    for year, layer_type in sorted(aerials, key=lambda x: x[0]):
-        # Try different filename patterns, including text-overlaid images
-        possible_patterns = []
-        
-        # Add text-overlaid image patterns
-        if source_folder == text_images_folder:
-            possible_patterns.extend([
-                f"text_{year}_{project_name}.jpg",
-                f"text_{year}_{layer_type}.jpg",
-                f"text_{year}.jpg"
-            ])
-        else:
-            # Regular image patterns
-            possible_patterns.extend([
-                f"{year}_{project_name}.jpg",
-                f"{year}_{layer_type}.jpg",
-                f"{year}.jpg"
-            ])
-        
-        found = False
-        for pattern in possible_patterns:
-            image_path = os.path.join(source_folder, pattern)
-            if os.path.exists(image_path):
-                image_files.append(image_path)
-                years.append(str(year))
-                found = True
-                break
+    update_config(add_project)
+    record_project_video(project_name, video_path, result["years"])
+    invalidate_project_cache(project_folder)
+    return {"project_name": project_name, "video_path": video_path, "years": result["years"]}
+
+def run_seed_job(params, status):
+    """Seeds the local imagery mirror for a region.
+    
+    Args:
+        params: Job parameters (region, grid_size, overlap, years, image_size, delay)
+        status: Job status reporter with write() and set_progress()
         
-        # If not found in primary folder, try fallback folders
-        if not found and source_folder != project_folder:
-            # Try the original folder
-            for pattern in [f"{year}_{project_name}.jpg", f"{year}_{layer_type}.jpg", f"{year}.jpg"]:
-                image_path = os.path.join(project_folder, pattern)
-                if os.path.exists(image_path):
-                    image_files.append(image_path)
-                    years.append(str(year))
-                    found = True
-                    break
+    Returns:
+        dict: Counts of fetched, skipped, blank and failed tiles
+    """
+    return seed_region(
+        params["region"],
+        params.get("grid_size", 0.02),
+        params.get("overlap", 0.01),
+        params.get("years") or [year for year, _ in aerials],
+        status,
+        resolution=params.get("resolution", MIRROR_RESOLUTION),
+        delay=params.get("delay", 1.0)
+    )
+
+def render_year_strip(bbox):
+    """Show the speculative previews for the selected location as a strip of years.
     
-    # As a fallback, find any images with year in filename in the source folder
-    if not image_files:
-        for file in os.listdir(source_folder):
-            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                try:
-                    # Try to extract year from filename, handling text_ prefix
-                    base_name = file
-                    if file.startswith("text_"):
-                        base_name = file[5:]  # Remove "text_" prefix
-                    
-                    parts = base_name.split('_')
-                    if len(parts) > 0:
-                        year_str = parts[0]
-                        if year_str.isdigit():
-                            year = int(year_str)
-                            image_path = os.path.join(source_folder, file)
-                            image_files.append(image_path)
-                            years.append(str(year))
-                except Exception as e:
-                    logger.warning(f"Could not extract year from filename {file}: {e}")
+    The strip only polls for new previews while some years are still pending.
+    """
+    results = get_preview_prefetcher().results(bbox)
+    if any(path == "pending" for path in results.values()):
+        poll_year_strip(bbox)
+    elif results:
+        show_year_strip(results)
+
+@st.fragment(run_every="1s")
+def poll_year_strip(bbox):
+    """Refresh the year strip until every year has resolved"""
+    results = get_preview_prefetcher().results(bbox)
+    show_year_strip(results)
+    if not any(path == "pending" for path in results.values()):
+        # A full rerun swaps this polling fragment for the static strip
+        st.rerun()
+
+def show_year_strip(results):
+    """Draw the year strip from a mapping of year to preview path (None without coverage)"""
+    if not results:
+        return
+    available = {year: path for year, path in results.items() if path and path != "pending"}
+    pending = sum(1 for path in results.values() if path == "pending")
     
-    # If still no images found and using text_images folder, try original folder
-    if not image_files and source_folder != project_folder:
-        logger.info(f"No images found in {source_folder}, falling back to {project_folder}")
-        return get_project_images(project_folder, project_name, False, False)
+    if pending:
+        st.caption(f"Checking imagery... {len(results) - pending}/{len(results)} years checked, {len(available)} available")
+    else:
+        st.caption(f"{len(available)} of {len(results)} years have imagery here")
     
-    return image_files, years
+    years = sorted(available)
+    per_row = 8
+    for start in range(0, len(years), per_row):
+        columns = st.columns(per_row)
+        for column, year in zip(columns, years[start:start + per_row]):
+            with column:
+                st.image(available[year], caption=str(year), use_container_width=True)
+
+@st.fragment(run_every="2s")
+def render_active_jobs():
+    """Show progress of this session's background jobs, refreshing until they finish.
+    
+    Jobs that finished since the last run are reported once more after the
+    rerun that displays their results, so their outcome is actually seen.
+    """
+    for job_id in st.session_state.pop("finished_jobs", []):
+        job = get_job(job_id)
+        if job is None:
+            continue
+        name = job["params"].get("project_name", f"job {job_id}")
+        if job["status"] == "done":
+            st.success(f"'{name}' complete!")
+        else:
+            st.error(f"'{name}' {job['status']}: {job['message'] or job['error'] or ''}")
+    
+    still_active = []
+    for job_id in st.session_state.get("active_jobs", []):
+        job = get_job(job_id)
+        if job is None:
+            continue
+        name = job["params"].get("project_name", f"job {job_id}")
+        
+        if job["status"] in ("queued", "running"):
+            still_active.append(job_id)
+            st.progress(job["progress"], text=f"{name}: {job['message'] or job['status']}")
+            if job["kind"] == "new_project":
+                draft_path = get_draft_path(os.path.join(OUTPUT_FOLDER, name), name)
+                if os.path.exists(draft_path):
+                    st.image(draft_path, caption="Draft preview (full quality render in progress)")
+        elif job["status"] == "done":
+            st.success(f"'{name}' complete!")
+            if job["result"] and job["result"].get("video_path"):
+                st.session_state.video_path = job["result"]["video_path"]
+        else:
+            st.error(f"'{name}' {job['status']}: {job['message'] or ''}")
+    
+    finished = [job_id for job_id in st.session_state.get("active_jobs", []) if job_id not in still_active]
+    st.session_state.active_jobs = still_active
+    if finished:
+        st.session_state.finished_jobs = finished
+        # Rerun the whole app to display the new video
+        st.rerun()
 
 # Main app layout
 def main():
     # Load config
     config = load_config()
     logger.info("Starting Historic Aerials Explorer application")
+    start_cache_warmup()
     
     st.title("🛰️ Historic Aerials Explorer")
     
     # Sidebar for navigation
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Go to", ["New Project", "View Past Projects", "Settings"])
+    page = st.sidebar.radio("Go to", ["New Project", "Flyover", "View Past Projects", "Settings"])
     logger.debug(f"Navigated to page: {page}")
     
     if page == "New Project":
@@ -1202,6 +5038,7 @@ def main():
                     map_data['last_clicked']['lat'],
                     map_data['last_clicked']['lng']
                 ]
+                st.session_state.location_selected = True
             
             st.info("ℹ️ Click anywhere on the map or drag the marker to select your location of interest.")
             
@@ -1213,6 +5050,12 @@ def main():
             with col_lon:
                 st.write(f"**Longitude:** {lon:.8f}")
             
+            # Probe availability and fetch previews while the user decides,
+            # once they have picked a location rather than for the default one
+            if st.session_state.get("location_selected"):
+                preview_bbox = get_preview_prefetcher().request(lat, lon, size, config)
+                render_year_strip(preview_bbox)
+            
             # Preview the video if available
             if st.session_state.video_path and os.path.exists(st.session_state.video_path):
                 st.markdown("### Video Preview")
@@ -1227,122 +5070,65 @@ def main():
             image_size = image_sizes[image_quality]
             
             reduce_watermarks = st.checkbox("Reduce Watermarks", value=False)
+            use_frame_stack = st.checkbox(
+                "Use Frame Stack", value=False,
+                help="Decode images once into a memory-mapped stack shared by watermarking, labeling, encoding and the gallery. Uses more disk space."
+            )
+            align_years = st.checkbox(
+                "Align Years", value=False,
+                help="Correct the small offsets between years so the timelapse does not jitter."
+            )
+            normalize_tones = st.checkbox(
+                "Normalize Colors", value=False,
+                help="Match each year's tones to the most recent year so the timelapse does not flicker."
+            )
             frame_duration = st.slider("Frame Duration (seconds)", min_value=0.5, max_value=5.0, value=1.0, step=0.5)
+            transition = st.slider("Transition (seconds)", min_value=0.0, max_value=frame_duration, value=0.0, step=0.25,
+                                   help="Crossfade between years. 0 keeps hard cuts.")
+            easing = st.selectbox("Transition Easing", list(EASINGS), index=3, disabled=transition == 0)
             reverse_order = st.checkbox("Reverse Chronological Order")
+            draft_preview = st.checkbox(
+                "Draft Preview", value=True,
+                help="Show a quick low-resolution preview while the full-quality render runs."
+            )
             
             # Start processing button
             if st.button("Start Processing", type="primary"):
                 if not project_name:
                     st.error("Please enter a project name")
                 else:
-                    # Check available years
-                    with st.spinner("Checking available imagery..."):
-                        available_years = get_available_years(lat, lon, size)
-                    
-                    if not available_years:
-                        st.error("No aerial imagery available for this location. Try a different location or adjust the area size.")
-                    else:
-                        st.success(f"Found {len(available_years)} years with available imagery!")
-                        
-                        # Create project folder
-                        project_folder = os.path.join(OUTPUT_FOLDER, project_name)
-                        os.makedirs(project_folder, exist_ok=True)
-                        
-                        # Calculate bbox
-                        bbox = calculate_bbox(lat, lon, size)
-                        
-                        # Sort years if needed
-                        selected_years = available_years
-                        if reverse_order:
-                            selected_years = sorted(selected_years, reverse=True)
-                        else:
-                            selected_years = sorted(selected_years)
-                        
-                        # Save project info
-                        project_info = {
-                            "name": project_name,
-                            "latitude": lat,
-                            "longitude": lon,
-                            "size": size,
-                            "bbox": bbox,
-                            "created": datetime.now().isoformat(),
-                            "years": selected_years,
-                            "archived": False,
-                            "videos": []
-                        }
-                        
-                        if project_name not in [p["name"] for p in config["projects"]]:
-                            config["projects"].append(project_info)
-                        else:
-                            # Update existing project
-                            for p in config["projects"]:
-                                if p["name"] == project_name:
-                                    p.update(project_info)
-                        
-                        save_config(config)
-                        
-                        # Progress indicators
-                        progress_bar = st.progress(0)
-                        status = st.empty()
-                        
-                        # Download selected images
-                        total_steps = len(selected_years) + 2  # +1 for processing, +1 for video
-                        
-                        for i, year in enumerate(selected_years):
-                            status.write(f"Downloading {year} imagery...")
-                            download_image(year, project_name, bbox, project_folder, status)
-                            progress_bar.progress((i + 1) / total_steps)
-                            time.sleep(0.1)
-                        
-                        # Process images if requested
-                        if reduce_watermarks:
-                            status.write("Reducing watermark visibility...")
-                            process_all_images(project_folder, status)
-                        
-                        # Create text-overlaid versions of all images
-                        status.write("Creating labeled versions of all images...")
-                        text_images_folder = os.path.join(project_folder, "text_images")
-                        downloaded_images, image_years = get_project_images(project_folder, project_name, use_processed=reduce_watermarks, use_text_overlaid=False)
-                        if downloaded_images:
-                            add_text_to_images(downloaded_images, image_years, text_images_folder, status)
-                        
-                        progress_bar.progress((len(selected_years) + 1) / total_steps)
-                        
-                        # Create timelapse
-                        status.write("Creating timelapse video...")
-                        video_path = create_timelapse(
-                            project_folder, 
-                            project_name, 
-                            status, 
-                            use_processed=reduce_watermarks,
-                            frame_duration=frame_duration,
-                            include_years=selected_years
-                        )
-                        
-                        if video_path:
-                            # Store video path in session state
-                            st.session_state.video_path = video_path
-                            
-                            # Update project with video info
-                            for p in config["projects"]:
-                                if p["name"] == project_name:
-                                    if "videos" not in p:
-                                        p["videos"] = []
-                                    p["videos"].append({
-                                        "path": video_path,
-                                        "created": datetime.now().isoformat(),
-                                        "years": selected_years
-                                    })
-                            save_config(config)
-                        
-                        progress_bar.progress(1.0)
-                        
-                        st.success(f"Project '{project_name}' processing complete!")
-                        st.rerun()  # Rerun the app to display the video
+                    # Hand the pipeline to the background workers so it survives reruns
+                    job_id = enqueue_job("new_project", {
+                        "project_name": project_name,
+                        "latitude": lat,
+                        "longitude": lon,
+                        "size": size,
+                        "image_size": image_size,
+                        "reduce_watermarks": reduce_watermarks,
+                        "use_frame_stack": use_frame_stack,
+                        "align": align_years,
+                        "normalize": normalize_tones,
+                        "frame_duration": frame_duration,
+                        "transition": transition,
+                        "easing": easing,
+                        "reverse_order": reverse_order,
+                        "draft": draft_preview
+                    })
+                    start_worker_pool(JOB_WORKERS)
+                    st.session_state.setdefault("active_jobs", []).append(job_id)
+                    st.success(f"Project '{project_name}' queued for processing")
+            
+            # Poll queued and running jobs for this session
+            if st.session_state.get("active_jobs") or st.session_state.get("finished_jobs"):
+                render_active_jobs()
 
     elif page == "View Past Projects":
         st.header("Past Projects")
         
+        # Poll queued and running jobs for this session (renders, exports, analyses, comparisons)
+        if st.session_state.get("active_jobs") or st.session_state.get("finished_jobs"):
+            render_active_jobs()
+        
         if not config["projects"]:
             st.info("No projects found. Create a new project to get started!")
         else:
@@ -1366,106 +5152,74 @@ def main():
             if not filter_archived:
                 projects = [p for p in projects if not p.get("archived", False)]
             
-            # Display projects
-            for project in projects:
-                with st.expander(f"📁 {project['name']} ({project.get('created', '').split('T')[0] if 'created' in project else 'Unknown date'})"):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.write(f"**Location:** {project.get('latitude', 'N/A')}, {project.get('longitude', 'N/A')}")
-                        
-                        # Display available years as badges
-                        project_folder = os.path.join(OUTPUT_FOLDER, project['name'])
-                        available_years = get_available_years(project['latitude'], project['longitude'], project['size'])
-                        
-                        
-                        # Create tabs for Map, Gallery, and Videos instead of nested expanders
-                        tabs = st.tabs(["Map", "Image Gallery", "Video"])
-                        
-                        # Tab 1: Map
-                        with tabs[0]:
-                            if 'latitude' in project and 'longitude' in project:
-                                m = folium.Map(location=[project['latitude'], project['longitude']], zoom_start=15)
-                                folium.Marker([project['latitude'], project['longitude']]).add_to(m)
-                                
-                                # Add rectangle to show bounds
-                                if 'size' in project:
-                                    half_size = project['size'] / 2
-                                    bounds = [
-                                        [project['latitude'] - half_size, project['longitude'] - half_size],
-                                        [project['latitude'] + half_size, project['longitude'] + half_size]
-                                    ]
-                                    folium.Rectangle(bounds=bounds, color='red', fill=True, fill_opacity=0.2).add_to(m)
-                                
-                                folium_static(m, width=600, height=300)
-                        
-                        # Tab 2: Image Gallery
-                        with tabs[1]:
-                            # Get project images - prefer text-overlaid images
-                            image_files, image_years = get_project_images(project_folder, project['name'], use_processed=True, use_text_overlaid=True)
-                            
-                            if image_files:
-                                # Add zip download link
-                                st.markdown(get_zip_download_link(image_files, image_years, project['name']), unsafe_allow_html=True)
-                                
-                                # Display the gallery
-                                gallery_html = create_image_gallery(image_files, image_years, project['name'])
-                                st.components.v1.html(gallery_html, height=800, scrolling=True)
-                            else:
-                                st.info("No images available for this project")
-                        
-                        # Tab 3: Video preview
-                        with tabs[2]:
-                            # Display latest video if available
-                            if "videos" in project and project["videos"]:
-                                latest_video = project["videos"][-1]
-                                video_path = latest_video["path"]
-                                if os.path.exists(video_path):
-                                    st.markdown("**Latest Timelapse:**", unsafe_allow_html=True)
-                                    st.markdown(get_video_html(video_path), unsafe_allow_html=True)
-                            else:
-                                st.info("No videos created yet for this project")
-                    
-                    with col2:
-                        project_folder = os.path.join(OUTPUT_FOLDER, project['name'])
-                        
-                        if os.path.exists(project_folder):
-                            # Action buttons
-                            if st.button("Create New Timelapse", key=f"new_timelapse_{project['name']}"):
-                                st.session_state.selected_project = project['name']
-                                st.rerun()
-                            
-                            # Download buttons for videos
-                            if "videos" in project and project["videos"]:
-                                st.write("**Available Videos:**")
-                                for i, video in enumerate(project["videos"]):
-                                    video_path = video["path"]
-                                    if os.path.exists(video_path):
-                                        st.markdown(
-                                            f'<div class="video-info">' +
-                                            f'<span class="video-date">{video["created"].split("T")[0]}</span><br/>' +
-                                            get_year_badges(video["years"]) +
-                                            '</div>',
-                                            unsafe_allow_html=True
-                                        )
-                                        st.markdown(get_download_link(
-                                            video_path, 
-                                            f"📥 Download Video {i+1}"
-                                        ), unsafe_allow_html=True)
-                            
-                            # Archive button
-                            if not project.get("archived", False):
-                                if st.button("Archive Project", key=f"archive_{project['name']}"):
-                                    archive_path = archive_project(project_folder, config)
-                                    st.success(f"Project archived!")
-                                    st.markdown(get_download_link(archive_path, "📥 Download Archive"), unsafe_allow_html=True)
-                                    st.rerun()
-                            else:
-                                st.info("This project is archived")
-                                if "archive_path" in project and os.path.exists(project["archive_path"]):
-                                    st.markdown(get_download_link(project["archive_path"], "📥 Download Archive"), unsafe_allow_html=True)
-                        else:
-                            st.error("Project files not found")
+            # Side-by-side comparison of several sites
+            with st.expander("Compare Sites"):
+                compare_names = st.multiselect(
+                    f"Projects to compare ({COMPARISON_MIN_SITES}-{COMPARISON_MAX_SITES})",
+                    [p["name"] for p in projects],
+                    max_selections=COMPARISON_MAX_SITES,
+                )
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    compare_tile_size = st.select_slider("Tile Size", options=[256, 384, 512], value=COMPARISON_TILE_SIZE)
+                with col2:
+                    compare_duration = st.slider("Seconds per Year", min_value=0.25, max_value=3.0, value=1.0, step=0.25, key="compare_duration")
+                with col3:
+                    compare_transition = st.slider("Transition", min_value=0.0, max_value=1.0, value=0.0, step=0.1, key="compare_transition")
+                if st.button("Render Comparison", disabled=len(compare_names) < COMPARISON_MIN_SITES):
+                    job_id = enqueue_job("compare", {
+                        "project_names": compare_names,
+                        "tile_size": compare_tile_size,
+                        "frame_duration": compare_duration,
+                        "transition": compare_transition
+                    })
+                    start_worker_pool(JOB_WORKERS)
+                    st.session_state.setdefault("active_jobs", []).append(job_id)
+                    st.success(f"Comparison of {len(compare_names)} sites queued for rendering")
+                comparison_path = st.session_state.get("video_path")
+                if comparison_path and os.path.dirname(comparison_path) == COMPARISON_FOLDER and os.path.exists(comparison_path):
+                    st.markdown(get_video_html(comparison_path), unsafe_allow_html=True)
+                    st.markdown(get_download_link(comparison_path, "📥 Download Comparison"), unsafe_allow_html=True)
+            
+            # Search by name
+            search = st.text_input("Search projects", value="", placeholder="Project name")
+            if search:
+                projects = [p for p in projects if search.lower() in p.get("name", "").lower()]
+            
+            # Paginate so page cost stays flat however many projects exist
+            col1, col2, col3 = st.columns([1, 1, 2])
+            with col1:
+                per_page = st.selectbox("Projects per page", PROJECTS_PER_PAGE_OPTIONS)
+            total_pages = max(1, (len(projects) + per_page - 1) // per_page)
+            with col2:
+                page_number = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+            with col3:
+                st.write(f"{len(projects)} projects, page {page_number} of {total_pages}")
+            
+            # Display projects - panels are only rendered once opened
+            start = (page_number - 1) * per_page
+            for project in projects[start:start + per_page]:
+                with st.container(border=True):
+                    thumbnail_col, header_col, favorite_col, toggle_col = st.columns([1, 4, 1, 1])
+                    with thumbnail_col:
+                        thumbnail_path = get_project_thumbnail(
+                            os.path.join(OUTPUT_FOLDER, project['name']), project['name'],
+                            get_project_signature(os.path.join(OUTPUT_FOLDER, project['name'])), build=False
+                        )
+                        if thumbnail_path:
+                            st.image(thumbnail_path, width=THUMBNAIL_SIZE)
+                    with header_col:
+                        st.markdown(f"📁 **{project['name']}** ({project.get('created', '').split('T')[0] if 'created' in project else 'Unknown date'})")
+                    with favorite_col:
+                        is_favorite = project['name'] in config.get("favorites", [])
+                        if st.button("★" if is_favorite else "☆", key=f"favorite_{project['name']}",
+                                     help="Favorites are kept warm for fast loading"):
+                            toggle_favorite(project['name'])
+                            st.rerun()
+                    with toggle_col:
+                        is_open = st.toggle("Open", key=f"open_{project['name']}")
+                    if is_open:
+                        render_project_panel(project, config)
             
             # If a project is selected for new timelapse
             if 'selected_project' in st.session_state:
@@ -1477,7 +5231,14 @@ def main():
                     
                     # Find all available years
                     project_folder = os.path.join(OUTPUT_FOLDER, project_name)
-                    available_years = get_available_years(project['latitude'], project['longitude'], project['size'])
+                    # The project's years are stored when it is created, so only older projects need probing
+                    available_years = sorted(project.get("years") or []) or cached_available_years(
+                        project['latitude'], project['longitude'], project['size']
+                    )
+                    project_signature = get_project_signature(project_folder)
+                    archive_path = project.get("archive_path")
+                    if not (archive_path and os.path.exists(archive_path)):
+                        archive_path = None
                     
                     # Display timeline for year selection
                     st.markdown("**Select Years:**", unsafe_allow_html=True)
@@ -1502,7 +5263,7 @@ def main():
                     st.markdown(get_year_badges(selected_years), unsafe_allow_html=True)
                     
                     # Use tabs instead of an expander
-                    creation_tabs = st.tabs(["Timelapse Settings", "Available Images"])
+                    creation_tabs = st.tabs(["Timelapse Settings", "Available Images", "Preview"])
                     
                     # Tab 1: Timelapse Settings
                     with creation_tabs[0]:
@@ -1511,6 +5272,9 @@ def main():
                         
                         with col1:
                             frame_duration = st.slider("Frame Duration (seconds)", min_value=0.5, max_value=5.0, value=1.0, step=0.5)
+                            transition = st.slider("Transition (seconds)", min_value=0.0, max_value=frame_duration, value=0.0, step=0.25,
+                                                   help="Crossfade between years. 0 keeps hard cuts.")
+                            easing = st.selectbox("Transition Easing", list(EASINGS), index=3, disabled=transition == 0)
                         
                         with col2:
                             use_processed = st.checkbox("Use Processed Images (reduced watermark)", value=True)
@@ -1519,15 +5283,20 @@ def main():
                     # Tab 2: Available Images
                     with creation_tabs[1]:
                         # Get project images and show gallery - prefer text-overlaid images
-                        image_files, image_years = get_project_images(project_folder, project_name, use_processed=use_processed, use_text_overlaid=True)
+                        image_files, image_years = cached_project_images(
+                            project_folder, project_name, use_processed, True, project_signature,
+                            archive_path, get_file_signature(archive_path) if archive_path else None
+                        )
                         
                         if image_files:
-                            # Add zip download link
-                            st.markdown(get_zip_download_link(
-                                [img for img, yr in zip(image_files, image_years) if int(yr) in selected_years],
-                                [yr for yr in image_years if int(yr) in selected_years],
-                                project_name
-                            ), unsafe_allow_html=True)
+                            # Zipping and encoding every image is slow, so the link is built on request
+                            if st.button("Prepare ZIP Download", key=f"zip_selected_{project_name}"):
+                                st.markdown(cached_zip_download_link(
+                                    tuple(img for img, yr in zip(image_files, image_years) if int(yr) in selected_years),
+                                    tuple(yr for yr in image_years if int(yr) in selected_years),
+                                    project_name,
+                                    project_signature
+                                ), unsafe_allow_html=True)
                             
                             # Display the gallery only for selected years
                             filtered_images = []
@@ -1542,60 +5311,136 @@ def main():
                                     pass
                                     
                             if filtered_images:
-                                gallery_html = create_image_gallery(filtered_images, filtered_years, project_name)
+                                gallery_html = cached_image_gallery(tuple(filtered_images), tuple(filtered_years), project_name, project_signature)
                                 st.components.v1.html(gallery_html, height=800, scrolling=True)
                             else:
                                 st.info("No images available for the selected years")
                         else:
                             st.info("No images available for this project")
                     
+                    # Tab 3: Flip through the frames in the browser before encoding anything
+                    with creation_tabs[2]:
+                        flipbook_html = None
+                        if image_files:
+                            flipbook_html = cached_flipbook_html(
+                                tuple(image_files), tuple(image_years), project_name,
+                                "processed" if use_processed else "raw", frame_duration, project_signature
+                            )
+                        if flipbook_html:
+                            st.caption("Adjust the range, speed and direction here; nothing is rendered until you generate the timelapse.")
+                            st.components.v1.html(flipbook_html, height=ATLAS_TILE_SIZE + 140)
+                        else:
+                            st.info("No images available for this project")
+                    
                     # Move the Generate Timelapse button outside of tabs
                     if st.button("Generate Timelapse", type="primary"):
                         if not selected_years:
                             st.error("Please select at least one year")
                         else:
-                            status = st.empty()
-                            
                             # Sort years
                             if reverse_order:
                                 selected_years = sorted(selected_years, reverse=True)
                             else:
                                 selected_years = sorted(selected_years)
                             
-                            video_path = create_timelapse(
-                                project_folder,
-                                project_name,
-                                status,
-                                frame_duration=frame_duration,
-                                use_processed=use_processed,
-                                include_years=selected_years
-                            )
-                            
-                            if video_path:
-                                # Update project with video info
-                                for p in config["projects"]:
-                                    if p["name"] == project_name:
-                                        if "videos" not in p:
-                                            p["videos"] = []
-                                        p["videos"].append({
-                                            "path": video_path,
-                                            "created": datetime.now().isoformat(),
-                                            "years": selected_years
-                                        })
-                                save_config(config)
-                                
-                                st.success("Timelapse created successfully!")
-                                
-                                # Display the new video
-                                st.markdown("**Preview:**", unsafe_allow_html=True)
-                                st.markdown(get_video_html(video_path), unsafe_allow_html=True)
-                                st.markdown(get_download_link(video_path, "📥 Download Timelapse Video"), unsafe_allow_html=True)
+                            job_id = enqueue_job("timelapse", {
+                                "project_name": project_name,
+                                "years": selected_years,
+                                "frame_duration": frame_duration,
+                                "transition": transition,
+                                "easing": easing,
+                                "use_processed": use_processed,
+                                "use_stack": project.get("frame_stack", False),
+                                "archive_path": archive_path
+                            })
+                            start_worker_pool(JOB_WORKERS)
+                            st.session_state.setdefault("active_jobs", []).append(job_id)
+                            st.success("Timelapse queued for rendering")
+                    
+                    # Export several formats and sizes in one pass over the frames
+                    with st.expander("Export Formats"):
+                        export_formats = st.multiselect("Formats", EXPORT_FORMATS, default=["mp4"])
+                        export_sizes = st.multiselect("Sizes (pixels, longer side)", EXPORT_SIZES, default=[1024])
+                        export_aspects = st.multiselect("Aspect Ratios", list(EXPORT_ASPECTS), default=["1:1"],
+                                                        help="Other ratios are center-cropped from the square frames")
+                        if st.button("Export"):
+                            if not selected_years or not export_formats or not export_sizes or not export_aspects:
+                                st.error("Please select years, at least one format, size and aspect ratio")
+                            else:
+                                job_id = enqueue_job("export", {
+                                    "project_name": project_name,
+                                    "years": selected_years,
+                                    "targets": [{"format": fmt, "size": size, "aspect": aspect}
+                                                for fmt in export_formats for size in export_sizes for aspect in export_aspects],
+                                    "frame_duration": frame_duration,
+                                    "transition": transition,
+                                    "easing": easing,
+                                    "use_processed": use_processed,
+                                    "use_stack": project.get("frame_stack", False),
+                                    "archive_path": archive_path
+                                })
+                                start_worker_pool(JOB_WORKERS)
+                                st.session_state.setdefault("active_jobs", []).append(job_id)
+                                st.success("Export queued")
+                        
+                        exports = list_exports(project_folder)
+                        if exports:
+                            st.write("**Exported Files:**")
+                            for export_path in exports:
+                                file_download_button(export_path, f"📥 {os.path.basename(export_path)}",
+                                                     key=f"download_export_{export_path}")
                     
                     # Clear selection
                     if st.button("Back to Projects List"):
                         del st.session_state.selected_project
                         st.rerun()
     
+    elif page == "Flyover":
+        st.header("Flyover Along a Route")
+        st.write("Travel along a river, road or rail line through time. Paste a GeoJSON LineString "
+                 "or a list of [longitude, latitude] points.")
+        
+        flyover_name = st.text_input("Project Name", value=f"flyover_{datetime.now().strftime('%Y%m%d_%H%M')}")
+        route_text = st.text_area("Route", height=150, placeholder="[[-87.66, 41.85], [-87.64, 41.88]]")
+        col1, col2 = st.columns(2)
+        with col1:
+            box_size = st.number_input("View Size (degrees)", min_value=0.001, max_value=0.02, value=0.004, step=0.001, format="%.3f")
+            flyover_mode = st.radio(
+                "Mode", FLYOVER_MODES, horizontal=True,
+                format_func=lambda mode: "One pass per year" if mode == "pan" else "Sweep through the years",
+            )
+        with col2:
+            output_size = st.select_slider("Video Size", options=[256, 512, 768, 1024], value=512)
+            boxes_per_second = st.slider("Speed (views per second)", min_value=0.25, max_value=4.0, value=1.0, step=0.25)
+        flyover_years = st.multiselect("Years", sorted(year for year, _ in aerials), default=sorted(year for year, _ in aerials))
+        
+        if st.button("Render Flyover", type="primary"):
+            try:
+                route = parse_route(route_text)
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                st.error(f"Could not read the route: {e}")
+            else:
+                if not flyover_name or not flyover_years:
+                    st.error("Please enter a project name and select at least one year")
+                else:
+                    job_id = enqueue_job("flyover", {
+                        "project_name": flyover_name,
+                        "route": [list(p) for p in route],
+                        "box_size": box_size,
+                        "years": flyover_years,
+                        "mode": flyover_mode,
+                        "output_size": output_size,
+                        "boxes_per_second": boxes_per_second
+                    })
+                    start_worker_pool(JOB_WORKERS)
+                    st.session_state.setdefault("active_jobs", []).append(job_id)
+                    st.success(f"Flyover '{flyover_name}' queued for rendering")
+        
+        if st.session_state.get("active_jobs") or st.session_state.get("finished_jobs"):
+            render_active_jobs()
+        if st.session_state.get("video_path") and os.path.exists(st.session_state.video_path):
+            st.markdown(get_video_html(st.session_state.video_path), unsafe_allow_html=True)
+    
     elif page == "Settings":
         st.header("Application Settings")
         
@@ -1605,19 +5450,51 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            # Calculate storage usage
-            total_size = 0
-            for root, _, files in os.walk(OUTPUT_FOLDER):
-                total_size += sum(os.path.getsize(os.path.join(root, file)) for file in files)
-            
-            archive_size = 0
-            for root, _, files in os.walk(ARCHIVE_FOLDER):
-                archive_size += sum(os.path.getsize(os.path.join(root, file)) for file in files)
+            # Storage usage is tracked as files are written; a background scan keeps it honest
+            reconcile_storage_in_background()
+            usage = get_storage_usage()
+            archive_size = usage["stages"].get("archive", 0)
+            total_size = sum(usage["stages"].values()) - archive_size
             
             st.write(f"**Active Projects Storage:** {total_size / (1024 * 1024):.2f} MB")
             st.write(f"**Archived Projects Storage:** {archive_size / (1024 * 1024):.2f} MB")
             st.write(f"**Total Storage Usage:** {(total_size + archive_size) / (1024 * 1024):.2f} MB")
             
+            with st.expander("Storage by Stage and Project"):
+                st.table({
+                    "Stage": STORAGE_STAGES,
+                    "MB": [f"{usage['stages'].get(stage, 0) / (1024 * 1024):.2f}" for stage in STORAGE_STAGES]
+                })
+                largest = sorted(usage["projects"].items(), key=lambda item: sum(item[1].values()), reverse=True)[:20]
+                if largest:
+                    st.table({
+                        "Project": [name for name, _ in largest],
+                        **{stage: [f"{stages.get(stage, 0) / (1024 * 1024):.1f}" for _, stages in largest] for stage in STORAGE_STAGES}
+                    })
+                if usage["reconciled"]:
+                    st.caption(f"Last full scan: {datetime.fromtimestamp(usage['reconciled']).strftime('%Y-%m-%d %H:%M')}")
+                if st.button("Rescan Storage"):
+                    reconcile_storage_in_background(force=True)
+                    st.info("Storage scan started in the background")
+            
+            # Storage budget
+            budget_mb = st.number_input(
+                "Storage Budget (MB, 0 = unlimited)",
+                min_value=0,
+                value=int(config.get("storage", {}).get("budget_mb", 0)),
+                step=100,
+                help="When usage exceeds the budget, labeled frames, frame stacks, superseded videos and processed frames are deleted least recently used first and regenerated when needed. Raw downloads are only removed as a last resort. Archives are not counted."
+            )
+            col_budget, col_evict = st.columns(2)
+            with col_budget:
+                if st.button("Save Budget"):
+                    config = update_config(lambda saved: saved.setdefault("storage", {}).update(budget_mb=budget_mb))
+                    st.success("Storage budget saved")
+            with col_evict:
+                if st.button("Free Space Now"):
+                    freed = enforce_storage_budget(config, busy_projects=get_busy_projects())
+                    st.success(f"Freed {freed / (1024 * 1024):.2f} MB")
+            
             # Storage cleanup options
             if st.button("Clean Temporary Files"):
                 temp_files_count = 0
@@ -1625,22 +5502,38 @@ def main():
                     for file in files:
                         if file.endswith(".tmp"):
                             os.remove(os.path.join(root, file))
+                            forget_artifacts(os.path.join(root, file))
                             temp_files_count += 1
                 
                 st.success(f"Removed {temp_files_count} temporary files")
         
         with col2:
             # Archive all projects option
+            with st.expander("Archive Options"):
+                archive_options = get_archive_options(config)
+                include_intermediates = st.checkbox(
+                    "Include processed and labeled images", value=archive_options["include_intermediates"],
+                    help="These can be regenerated from the original downloads, so leaving them out makes archives much smaller."
+                )
+                content_store = st.checkbox(
+                    "Deduplicate images across archives", value=archive_options["content_store"],
+                    help=f"Store images once in {ARCHIVE_STORE} by content hash and reference them from each archive's manifest."
+                )
+                if st.button("Save Archive Options"):
+                    config = update_config(lambda saved: saved.update(
+                        archive={"include_intermediates": include_intermediates, "content_store": content_store}
+                    ))
+                    st.success("Archive options saved")
+            
             if st.button("Archive All Projects"):
-                archived_count = 0
-                for project in config["projects"]:
-                    if not project.get("archived", False):
-                        project_folder = os.path.join(OUTPUT_FOLDER, project["name"])
-                        if os.path.exists(project_folder):
-                            archive_path = archive_project(project_folder, config)
-                            archived_count += 1
-                
-                save_config(config)
+                project_folders = [
+                    os.path.join(OUTPUT_FOLDER, project["name"])
+                    for project in config["projects"]
+                    if not project.get("archived", False) and os.path.exists(os.path.join(OUTPUT_FOLDER, project["name"]))
+                ]
+                with st.spinner(f"Archiving {len(project_folders)} projects..."):
+                    archive_paths = archive_projects(project_folders, config)
+                archived_count = sum(1 for path in archive_paths.values() if path)
                 st.success(f"Archived {archived_count} projects")
                 
             # Reset application
@@ -1650,6 +5543,8 @@ def main():
                     # Clear all folders
                     shutil.rmtree(OUTPUT_FOLDER, ignore_errors=True)
                     shutil.rmtree(ARCHIVE_FOLDER, ignore_errors=True)
+                    forget_artifacts(OUTPUT_FOLDER)
+                    forget_artifacts(ARCHIVE_FOLDER)
                     
                     # Recreate empty folders
                     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -1679,12 +5574,11 @@ def main():
             default_size = st.number_input("Default Area Size", value=0.005, format="%.5f")
             
             if st.button("Save Default Settings"):
-                config["defaults"] = {
+                config = update_config(lambda saved: saved.update(defaults={
                     "latitude": default_lat,
                     "longitude": default_lon,
                     "size": default_size
-                }
-                save_config(config)
+                }))
                 st.success("Default settings saved")
         
         # About and help
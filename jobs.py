@@ -0,0 +1,419 @@
+"""
+Persistent background job queue for the Historic Aerials Explorer pipeline.
+
+Jobs are stored in a SQLite database so they survive browser refreshes, app
+restarts and worker crashes. The Streamlit app only enqueues jobs and polls
+their status; a pool of worker processes claims and runs them.
+
+Run a worker pool directly with:
+
+    python jobs.py --workers 2
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import sqlite3
+import argparse
+import threading
+import subprocess
+import traceback
+import multiprocessing
+from datetime import datetime
+
+from loguru import logger
+try:
+    import fcntl
+except ImportError:  # Windows: pool liveness falls back to checking the PID
+    fcntl = None
+
+JOBS_DB = "jobs.db"
+POOL_PID_FILE = "jobs.pid"
+HEARTBEAT_TIMEOUT = 120  # Seconds without a heartbeat before a running job is requeued
+HEARTBEAT_INTERVAL = 30
+MAX_ATTEMPTS = 3
+MAX_LOG_LINES = 200
+POOL_LOCK_RETRIES = 10  # Attempts to lock the PID file, in case a liveness check holds it briefly
+
+_pool_lock_file = None  # PID file held open and locked by a running pool
+
+# Job kinds and the app.py function that runs each of them
+JOB_HANDLERS = {
+    "new_project": "run_new_project_job",
+    "timelapse": "run_timelapse_job",
+    "archive": "run_archive_job",
+    "regenerate": "run_regenerate_job",
+    "export": "run_export_job",
+    "analyze": "run_analyze_job",
+    "flyover": "run_flyover_job",
+    "compare": "run_compare_job",
+    "seed": "run_seed_job",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    log TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created TEXT NOT NULL,
+    started TEXT,
+    finished TEXT,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+def get_connection(db_path=JOBS_DB):
+    """Open the job database, creating the schema if needed"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["log"] = json.loads(job["log"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def enqueue_job(kind, params, db_path=JOBS_DB):
+    """Add a job to the queue.
+
+    Args:
+        kind: Job kind, one of JOB_HANDLERS
+        params: JSON-serializable job parameters
+        db_path: Path to the job database
+
+    Returns:
+        int: The new job id
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.execute(
+            "INSERT INTO jobs (kind, params, created, message) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(params), datetime.now().isoformat(), "Queued")
+        )
+        logger.info(f"Enqueued {kind} job {cursor.lastrowid}")
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def get_job(job_id, db_path=JOBS_DB):
+    """Get a job record by id, or None if it does not exist"""
+    conn = get_connection(db_path)
+    try:
+        return _row_to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def list_jobs(status=None, limit=50, db_path=JOBS_DB):
+    """List the most recent jobs, optionally filtered by status"""
+    conn = get_connection(db_path)
+    try:
+        if status:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id, db_path=JOBS_DB):
+    """Cancel a job that has not started yet. Returns True if it was cancelled."""
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+            (datetime.now().isoformat(), job_id)
+        )
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def claim_next_job(worker_id, db_path=JOBS_DB):
+    """Atomically claim the oldest queued job for a worker"""
+    conn = get_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started = ?, heartbeat = ?, "
+            "attempts = attempts + 1 WHERE id = ?",
+            (worker_id, datetime.now().isoformat(), time.time(), row["id"])
+        )
+        conn.execute("COMMIT")
+        return get_job(row["id"], db_path)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def recover_stale_jobs(timeout=HEARTBEAT_TIMEOUT, db_path=JOBS_DB):
+    """Requeue running jobs whose worker stopped sending heartbeats.
+
+    Jobs that have already used MAX_ATTEMPTS are marked failed instead.
+
+    Returns:
+        int: Number of jobs recovered or failed
+    """
+    conn = get_connection(db_path)
+    try:
+        cutoff = time.time() - timeout
+        conn.execute("BEGIN IMMEDIATE")
+        failed = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker stopped responding', finished = ? "
+            "WHERE status = 'running' AND heartbeat < ? AND attempts >= ?",
+            (datetime.now().isoformat(), cutoff, MAX_ATTEMPTS)
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, message = 'Requeued after worker crash' "
+            "WHERE status = 'running' AND heartbeat < ?",
+            (cutoff,)
+        ).rowcount
+        conn.execute("COMMIT")
+        if failed or requeued:
+            logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+        return failed + requeued
+    finally:
+        conn.close()
+
+
+class JobStatus:
+    """Status reporter passed to pipeline functions in place of a Streamlit placeholder.
+
+    Every write() is recorded as the job's current message and appended to its
+    log, and doubles as a heartbeat for crash detection.
+    """
+
+    def __init__(self, job_id, db_path=JOBS_DB):
+        self.job_id = job_id
+        self.db_path = db_path
+        self.conn = get_connection(db_path)
+
+    def write(self, message):
+        message = str(message)
+        row = self.conn.execute("SELECT log FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        log = json.loads(row["log"]) if row else []
+        log = (log + [message])[-MAX_LOG_LINES:]
+        self.conn.execute(
+            "UPDATE jobs SET message = ?, log = ?, heartbeat = ? WHERE id = ?",
+            (message, json.dumps(log), time.time(), self.job_id)
+        )
+
+    def set_progress(self, fraction):
+        self.conn.execute(
+            "UPDATE jobs SET progress = ?, heartbeat = ? WHERE id = ?",
+            (max(0.0, min(1.0, float(fraction))), time.time(), self.job_id)
+        )
+
+    def finish(self, result):
+        self.conn.execute(
+            "UPDATE jobs SET status = 'done', progress = 1, result = ?, finished = ?, heartbeat = ? WHERE id = ?",
+            (json.dumps(result), datetime.now().isoformat(), time.time(), self.job_id)
+        )
+
+    def fail(self, error):
+        self.conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished = ?, heartbeat = ? WHERE id = ?",
+            (str(error), datetime.now().isoformat(), time.time(), self.job_id)
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+def run_job(job, db_path=JOBS_DB):
+    """Run a claimed job with its app.py handler, recording the result"""
+    # Imported here so the Streamlit app can import this module without a cycle
+    import app
+
+    status = JobStatus(job["id"], db_path)
+
+    # Keep the heartbeat alive during long steps that report no progress
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        conn = get_connection(db_path)
+        try:
+            while not stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+                conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job["id"]))
+        finally:
+            conn.close()
+
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+    try:
+        handler = getattr(app, JOB_HANDLERS[job["kind"]])
+        params = dict(job["params"], resume=job["attempts"] > 1)
+        result = handler(params, status)
+        status.finish(result)
+        logger.success(f"Job {job['id']} ({job['kind']}) finished")
+    except Exception as e:
+        logger.exception(f"Job {job['id']} ({job['kind']}) failed: {e}")
+        status.write(f"❌ {e}")
+        status.fail(traceback.format_exc())
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+        status.close()
+
+
+def worker_loop(worker_id, poll_interval=1.0, db_path=JOBS_DB):
+    """Claim and run jobs until the process is terminated"""
+    # Forked workers must not keep the pool's lock alive if the pool itself dies
+    if _pool_lock_file is not None:
+        _pool_lock_file.close()
+    logger.info(f"Worker {worker_id} started")
+    while True:
+        try:
+            recover_stale_jobs(db_path=db_path)
+            job = claim_next_job(worker_id, db_path)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Worker {worker_id} could not poll the queue: {e}")
+            job = None
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        logger.info(f"Worker {worker_id} running job {job['id']} ({job['kind']})")
+        run_job(job, db_path)
+
+
+def _lock_pool_pid_file():
+    """Open the PID file and lock it for the life of the pool.
+
+    Returns:
+        The open PID file, or None if another pool holds the lock
+    """
+    pid_file = open(POOL_PID_FILE, "a+")
+    if fcntl is not None:
+        for attempt in range(POOL_LOCK_RETRIES):
+            try:
+                fcntl.flock(pid_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                time.sleep(0.1)
+        else:
+            pid_file.close()
+            return None
+    pid_file.seek(0)
+    pid_file.truncate()
+    pid_file.write(str(os.getpid()))
+    pid_file.flush()
+    return pid_file
+
+
+def run_worker_pool(num_workers=2, db_path=JOBS_DB):
+    """Run a pool of worker processes, restarting any that die"""
+    global _pool_lock_file
+    _pool_lock_file = _lock_pool_pid_file()
+    if _pool_lock_file is None:
+        logger.info("A worker pool is already running")
+        return
+
+    # Run the cleanup below on SIGTERM too, so no stale PID file is left behind
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    host = socket.gethostname()
+    workers = {}
+    try:
+        while True:
+            for slot in range(num_workers):
+                process = workers.get(slot)
+                if process is None or not process.is_alive():
+                    if process is not None:
+                        logger.warning(f"Worker {slot} exited with code {process.exitcode}, restarting")
+                    process = multiprocessing.Process(
+                        target=worker_loop,
+                        args=(f"{host}:{os.getpid()}:{slot}",),
+                        kwargs={"db_path": db_path},
+                        daemon=True
+                    )
+                    process.start()
+                    workers[slot] = process
+            time.sleep(5)
+    finally:
+        for process in workers.values():
+            process.terminate()
+        if os.path.exists(POOL_PID_FILE):
+            os.remove(POOL_PID_FILE)
+        _pool_lock_file.close()
+        _pool_lock_file = None
+
+
+def is_pool_running():
+    """Check whether a worker pool process is alive.
+
+    A running pool holds a lock on the PID file, so a stale file or a
+    reused PID is not mistaken for a live pool.
+    """
+    if not os.path.exists(POOL_PID_FILE):
+        return False
+    if fcntl is not None:
+        try:
+            with open(POOL_PID_FILE) as f:
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            return False
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+    try:
+        with open(POOL_PID_FILE) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return True
+    except (ValueError, OSError):
+        return False
+
+
+def start_worker_pool(num_workers=2):
+    """Start a detached worker pool unless one is already running"""
+    if is_pool_running():
+        return False
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--workers", str(num_workers)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    logger.info(f"Started background worker pool with {num_workers} workers")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Historic Aerials Explorer background workers")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+    args = parser.parse_args()
+    run_worker_pool(args.workers)
@@ -57,7 +57,8 @@ def calculate_bbox(center_lat, center_lon, size_degrees=0.005):
 def create_timelapse(project_folder, project_name):
     """
     Creates a timelapse video from the downloaded images.
-    Orders images from oldest to newest with 1-second transitions.
+    Orders images from oldest to newest, showing each for one second with
+    hard cuts between years (app.py supports crossfades).
     """
     image_files = []
     years = []
@@ -0,0 +1,64 @@
+"""
+Seed the local imagery mirror for a region ahead of time.
+
+Tiles are fetched politely in the background job queue (see jobs.py) and
+stored under cache/mirror. Later projects inside the region are cropped from
+the mirror instead of being downloaded. Interrupted runs resume where they
+stopped.
+
+Examples:
+
+    python seed.py --bbox=-87.70,41.84,-87.62,41.90 --years 1938 1952 2021
+    python seed.py --polygon area.geojson --grid 0.02 --overlap 0.01
+"""
+import json
+import argparse
+
+from loguru import logger
+
+from jobs import enqueue_job, start_worker_pool
+
+
+def load_polygon(path):
+    """Read the outer ring of the first polygon in a GeoJSON file as [[lon, lat], ...]"""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("type") == "FeatureCollection":
+        data = data["features"][0]
+    if data.get("type") == "Feature":
+        data = data["geometry"]
+    if data["type"] == "MultiPolygon":
+        return data["coordinates"][0][0]
+    if data["type"] == "Polygon":
+        return data["coordinates"][0]
+    raise ValueError(f"Unsupported geometry type: {data['type']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the local imagery mirror for a region")
+    region = parser.add_mutually_exclusive_group(required=True)
+    region.add_argument("--bbox", help="Region as minlon,minlat,maxlon,maxlat")
+    region.add_argument("--polygon", help="GeoJSON file with the region polygon")
+    parser.add_argument("--grid", type=float, default=0.02,
+                        help="Tile size in degrees; tiles are capped at 4096px, so 0.02 gives 204,800 px/degree")
+    parser.add_argument("--overlap", type=float, default=0.01,
+                        help="Tile overlap in degrees; projects up to this size are served from the mirror")
+    parser.add_argument("--years", type=int, nargs="*", help="Years to fetch (default: all)")
+    parser.add_argument("--resolution", type=float, default=204800,
+                        help="Pixels per degree (default 204,800: Medium quality for 0.005-degree projects; "
+                             "High quality needs 409,600 with --grid 0.01)")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between requests")
+    parser.add_argument("--workers", type=int, default=2, help="Background workers to start if none are running")
+    args = parser.parse_args()
+
+    job_id = enqueue_job("seed", {
+        "region": args.bbox if args.bbox else load_polygon(args.polygon),
+        "grid_size": args.grid,
+        "overlap": args.overlap,
+        "years": args.years,
+        "resolution": args.resolution,
+        "delay": args.delay,
+    })
+    start_worker_pool(args.workers)
+    logger.info(f"Queued seeding job {job_id}")
+    print(f"Queued seeding job {job_id}. Follow its progress with GET /jobs/{job_id} on the API server (server.py).")
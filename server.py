@@ -0,0 +1,363 @@
+"""
+Headless HTTP API for the Historic Aerials Explorer pipeline.
+
+Exposes project creation, rendering and archiving without the Streamlit UI.
+Work is handed to the same persistent job queue the app uses (see jobs.py),
+so the server itself only validates requests, enqueues jobs and streams
+status and results back to clients.
+
+Run with:
+
+    python server.py --port 8080 --workers 2
+
+Endpoints:
+    GET  /years?lat=..&lon=..&size=..    Years with imagery for a location
+    GET  /projects                       Stored projects
+    POST /projects                       Create a project (download, process, render)
+    POST /flyovers                       Render a flyover along a route
+    POST /comparisons                    Render several projects side by side in a grid
+    POST /projects/{name}/timelapse      Render a new timelapse for a project
+    POST /projects/{name}/export         Export to several formats and sizes in one pass
+    POST /projects/{name}/analyze        Change detection heatmaps and statistics
+    POST /projects/{name}/archive        Archive a project
+    GET  /jobs/{id}                      Job status
+    GET  /jobs/{id}/events               Job status as a server-sent event stream
+    GET  /jobs/{id}/result               Stream the job's output file
+    GET  /jobs/{id}/draft                Draft preview of a running project job
+"""
+import os
+import json
+import asyncio
+import argparse
+from functools import partial
+
+from aiohttp import web
+from loguru import logger
+
+import app
+from jobs import enqueue_job, get_job, start_worker_pool
+
+EVENT_POLL_INTERVAL = 1.0  # Seconds between job status checks for event streams
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking pipeline call in the default thread pool"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+
+def json_error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+
+def job_summary(job):
+    """Public view of a job record"""
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "result": job["result"],
+        "error": job["error"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+    }
+
+
+async def read_json(request):
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text=json.dumps({"error": "Invalid JSON body"}), content_type="application/json")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "JSON body must be an object"}), content_type="application/json")
+    return body
+
+
+async def available_years(request):
+    try:
+        lat = float(request.query["lat"])
+        lon = float(request.query["lon"])
+        size = float(request.query.get("size", 0.005))
+    except (KeyError, ValueError):
+        return json_error(400, "lat and lon are required numbers")
+    years = await run_blocking(app.get_available_years, lat, lon, size)
+    return web.json_response({"years": years, "bbox": app.calculate_bbox(lat, lon, size)})
+
+
+async def list_projects(request):
+    config = await run_blocking(app.load_config)
+    return web.json_response({"projects": config["projects"]})
+
+
+async def create_project(request):
+    body = await read_json(request)
+    try:
+        params = {
+            "project_name": str(body["name"]),
+            "latitude": float(body["latitude"]),
+            "longitude": float(body["longitude"]),
+            "size": float(body.get("size", 0.005)),
+            "image_size": int(body.get("image_size", 1024)),
+            "reduce_watermarks": bool(body.get("reduce_watermarks", False)),
+            "use_frame_stack": bool(body.get("use_frame_stack", False)),
+            "align": bool(body.get("align", False)),
+            "normalize": bool(body.get("normalize", False)),
+            "frame_duration": float(body.get("frame_duration", 1.0)),
+            "transition": float(body.get("transition", 0.0)),
+            "easing": str(body.get("easing", "linear")),
+            "reverse_order": bool(body.get("reverse_order", False)),
+            "draft": bool(body.get("draft", True)),
+        }
+    except (KeyError, TypeError, ValueError):
+        return json_error(400, "name, latitude and longitude are required")
+    if not params["project_name"] or os.path.basename(params["project_name"]) != params["project_name"]:
+        return json_error(400, "Invalid project name")
+    if params["easing"] not in app.EASINGS:
+        return json_error(400, f"easing must be one of {list(app.EASINGS)}")
+
+    job_id = await run_blocking(enqueue_job, "new_project", params)
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def create_flyover(request):
+    body = await read_json(request)
+    try:
+        params = {
+            "project_name": str(body["name"]),
+            "route": [list(p) for p in app.parse_route(body["route"])],
+            "box_size": float(body.get("box_size", 0.005)),
+            "years": [int(y) for y in body.get("years", [])],
+            "mode": str(body.get("mode", "pan")),
+            "output_size": int(body.get("output_size", 512)),
+            "boxes_per_second": float(body.get("boxes_per_second", 1.0)),
+        }
+    except (KeyError, IndexError, TypeError, ValueError):
+        return json_error(400, "name and route (GeoJSON or list of [lon, lat] points) are required")
+    if not params["project_name"] or os.path.basename(params["project_name"]) != params["project_name"]:
+        return json_error(400, "Invalid project name")
+    if params["mode"] not in app.FLYOVER_MODES:
+        return json_error(400, f"mode must be one of {app.FLYOVER_MODES}")
+
+    job_id = await run_blocking(enqueue_job, "flyover", params)
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def create_comparison(request):
+    body = await read_json(request)
+    try:
+        params = {
+            "project_names": [str(name) for name in body["projects"]],
+            "years": [int(y) for y in body.get("years", [])],
+            "tile_size": int(body.get("tile_size", app.COMPARISON_TILE_SIZE)),
+            "frame_duration": float(body.get("frame_duration", 1.0)),
+            "transition": float(body.get("transition", 0.0)),
+            "easing": str(body.get("easing", "linear")),
+            "use_processed": bool(body.get("use_processed", True)),
+        }
+    except (KeyError, TypeError, ValueError):
+        return json_error(400, "projects must be a list of project names")
+    if not app.COMPARISON_MIN_SITES <= len(params["project_names"]) <= app.COMPARISON_MAX_SITES:
+        return json_error(400, f"Compare between {app.COMPARISON_MIN_SITES} and {app.COMPARISON_MAX_SITES} projects")
+    for name in params["project_names"]:
+        if await _find_project(name) is None:
+            return json_error(404, f"Unknown project: {name}")
+    if params["easing"] not in app.EASINGS:
+        return json_error(400, f"easing must be one of {list(app.EASINGS)}")
+
+    job_id = await run_blocking(enqueue_job, "compare", params)
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def _find_project(name):
+    config = await run_blocking(app.load_config)
+    return next((p for p in config["projects"] if p["name"] == name), None)
+
+
+async def create_project_timelapse(request):
+    name = request.match_info["name"]
+    project = await _find_project(name)
+    if project is None:
+        return json_error(404, f"Unknown project: {name}")
+    body = await read_json(request) if request.can_read_body else {}
+    try:
+        params = {
+            "project_name": name,
+            "years": [int(y) for y in body.get("years", project.get("years", []))],
+            "frame_duration": float(body.get("frame_duration", 1.0)),
+            "transition": float(body.get("transition", 0.0)),
+            "easing": str(body.get("easing", "linear")),
+            "use_processed": bool(body.get("use_processed", True)),
+            "use_stack": bool(body.get("use_stack", project.get("frame_stack", False))),
+        }
+    except (TypeError, ValueError):
+        return json_error(400, "Invalid timelapse parameters")
+    if not params["years"]:
+        return json_error(400, "At least one year is required")
+    if params["easing"] not in app.EASINGS:
+        return json_error(400, f"easing must be one of {list(app.EASINGS)}")
+
+    job_id = await run_blocking(enqueue_job, "timelapse", params)
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def export(request):
+    name = request.match_info["name"]
+    project = await _find_project(name)
+    if project is None:
+        return json_error(404, f"Unknown project: {name}")
+    body = await read_json(request)
+    try:
+        targets = [{"format": str(t["format"]), "size": int(t["size"]) if t.get("size") else None,
+                    "aspect": str(t.get("aspect", "1:1"))}
+                   for t in body["targets"]]
+        params = {
+            "project_name": name,
+            "years": [int(y) for y in body.get("years", project.get("years", []))],
+            "targets": targets,
+            "frame_duration": float(body.get("frame_duration", 1.0)),
+            "transition": float(body.get("transition", 0.0)),
+            "easing": str(body.get("easing", "linear")),
+            "use_processed": bool(body.get("use_processed", True)),
+            "use_stack": bool(body.get("use_stack", project.get("frame_stack", False))),
+        }
+    except (KeyError, TypeError, ValueError):
+        return json_error(400, "targets must be a list of {format, size, aspect}")
+    if not targets or any(t["format"] not in app.EXPORT_FORMATS for t in targets):
+        return json_error(400, f"Formats must be one of {app.EXPORT_FORMATS}")
+    if any(t["aspect"] not in app.EXPORT_ASPECTS for t in targets):
+        return json_error(400, f"Aspect ratios must be one of {list(app.EXPORT_ASPECTS)}")
+    if params["easing"] not in app.EASINGS:
+        return json_error(400, f"easing must be one of {list(app.EASINGS)}")
+
+    job_id = await run_blocking(enqueue_job, "export", params)
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def analyze(request):
+    name = request.match_info["name"]
+    project = await _find_project(name)
+    if project is None:
+        return json_error(404, f"Unknown project: {name}")
+    job_id = await run_blocking(enqueue_job, "analyze", {
+        "project_name": name,
+        "use_processed": project.get("reduce_watermarks", False),
+    })
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def archive(request):
+    name = request.match_info["name"]
+    if await _find_project(name) is None:
+        return json_error(404, f"Unknown project: {name}")
+    job_id = await run_blocking(enqueue_job, "archive", {"project_name": name})
+    return web.json_response({"job_id": job_id}, status=202)
+
+
+async def _get_job_or_404(request):
+    try:
+        job_id = int(request.match_info["job_id"])
+    except ValueError:
+        raise web.HTTPNotFound()
+    job = await run_blocking(get_job, job_id)
+    if job is None:
+        raise web.HTTPNotFound(text=json.dumps({"error": "Unknown job"}), content_type="application/json")
+    return job
+
+
+async def job_status(request):
+    job = await _get_job_or_404(request)
+    return web.json_response(job_summary(job))
+
+
+async def job_events(request):
+    """Stream job status changes as server-sent events until the job finishes"""
+    job = await _get_job_or_404(request)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+    })
+    await response.prepare(request)
+
+    last_sent = None
+    while True:
+        summary = job_summary(job)
+        if summary != last_sent:
+            await response.write(f"data: {json.dumps(summary)}\n\n".encode())
+            last_sent = summary
+        if job["status"] not in ("queued", "running"):
+            break
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+        job = await run_blocking(get_job, job["id"])
+
+    await response.write_eof()
+    return response
+
+
+async def job_draft(request):
+    """Serve the low-resolution draft of a project that is still rendering"""
+    job = await _get_job_or_404(request)
+    name = job["params"].get("project_name")
+    if job["kind"] != "new_project" or not name:
+        return json_error(404, "Job has no draft preview")
+    path = app.get_draft_path(os.path.join(app.OUTPUT_FOLDER, name), name)
+    if not os.path.exists(path):
+        return json_error(404, "Draft preview not ready")
+    return web.FileResponse(path)
+
+
+async def job_result(request):
+    """Stream the file produced by a finished job (video or archive).
+
+    Export jobs produce several files; pick one with ?index=N (default 0).
+    """
+    job = await _get_job_or_404(request)
+    if job["status"] != "done":
+        return json_error(409, f"Job is {job['status']}")
+    result = job["result"] or {}
+    path = result.get("video_path") or result.get("archive_path")
+    if result.get("files"):
+        try:
+            path = result["files"][int(request.query.get("index", 0))]
+        except (ValueError, IndexError):
+            return json_error(404, "No such export file")
+    if not path or not os.path.exists(path):
+        return json_error(404, "Job result file not found")
+    return web.FileResponse(path, headers={
+        "Content-Disposition": f'attachment; filename="{os.path.basename(path)}"'
+    })
+
+
+def create_server():
+    """Build the aiohttp application"""
+    server = web.Application()
+    server.add_routes([
+        web.get("/years", available_years),
+        web.get("/projects", list_projects),
+        web.post("/projects", create_project),
+        web.post("/flyovers", create_flyover),
+        web.post("/comparisons", create_comparison),
+        web.post("/projects/{name}/timelapse", create_project_timelapse),
+        web.post("/projects/{name}/export", export),
+        web.post("/projects/{name}/analyze", analyze),
+        web.post("/projects/{name}/archive", archive),
+        web.get("/jobs/{job_id}", job_status),
+        web.get("/jobs/{job_id}/events", job_events),
+        web.get("/jobs/{job_id}/draft", job_draft),
+        web.get("/jobs/{job_id}/result", job_result),
+    ])
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Historic Aerials Explorer HTTP API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="Number of background worker processes")
+    args = parser.parse_args()
+
+    start_worker_pool(args.workers)
+    logger.info(f"Starting HTTP API on {args.host}:{args.port}")
+    web.run_app(create_server(), host=args.host, port=args.port)
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder, since the app keeps its data in paths relative to the working directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def app(workdir):
+    """The app module, imported inside a temporary working directory"""
+    import app
+    return app
+
+
+class Status:
+    """Stand-in for a Streamlit placeholder or JobStatus"""
+
+    def __init__(self):
+        self.messages = []
+        self.progress = 0.0
+
+    def write(self, message):
+        self.messages.append(str(message))
+
+    def set_progress(self, fraction):
+        self.progress = fraction
+
+
+@pytest.fixture
+def status():
+    return Status()
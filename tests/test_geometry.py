@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+from PIL import Image
+
+
+POINTS = [[-87.66, 41.85], [-87.65, 41.86], [-87.64, 41.86]]
+
+
+@pytest.mark.parametrize("route", [
+    POINTS,
+    json.dumps(POINTS),
+    {"type": "LineString", "coordinates": POINTS},
+    {"type": "Feature", "geometry": {"type": "LineString", "coordinates": POINTS}},
+    {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": {"type": "LineString", "coordinates": POINTS}}
+    ]},
+    {"type": "MultiLineString", "coordinates": [POINTS[:2], POINTS[2:]]},
+])
+def test_parse_route_formats(app, route):
+    assert app.parse_route(route) == [tuple(p) for p in POINTS]
+
+
+def test_parse_route_needs_two_points(app):
+    with pytest.raises(ValueError):
+        app.parse_route([POINTS[0]])
+
+
+def test_route_tiles_contain_every_view_box(app):
+    box = 0.002
+    tiles = app.plan_route_tiles(app.parse_route(POINTS), box)
+    for lon, lat in app.sample_route(app.parse_route(POINTS), box / 4):
+        assert any(
+            minlon <= lon - box / 2 and lon + box / 2 <= maxlon and minlat <= lat - box / 2 and lat + box / 2 <= maxlat
+            for minlon, minlat, maxlon, maxlat in (app.parse_bbox(bbox) for _, bbox in tiles)
+        )
+
+
+def test_seed_tiles_contain_boxes_up_to_the_overlap(app):
+    tiles = [app.parse_bbox(bbox) for bbox in app.plan_seed_tiles("-87.70,41.80,-87.66,41.84", 0.01, 0.005)]
+    step = 0.0025
+    for i in range(13):
+        for j in range(13):
+            minlon, minlat = -87.70 + i * step, 41.80 + j * step
+            box = (minlon, minlat, minlon + 0.005, minlat + 0.005)
+            if box[2] > -87.66 or box[3] > 41.84:
+                continue
+            assert any(
+                t[0] <= box[0] + 1e-9 and t[1] <= box[1] + 1e-9 and box[2] <= t[2] + 1e-9 and box[3] <= t[3] + 1e-9
+                for t in tiles
+            )
+
+
+@pytest.fixture
+def stored_project(app):
+    """A project with one stored 512px image of a 0.01 degree box"""
+    bbox = app.calculate_bbox(41.85, -87.66, 0.01)
+    folder = os.path.join(app.OUTPUT_FOLDER, "stored")
+    os.makedirs(folder, exist_ok=True)
+    Image.new("RGB", (512, 512), (90, 120, 60)).save(os.path.join(folder, "1990_stored.jpg"))
+    return {"projects": [{"name": "stored", "bbox": bbox, "years": [1990]}]}
+
+
+def test_covering_image_is_reused_inside_its_extent(app, stored_project):
+    match = app.find_covering_image(app.calculate_bbox(41.851, -87.661, 0.004), 1990, 128, stored_project)
+    assert match is not None
+    assert match[0].endswith("1990_stored.jpg")
+
+
+def test_partially_covering_image_is_not_reused(app, stored_project):
+    # 99% of this box lies inside the stored extent; the rest sticks out to the east
+    bbox = app.calculate_bbox(41.85, -87.66 + 0.005 - 0.002 + 0.00004, 0.004)
+    assert app.find_covering_image(bbox, 1990, 128, stored_project) is None
+
+
+def test_covering_image_must_be_sharp_enough(app, stored_project):
+    assert app.find_covering_image(app.calculate_bbox(41.85, -87.66, 0.004), 1990, 1024, stored_project) is None
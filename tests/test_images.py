@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def aerial():
+    """Textured stand-in for real imagery"""
+    rng = np.random.default_rng(0)
+    return rng.integers(40, 220, size=(256, 256, 3), dtype=np.uint8)
+
+
+def test_uniform_images_are_blank(app):
+    blank, _ = app.is_blank_image(np.full((256, 256, 3), 128, dtype=np.uint8))
+    assert blank
+
+
+def test_mostly_empty_images_are_blank(app, aerial):
+    img = np.full_like(aerial, 255)
+    img[:, :64] = aerial[:, :64]
+    blank, coverage = app.is_blank_image(img)
+    assert blank
+    assert coverage == pytest.approx(0.25, abs=0.05)
+
+
+def test_textured_images_are_not_blank(app, aerial):
+    blank, coverage = app.is_blank_image(aerial)
+    assert not blank
+    assert coverage == pytest.approx(1.0)
+
+
+def test_histogram_lut_maps_tones_onto_reference(app, aerial):
+    dark = (aerial // 2).astype(np.uint8)
+    lut = app.compute_histogram_lut(dark, app._channel_histograms(aerial))
+    assert lut.shape == (256, 1, 3) and lut.dtype == np.uint8
+    # Each channel's table never maps a brighter level to a darker one
+    assert np.all(np.diff(lut[:, 0, :].astype(int), axis=0) >= 0)
+    normalized = app.apply_lut(dark, lut)
+    assert abs(normalized.mean() - aerial.mean()) < abs(dark.mean() - aerial.mean()) / 10
+
+
+def test_histogram_lut_of_reference_is_near_identity(app, aerial):
+    lut = app.compute_histogram_lut(aerial, app._channel_histograms(aerial))
+    assert np.abs(app.apply_lut(aerial, lut).astype(int) - aerial).max() <= 1
+
+
+def test_apply_lut_without_table_is_a_no_op(app, aerial):
+    assert app.apply_lut(aerial, None) is aerial
+
+
+@pytest.mark.parametrize("aspect, expected", [
+    ("1:1", (512, 512)),
+    ("16:9", (512, 288)),
+    ("9:16", (288, 512)),
+    ("4:5", (410, 512)),
+])
+def test_fit_export_frame(app, aspect, expected):
+    frame = np.zeros((1024, 1024, 3), dtype=np.uint8)
+    height, width = app.fit_export_frame(frame, 512, aspect).shape[:2]
+    assert (width, height) == expected
+    assert width % 2 == 0 and height % 2 == 0
+
+
+def test_label_lines_keep_short_captions_on_one_line(app):
+    assert app._label_lines(1938, "1938-05-01 | USDA", len, 100) == ["1938  1938-05-01 | USDA"]
+
+
+def test_label_lines_wrap_and_truncate_long_captions(app):
+    lines = app._label_lines(1938, "word " * 40, len, 20)
+    assert lines[0] == "1938"
+    assert len(lines) == app.LABEL_MAX_LINES
+    assert lines[-1].endswith("...")
+    assert all(len(line) <= 20 for line in lines)
+
+
+@pytest.mark.parametrize("use_font", [True, False])
+def test_label_frame_fits_narrow_frames(app, aerial, use_font):
+    font = app.load_label_font(font_size=36) if use_font else None
+    tile = aerial[:, :128].copy()
+    labeled = app.label_frame(tile, 1938, font, caption="Flown 1938-05-01 | Chicago Aerial Survey")
+    assert labeled.shape == tile.shape
+    assert not np.array_equal(labeled, tile)
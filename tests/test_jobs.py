@@ -0,0 +1,118 @@
+import os
+import time
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture
+def db(workdir):
+    return str(workdir / "jobs.db")
+
+
+def test_enqueue_rejects_unknown_kind(db):
+    with pytest.raises(ValueError):
+        jobs.enqueue_job("nonsense", {}, db_path=db)
+
+
+def test_claim_takes_oldest_queued_job_once(db):
+    first = jobs.enqueue_job("timelapse", {"project_name": "a"}, db_path=db)
+    second = jobs.enqueue_job("timelapse", {"project_name": "b"}, db_path=db)
+
+    job = jobs.claim_next_job("worker-1", db_path=db)
+    assert job["id"] == first
+    assert job["status"] == "running"
+    assert job["worker"] == "worker-1"
+    assert job["attempts"] == 1
+    assert job["params"] == {"project_name": "a"}
+
+    assert jobs.claim_next_job("worker-2", db_path=db)["id"] == second
+    assert jobs.claim_next_job("worker-3", db_path=db) is None
+
+
+def test_cancel_only_affects_queued_jobs(db):
+    running = jobs.enqueue_job("timelapse", {}, db_path=db)
+    queued = jobs.enqueue_job("timelapse", {}, db_path=db)
+    jobs.claim_next_job("worker", db_path=db)
+
+    assert not jobs.cancel_job(running, db_path=db)
+    assert jobs.cancel_job(queued, db_path=db)
+    assert jobs.get_job(queued, db_path=db)["status"] == "cancelled"
+    assert jobs.claim_next_job("worker", db_path=db) is None
+
+
+def _expire_heartbeat(db, job_id):
+    conn = jobs.get_connection(db)
+    try:
+        conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - 3600, job_id))
+    finally:
+        conn.close()
+
+
+def test_stale_jobs_are_requeued_then_failed(db):
+    job_id = jobs.enqueue_job("timelapse", {}, db_path=db)
+
+    for attempt in range(1, jobs.MAX_ATTEMPTS):
+        assert jobs.claim_next_job("worker", db_path=db)["attempts"] == attempt
+        _expire_heartbeat(db, job_id)
+        assert jobs.recover_stale_jobs(db_path=db) == 1
+        job = jobs.get_job(job_id, db_path=db)
+        assert job["status"] == "queued"
+        assert job["worker"] is None
+
+    jobs.claim_next_job("worker", db_path=db)
+    _expire_heartbeat(db, job_id)
+    assert jobs.recover_stale_jobs(db_path=db) == 1
+    job = jobs.get_job(job_id, db_path=db)
+    assert job["status"] == "failed"
+    assert job["error"] == "Worker stopped responding"
+
+
+def test_live_jobs_are_not_recovered(db):
+    job_id = jobs.enqueue_job("timelapse", {}, db_path=db)
+    jobs.claim_next_job("worker", db_path=db)
+    assert jobs.recover_stale_jobs(db_path=db) == 0
+    assert jobs.get_job(job_id, db_path=db)["status"] == "running"
+
+
+def test_job_status_records_log_and_result(db):
+    job_id = jobs.enqueue_job("timelapse", {}, db_path=db)
+    jobs.claim_next_job("worker", db_path=db)
+
+    status = jobs.JobStatus(job_id, db_path=db)
+    try:
+        for i in range(jobs.MAX_LOG_LINES + 5):
+            status.write(f"step {i}")
+        status.set_progress(2.0)
+        assert jobs.get_job(job_id, db_path=db)["progress"] == 1.0
+        status.finish({"video_path": "out.mp4"})
+    finally:
+        status.close()
+
+    job = jobs.get_job(job_id, db_path=db)
+    assert job["status"] == "done"
+    assert job["message"] == f"step {jobs.MAX_LOG_LINES + 4}"
+    assert len(job["log"]) == jobs.MAX_LOG_LINES
+    assert job["log"][0] == "step 5"
+    assert job["result"] == {"video_path": "out.mp4"}
+
+
+def test_stale_pid_file_is_not_a_running_pool(workdir):
+    assert not jobs.is_pool_running()
+    with open(jobs.POOL_PID_FILE, "w") as f:
+        f.write(str(os.getpid()))
+    # The PID is alive, but nothing holds the pool lock
+    assert not jobs.is_pool_running()
+
+
+@pytest.mark.skipif(jobs.fcntl is None, reason="pool lock needs fcntl")
+def test_locked_pid_file_is_a_running_pool(workdir):
+    pid_file = jobs._lock_pool_pid_file()
+    try:
+        assert jobs.is_pool_running()
+        # A second pool does not start while the lock is held
+        assert jobs._lock_pool_pid_file() is None
+    finally:
+        pid_file.close()
+    assert not jobs.is_pool_running()
@@ -0,0 +1,46 @@
+import multiprocessing
+import threading
+
+import pytest
+
+
+def _increment(app, path, key, times):
+    for _ in range(times):
+        app.update_json_file(path, lambda data: {**data, key: data.get(key, 0) + 1})
+
+
+def test_load_json_file_defaults(app, workdir):
+    assert app.load_json_file(str(workdir / "missing.json")) == {}
+    assert app.load_json_file(str(workdir / "missing.json"), []) == []
+    (workdir / "broken.json").write_text("{")
+    assert app.load_json_file(str(workdir / "broken.json"), {"a": 1}) == {"a": 1}
+
+
+def test_update_json_file_returns_saved_contents(app, workdir):
+    path = str(workdir / "data.json")
+    assert app.update_json_file(path, lambda data: data + [1], default=[]) == [1]
+    assert app.update_json_file(path, lambda data: data + [2], default=[]) == [1, 2]
+    assert app.load_json_file(path) == [1, 2]
+
+
+def test_concurrent_thread_updates_are_not_lost(app, workdir):
+    path = str(workdir / "counts.json")
+    threads = [threading.Thread(target=_increment, args=(app, path, f"t{i}", 20)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert app.load_json_file(path) == {f"t{i}": 20 for i in range(4)}
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_process_updates_are_not_lost(app, workdir):
+    path = str(workdir / "counts.json")
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_increment, args=(app, path, "shared", 20)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert app.load_json_file(path) == {"shared": 80}
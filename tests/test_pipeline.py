@@ -0,0 +1,52 @@
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+def fake_get(url, **kwargs):
+    """Serve a textured JPEG for every GetMap request"""
+    rng = np.random.default_rng(len(url))
+    buffer = io.BytesIO()
+    Image.fromarray(rng.integers(40, 220, size=(64, 64, 3), dtype=np.uint8)).save(buffer, format="JPEG")
+    return FakeResponse(buffer.getvalue())
+
+
+def test_new_project_job_runs_end_to_end(app, status, monkeypatch):
+    monkeypatch.setattr(app, "get_available_years", lambda lat, lon, size: [1938, 1951, 1962])
+    monkeypatch.setattr(app, "fetch_location_metadata", lambda *args, **kwargs: {})
+    monkeypatch.setattr(app.requests, "get", fake_get)
+
+    result = app.run_new_project_job({
+        "project_name": "smoke",
+        "latitude": 41.85,
+        "longitude": -87.66,
+        "size": 0.005,
+        "image_size": 64,
+        "frame_duration": 0.5,
+    }, status)
+
+    assert result["project_name"] == "smoke"
+    assert result["years"] == [1938, 1951, 1962]
+    assert result["video_path"] and os.path.exists(result["video_path"])
+    project_folder = os.path.join(app.OUTPUT_FOLDER, "smoke")
+    for year in result["years"]:
+        assert os.path.exists(os.path.join(project_folder, f"{year}_smoke.jpg"))
+    # The draft is replaced by the full render
+    assert not os.path.exists(app.get_draft_path(project_folder, "smoke"))
+
+    project = next(p for p in app.load_config()["projects"] if p["name"] == "smoke")
+    assert project["years"] == [1938, 1951, 1962]
+    assert project["videos"][-1]["path"] == result["video_path"]
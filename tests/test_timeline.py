@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+
+def frame(value, size=8):
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+
+def test_easings_run_from_zero_to_one(app):
+    for name, ease in app.EASINGS.items():
+        assert ease(0.0) == pytest.approx(0.0), name
+        assert ease(1.0) == pytest.approx(1.0), name
+        samples = [ease(t / 10) for t in range(11)]
+        assert samples == sorted(samples), name
+
+
+def test_hard_cut_holds_each_frame_for_its_duration(app):
+    frames = list(app.iter_timeline([frame(0), frame(100), frame(200)], fps=10, frame_duration=1.0))
+    assert len(frames) == 30
+    assert [int(f[0, 0, 0]) for f in frames[::10]] == [0, 100, 200]
+
+
+def test_crossfade_keeps_total_duration(app):
+    frames = list(app.iter_timeline([frame(0), frame(200)], fps=10, frame_duration=1.0, transition=0.5))
+    assert len(frames) == 20
+    values = [int(f[0, 0, 0]) for f in frames]
+    # First frame held, then a rising blend, then the second frame held through the tail
+    assert values[:5] == [0] * 5
+    blend = values[5:10]
+    assert blend == sorted(blend) and 0 < blend[0] and blend[-1] < 200
+    assert values[10:] == [200] * 10
+
+
+def test_transition_is_capped_at_frame_duration(app):
+    frames = list(app.iter_timeline([frame(0), frame(200)], fps=10, frame_duration=0.5, transition=2.0))
+    assert len(frames) == 10
+
+
+def test_crossfade_resizes_mismatched_frames(app):
+    segment = list(app.timeline_segment(frame(0, 16), frame(200, 8), fps=4, frame_duration=1.0, transition=0.5))
+    assert all(f.shape == (8, 8, 3) for f in segment)
+
+
+def test_unknown_easing_is_rejected(app):
+    with pytest.raises(KeyError):
+        list(app.timeline_segment(frame(0), frame(200), fps=4, frame_duration=1.0, transition=0.5, easing="bounce"))